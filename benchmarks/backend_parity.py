@@ -0,0 +1,74 @@
+"""Check that an alternative inference backend scores images like the transformers pipeline.
+
+Usage: python -m benchmarks.backend_parity --backend onnx [--images-dir DIR] [--tolerance 0.05]
+       python -m benchmarks.backend_parity --preprocess [--backend int8]
+Without --images-dir, random synthetic images are used. With --preprocess the
+scores of the fast preprocessing path (FramePreprocessor + predict_pixel_values,
+used when fast_preprocess is on) are compared with the image processor path of the
+same backend (transformers by default), on screen-sized frames.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from monitor.artifact import load_or_build_artifact
+from monitor.backends import BACKENDS, check_parity, create_backend
+from monitor.monitor import MODEL_NAME
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp", ".bmp"}
+
+
+def load_images(images_dir=None, count=16, seed=0, size=(480, 640)):
+    if images_dir:
+        paths = sorted(p for p in Path(images_dir).rglob("*") if p.suffix.lower() in IMAGE_SUFFIXES)
+        return [Image.open(p).convert("RGB") for p in paths[:count]]
+    rng = np.random.default_rng(seed)
+    return [Image.fromarray(rng.integers(0, 256, size=(*size, 3), dtype=np.uint8)) for _ in range(count)]
+
+
+def fast_preprocess_path(backend):
+    """Call `backend` like a pipeline, but through its FramePreprocessor and predict_pixel_values()."""
+    def classify(images, batch_size=1):
+        frames = [np.asarray(image.convert("RGB")) for image in images]
+        return backend.predict_pixel_values(backend.preprocessor.batch(frames), batch_size=batch_size)
+    return classify
+
+
+def timed(backend, images, batch_size):
+    start = time.perf_counter()
+    backend(images, batch_size=batch_size)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=list(BACKENDS))
+    parser.add_argument("--preprocess", action="store_true", help="Compare fast preprocessing with the image processor instead")
+    parser.add_argument("--images-dir")
+    parser.add_argument("--count", type=int, default=16)
+    parser.add_argument("--tolerance", type=float, default=0.05)
+    parser.add_argument("--batch-size", type=int, default=8)
+    args = parser.parse_args()
+    if not args.preprocess and args.backend in (None, "transformers"):
+        parser.error("--backend must name an alternative backend (or pass --preprocess)")
+
+    # The TorchScript trace only exists in the local model artifact
+    artifact = load_or_build_artifact(MODEL_NAME, require_trace=True) if args.backend == "torchscript" else None
+    if args.preprocess:
+        images = load_images(args.images_dir, args.count, size=(1080, 1920))
+        reference = create_backend(args.backend or "transformers", MODEL_NAME, artifact=artifact)
+        candidate = fast_preprocess_path(reference)
+    else:
+        images = load_images(args.images_dir, args.count)
+        reference = create_backend("transformers", MODEL_NAME, device="cpu")
+        candidate = create_backend(args.backend, MODEL_NAME, artifact=artifact)
+    report = check_parity(reference, candidate, images, tolerance=args.tolerance, batch_size=args.batch_size)
+    report["reference_seconds"] = timed(reference, images, args.batch_size)
+    report["candidate_seconds"] = timed(candidate, images, args.batch_size)
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["passed"] else 1)
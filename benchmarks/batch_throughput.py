@@ -0,0 +1,49 @@
+"""Measure classifier throughput of has_adult_content_batch() at several batch sizes.
+
+Usage: python -m benchmarks.batch_throughput [--images 64] [--batch-sizes 1 4 8 16] [--json out.json]
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+
+def run(num_images=64, batch_sizes=(1, 2, 4, 8, 16), size=(720, 1280), seed=0):
+    import monitor.monitor as monitor_mod
+
+    monitor_mod.load_model()
+    if monitor_mod.classifier is None:
+        raise RuntimeError(f"Model failed to load: {monitor_mod.loading_error}")
+    # Every image must reach the model, otherwise the cache makes batching look free
+    monitor_mod.VERDICT_CACHE_SIZE = 0
+
+    rng = np.random.default_rng(seed)
+    images = [rng.integers(0, 256, size=(*size, 3), dtype=np.uint8) for _ in range(num_images)]
+    monitor_mod.has_adult_content_batch(images[:2], batch_size=2)  # Warm-up
+
+    results = []
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        monitor_mod.has_adult_content_batch(images, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        results.append({"batch_size": batch_size, "seconds": elapsed, "images_per_second": num_images / elapsed})
+    baseline = results[0]["images_per_second"]
+    for result in results:
+        result["speedup"] = result["images_per_second"] / baseline
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=int, default=64)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    results = run(args.images, args.batch_sizes)
+    for result in results:
+        print(f"batch_size={result['batch_size']:>3}  {result['images_per_second']:7.2f} img/s  speedup x{result['speedup']:.2f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,143 @@
+"""Stand-ins that let the benchmarks run headless, offline and on any OS.
+
+- FakeScreen / install_fake_mss(): an `mss` module whose grabs return synthetic
+  BGRA frames, copied into a fresh buffer per grab like the real one. The screen
+  shows "safe" content until `show("adult")` is called.
+- StubClassifier: a backend with the same interface as monitor.backends (including
+  the fast preprocessing path) whose score is derived from frame brightness, so
+  "adult" frames from FakeScreen score high and "safe" ones low.
+- install_fake_foreground_window(): a stand-in for the window system that reports a
+  fixed foreground window rectangle, for the foreground_window capture mode.
+- install_fake_pyautogui(): records hotkey() calls instead of pressing keys, and
+  flips the fake screen back to safe content the way closing a tab would.
+"""
+import sys
+import threading
+import time
+import types
+
+import numpy as np
+
+
+def synthetic_frame(height, width, content="safe", seed=0):
+    """A BGRA frame: dark grey noise for "safe", bright skin-toned noise for "adult".
+
+    The skin tones make "adult" frames escalate past the prefilter as real photos would.
+    """
+    rng = np.random.default_rng(seed)
+    if content == "safe":
+        frame = np.repeat(rng.integers(0, 120, size=(height, width, 1), dtype=np.uint8), 4, axis=2)
+    else:
+        base = np.array([140, 172, 224, 255], dtype=np.int16)  # BGRA skin tone
+        noise = rng.integers(-24, 25, size=(height, width, 1), dtype=np.int16)
+        frame = np.clip(base + noise, 0, 255).astype(np.uint8)
+    frame[..., 3] = 255
+    return frame
+
+
+class FakeScreen:
+    def __init__(self, height, width, monitors=1):
+        self.height, self.width = height, width
+        self.monitor_count = monitors
+        self.frames = {content: synthetic_frame(height, width, content, seed) for seed, content in enumerate(("safe", "adult"))}
+        self.content = "safe"
+        self.changed_at = time.perf_counter()
+        self.grabs = 0
+        self._lock = threading.Lock()
+
+    def show(self, content):
+        with self._lock:
+            self.content = content
+            self.changed_at = time.perf_counter()
+
+    def grab_bytes(self, region=None):
+        """Bytes of the whole screen, or of `region` (left, top, width, height) within one monitor."""
+        with self._lock:
+            self.grabs += 1
+            frame = self.frames[self.content]
+            if region is not None:
+                left, top, width, height = region
+                left %= self.width
+                frame = frame[top:top + height, left:left + width]
+            return bytearray(frame.tobytes())
+
+
+class _Shot:
+    def __init__(self, raw, width, height):
+        self.raw, self.width, self.height = raw, width, height
+
+
+class _FakeMSS:
+    def __init__(self, screen):
+        self._screen = screen
+        monitor = {"left": 0, "top": 0, "width": screen.width, "height": screen.height}
+        self.monitors = [dict(monitor, width=screen.width * screen.monitor_count)] + [
+            dict(monitor, left=i * screen.width) for i in range(screen.monitor_count)]
+
+    def grab(self, monitor):
+        if monitor in self.monitors:
+            return _Shot(self._screen.grab_bytes(), monitor["width"], monitor["height"])
+        region = (monitor["left"], monitor["top"], monitor["width"], monitor["height"])
+        return _Shot(self._screen.grab_bytes(region), monitor["width"], monitor["height"])
+
+    def close(self):
+        pass
+
+
+def install_fake_mss(screen):
+    """Make `import mss` return a module that grabs from `screen`."""
+    module = types.ModuleType("mss")
+    module.mss = lambda: _FakeMSS(screen)
+    sys.modules["mss"] = module
+    sys.modules.pop("monitor.capture", None)  # Re-import against the fake
+    return module
+
+
+def install_fake_foreground_window(rect):
+    """Make the foreground window lookup report `rect` (left, top, width, height); None removes the stand-in."""
+    from monitor.window import set_window_locator
+    set_window_locator((lambda: rect) if rect is not None else None)
+
+
+def install_fake_pyautogui(screen=None):
+    """Make `import pyautogui` record hotkeys; returns the list of (time, keys) pressed."""
+    presses = []
+    module = types.ModuleType("pyautogui")
+
+    def hotkey(*keys):
+        presses.append((time.perf_counter(), keys))
+        if screen is not None:
+            screen.show("safe")  # The offending tab is gone
+
+    module.hotkey = hotkey
+    sys.modules["pyautogui"] = module
+    return presses
+
+
+class StubClassifier:
+    """Backend stand-in: real fast preprocessing, brightness instead of a model.
+
+    `forward_ms` adds a fixed delay per forward pass to emulate model cost.
+    """
+
+    def __init__(self, forward_ms=0.0):
+        from monitor.preprocess import FramePreprocessor
+        self.preprocessor = FramePreprocessor(size=(224, 224), mean=(0.5, 0.5, 0.5), std=(0.5, 0.5, 0.5))
+        self.forward_ms = forward_ms
+        self.id2label = {0: "normal", 1: "nsfw"}
+
+    def predict_pixel_values(self, pixel_values, batch_size=8):
+        results = []
+        for start in range(0, len(pixel_values), batch_size):
+            chunk = pixel_values[start:start + batch_size]
+            if self.forward_ms:
+                time.sleep(self.forward_ms / 1000)
+            # Normalized pixels are in [-1, 1]; bright frames score high
+            for mean in chunk.reshape(len(chunk), -1).mean(axis=1):
+                score = float(np.clip((mean + 1) / 2, 0, 1))
+                results.append([{"label": "nsfw", "score": score}, {"label": "normal", "score": 1 - score}])
+        return results
+
+    def __call__(self, images, batch_size=8):
+        frames = [np.asarray(image) for image in images]
+        return self.predict_pixel_values(self.preprocessor.batch(frames), batch_size=batch_size)
@@ -0,0 +1,117 @@
+"""Measure the cascade prefilter on a labelled image folder: pass-through rate and recall.
+
+Images are read from subfolders of IMAGES_DIR; those named in --positive (default
+nsfw, porn, hentai, sexy) are positives, everything else negative. For each
+prefilter threshold this reports the fraction of images escalated to the model
+(pass-through rate), the fraction of positives escalated (recall against the
+labels) and, with --model, the fraction of images the full model flags that are
+escalated (recall against the model) plus the expected speed-up of the cascade.
+
+Usage: python -m benchmarks.prefilter_eval IMAGES_DIR [--model] [--thresholds 0.001 0.005 0.02]
+       [--json out.json]
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from monitor.prefilter import SkinPrefilter
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp", ".bmp"}
+DEFAULT_POSITIVE = ("nsfw", "porn", "hentai", "sexy")
+DEFAULT_THRESHOLDS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1)
+
+
+def iter_labelled_images(images_dir, positive=DEFAULT_POSITIVE):
+    """Yield (path, is_positive) for every image below `images_dir`."""
+    root = Path(images_dir)
+    positive = {name.lower() for name in positive}
+    for path in sorted(root.rglob("*")):
+        if path.suffix.lower() in IMAGE_SUFFIXES:
+            labels = {part.lower() for part in path.relative_to(root).parts[:-1]}
+            yield path, bool(labels & positive)
+
+
+def score_folder(images_dir, positive=DEFAULT_POSITIVE, with_model=False):
+    """Return one record per image with its label, prefilter score and (optionally) model score."""
+    model = None
+    if with_model:
+        import monitor.monitor as monitor_mod
+        monitor_mod.load_model()
+        if monitor_mod.classifier is None:
+            raise RuntimeError(f"Model failed to load: {monitor_mod.loading_error}")
+        monitor_mod.VERDICT_CACHE_SIZE = 0
+        monitor_mod.PREFILTER_ENABLED = False
+        model = monitor_mod
+
+    prefilter = SkinPrefilter()
+    records = []
+    for path, is_positive in iter_labelled_images(images_dir, positive):
+        with Image.open(path) as image:
+            frame = np.asarray(image.convert("RGB"))
+        start = time.perf_counter()
+        skin = prefilter.score(frame)
+        record = {"path": str(path), "positive": is_positive, "skin_ratio": skin,
+                  "prefilter_ms": 1000 * (time.perf_counter() - start)}
+        if model:
+            start = time.perf_counter()
+            record["model_score"] = model._score_images([frame])[0]
+            record["model_ms"] = 1000 * (time.perf_counter() - start)
+        records.append(record)
+    return records
+
+
+def evaluate(records, thresholds=DEFAULT_THRESHOLDS, model_threshold=0.5):
+    """Pass-through rate and recall of the prefilter at each threshold."""
+    if not records:
+        return []
+    prefilter_ms = sum(r["prefilter_ms"] for r in records) / len(records)
+    model_ms = sum(r["model_ms"] for r in records) / len(records) if "model_ms" in records[0] else None
+    positives = [r for r in records if r["positive"]]
+    flagged = [r for r in records if r.get("model_score", 0) > model_threshold]
+    results = []
+    for threshold in thresholds:
+        escalated = [r for r in records if r["skin_ratio"] >= threshold]
+        result = {
+            "threshold": threshold,
+            "pass_through_rate": len(escalated) / len(records),
+            "recall_vs_labels": sum(r["skin_ratio"] >= threshold for r in positives) / len(positives) if positives else None,
+            "missed_positives": [r["path"] for r in positives if r["skin_ratio"] < threshold],
+            "prefilter_ms": prefilter_ms,
+        }
+        if model_ms is not None:
+            result["recall_vs_model"] = sum(r["skin_ratio"] >= threshold for r in flagged) / len(flagged) if flagged else None
+            result["model_ms"] = model_ms
+            result["expected_speedup"] = model_ms / (prefilter_ms + result["pass_through_rate"] * model_ms)
+        results.append(result)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("images_dir")
+    parser.add_argument("--positive", nargs="+", default=list(DEFAULT_POSITIVE), help="Folder names holding positives")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=list(DEFAULT_THRESHOLDS))
+    parser.add_argument("--model", action="store_true", help="Also score every image with the full classifier")
+    parser.add_argument("--model-threshold", type=float, default=0.5)
+    parser.add_argument("--json", help="Write per-image records and results to this JSON file")
+    args = parser.parse_args()
+
+    records = score_folder(args.images_dir, args.positive, with_model=args.model)
+    results = evaluate(records, args.thresholds, args.model_threshold)
+    print(f"{len(records)} images, {sum(r['positive'] for r in records)} positive")
+    for result in results:
+        line = f"threshold={result['threshold']:<6}  pass-through {result['pass_through_rate']:6.1%}"
+        if result["recall_vs_labels"] is not None:
+            line += f"  recall (labels) {result['recall_vs_labels']:6.1%}"
+        if result.get("recall_vs_model") is not None:
+            line += f"  recall (model) {result['recall_vs_model']:6.1%}"
+        if "expected_speedup" in result:
+            line += f"  speed-up x{result['expected_speedup']:.1f}"
+        print(line)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"records": records, "results": results}, f, indent=2)
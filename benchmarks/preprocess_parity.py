@@ -0,0 +1,70 @@
+"""Check the BGRA fast-path preprocessor against the transformers image processor and time both.
+
+Usage: python -m benchmarks.preprocess_parity [--images-dir DIR] [--tolerance 0.02] [--max-tolerance 0.1]
+Without --images-dir, synthetic 1080p, 4K, 4:3, portrait and small frames are used.
+"""
+import argparse
+import json
+import sys
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from benchmarks.backend_parity import load_images
+from monitor.monitor import MODEL_NAME
+from monitor.preprocess import FramePreprocessor, check_preprocess_parity
+
+
+def synthetic_frames(seed=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+    # Screens, plus 4:3, portrait and small frames, which resize differently
+    for height, width in ((1080, 1920), (2160, 3840), (768, 1024), (1920, 1080), (300, 400)):
+        # Smooth gradients plus noise, closer to real screens than pure noise
+        y, x = np.mgrid[0:height, 0:width]
+        base = np.stack([x * 255 // width, y * 255 // height, (x + y) * 255 // (width + height)], axis=2)
+        noise = rng.integers(-20, 21, size=base.shape)
+        rgb = np.clip(base + noise, 0, 255).astype(np.uint8)
+        frames.append(cv2.cvtColor(rgb, cv2.COLOR_RGB2BGRA))
+    return frames
+
+
+def time_paths(processor, frame, repeats=10):
+    fast = FramePreprocessor.from_processor(processor)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fast(frame)
+    fast_seconds = (time.perf_counter() - start) / repeats
+    start = time.perf_counter()
+    for _ in range(repeats):
+        # The old hot path: BGRA -> BGR in capture, BGR -> RGB -> PIL in classification, then the processor
+        bgr = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+        processor(Image.fromarray(cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)), return_tensors="np")
+    slow_seconds = (time.perf_counter() - start) / repeats
+    return {"fast_ms": fast_seconds * 1000, "processor_ms": slow_seconds * 1000}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images-dir")
+    parser.add_argument("--tolerance", type=float, default=0.02, help="Largest mean absolute difference")
+    parser.add_argument("--max-tolerance", type=float, default=0.1, help="Largest absolute difference of any value")
+    args = parser.parse_args()
+
+    from transformers import AutoImageProcessor
+    processor = AutoImageProcessor.from_pretrained(MODEL_NAME)
+    if args.images_dir:
+        frames = [cv2.cvtColor(np.asarray(image), cv2.COLOR_RGB2BGRA) for image in load_images(args.images_dir)]
+    else:
+        frames = synthetic_frames()
+
+    reports = []
+    for frame in frames:
+        report = check_preprocess_parity(processor, frame, tolerance=args.tolerance, max_tolerance=args.max_tolerance)
+        report["shape"] = list(frame.shape)
+        report.update(time_paths(processor, frame))
+        reports.append(report)
+    print(json.dumps(reports, indent=2))
+    sys.exit(0 if all(report["passed"] for report in reports) else 1)
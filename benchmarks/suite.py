@@ -0,0 +1,320 @@
+"""Latency and throughput of the detection hot paths at several screen resolutions.
+
+Benchmarks:
+- capture: capture_screen() and capture_screens(raw=True) against a fake mss
+- preprocess: BGRA->RGB, PIL conversion, fast preprocessing, dhash and the frame gate
+- classify_stub: has_adult_content() with a stub classifier (everything but the model)
+- classify_model: has_adult_content() with the real model (--real-model; loads the
+  local model cache offline and is skipped if there is none)
+- alert: speak_alert() in parent mode, and the time until its screenshot and event
+  are persisted
+- end_to_end: the full main() loop; time from adult content appearing on the fake
+  screen to the close-tab hotkey
+
+Each benchmark and resolution runs in its own subprocess, so peak RSS is per case.
+Everything runs headless and offline, on Linux as well as Windows.
+
+Usage: python -m benchmarks.suite [--benchmarks capture preprocess ...]
+       [--resolutions 1280x720 1920x1080 3840x2160] [--iterations 50] [--json out.json]
+       [--compare previous.json]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARKS = ("capture", "preprocess", "classify_stub", "classify_model", "alert", "end_to_end")
+DEFAULT_BENCHMARKS = ("capture", "preprocess", "classify_stub", "alert", "end_to_end")
+DEFAULT_RESOLUTIONS = ("1280x720", "1920x1080", "3840x2160")
+
+
+def summarize(latencies):
+    """Throughput and nearest-rank percentiles (ms) of a list of latencies in seconds."""
+    if not latencies:
+        return {"n": 0}
+    ordered = sorted(latencies)
+
+    def percentile(p):
+        return 1000 * ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+
+    total = sum(ordered)
+    return {
+        "n": len(ordered),
+        "throughput_per_s": len(ordered) / total if total else float("inf"),
+        "mean_ms": 1000 * total / len(ordered),
+        "p50_ms": percentile(50),
+        "p95_ms": percentile(95),
+        "p99_ms": percentile(99),
+        "max_ms": 1000 * ordered[-1],
+    }
+
+
+def timed(function, iterations, warmup=2):
+    for _ in range(warmup):
+        function()
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies)
+
+
+def _setup(height, width, forward_ms=0.0):
+    """Install the fakes, import the monitor and give it a stub classifier."""
+    from benchmarks import fakes
+
+    screen = fakes.FakeScreen(height, width)
+    fakes.install_fake_mss(screen)
+    presses = fakes.install_fake_pyautogui(screen)
+    import monitor.monitor as monitor_mod
+
+    monitor_mod.classifier = fakes.StubClassifier(forward_ms=forward_ms)
+    monitor_mod.loading_complete = True
+    monitor_mod.ENABLE_REDIRECT = False
+    return monitor_mod, screen, presses
+
+
+def bench_capture(height, width, iterations, args):
+    from benchmarks.fakes import install_fake_foreground_window
+
+    monitor_mod, _, _ = _setup(height, width)
+    results = {
+        "capture_screen": timed(monitor_mod.capture_screen, iterations),
+        "capture_screens_raw": timed(lambda: monitor_mod.capture_screens(raw=True), iterations),
+    }
+    # A browser window covering most of the screen, as in the foreground_window capture mode
+    install_fake_foreground_window((width // 8, height // 10, width * 3 // 4, height * 4 // 5))
+    monitor_mod.CAPTURE_MODE = "foreground_window"
+    results["capture_foreground_raw"] = timed(lambda: monitor_mod.capture_screens(raw=True), iterations)
+    monitor_mod.CAPTURE_MODE = "screen"
+    install_fake_foreground_window(None)
+    return results
+
+
+def bench_preprocess(height, width, iterations, args):
+    import cv2
+    from benchmarks.fakes import synthetic_frame
+    from monitor.frame_gate import FrameChangeGate
+    from monitor.preprocess import FramePreprocessor
+    from utils.phash import dhash
+    import monitor.monitor as monitor_mod
+
+    bgra = synthetic_frame(height, width)
+    rgb = cv2.cvtColor(bgra, cv2.COLOR_BGRA2RGB)
+    preprocessor = FramePreprocessor()
+    gate = FrameChangeGate(threshold=0.005)
+    return {
+        "bgra_to_rgb": timed(lambda: cv2.cvtColor(bgra, cv2.COLOR_BGRA2RGB, dst=rgb), iterations),
+        "to_pil": timed(lambda: monitor_mod._to_pil(bgra), iterations),
+        "fast_preprocess": timed(lambda: preprocessor(bgra), iterations),
+        "dhash": timed(lambda: dhash(bgra), iterations),
+        "frame_gate": timed(lambda: gate.should_classify(bgra), iterations),
+    }
+
+
+def _bench_classify(monitor_mod, screen, iterations):
+    frame = screen.frames["adult"]
+    monitor_mod.VERDICT_CACHE_SIZE = 0
+    monitor_mod.verdict_cache = None
+    uncached = timed(lambda: monitor_mod.has_adult_content(frame), iterations)
+    monitor_mod.VERDICT_CACHE_SIZE = 256
+    monitor_mod.verdict_cache = None
+    cached = timed(lambda: monitor_mod.has_adult_content(frame), iterations)
+    return {"has_adult_content": uncached, "has_adult_content_cached": cached}
+
+
+def bench_classify_stub(height, width, iterations, args):
+    monitor_mod, screen, _ = _setup(height, width, forward_ms=args.stub_forward_ms)
+    return _bench_classify(monitor_mod, screen, iterations)
+
+
+def bench_classify_model(height, width, iterations, args):
+    os.environ["HF_HUB_OFFLINE"] = "1"  # Only the local model cache; never the network
+    monitor_mod, screen, _ = _setup(height, width)
+    monitor_mod.classifier = None
+    monitor_mod.loading_complete = False
+    monitor_mod.load_model()
+    if monitor_mod.classifier is None:
+        return {"skipped": f"model not available offline: {monitor_mod.loading_error}"}
+    return _bench_classify(monitor_mod, screen, iterations)
+
+
+def bench_alert(height, width, iterations, args):
+    monitor_mod, screen, _ = _setup(height, width)
+    workdir = tempfile.mkdtemp(prefix="guard-bench-")
+    monitor_mod.PARENT_MODE = True
+    monitor_mod.PARENT_REPORT_PATH = os.path.join(workdir, "parent_report.jsonl")
+    monitor_mod.PARENT_SCREENSHOT_DIR = os.path.join(workdir, "screenshots")
+    frame = screen.frames["adult"]
+
+    call_latencies, persist_latencies = [], []
+    writer = monitor_mod.get_screenshot_writer()
+    for i in range(iterations):
+        done_before = writer.written + writer.failed
+        start = time.perf_counter()
+        monitor_mod.speak_alert("NSFW", 0.9, monitor=1, frame=frame)
+        call_latencies.append(time.perf_counter() - start)
+        while writer.written + writer.failed == done_before:
+            time.sleep(0.0005)
+        persist_latencies.append(time.perf_counter() - start)
+    stats = writer.stats()
+    monitor_mod.close_screenshot_writer()
+    monitor_mod.close_event_log()
+    return {"speak_alert_call": summarize(call_latencies), "alert_persisted": summarize(persist_latencies),
+            "screenshot_writer": stats}
+
+
+def bench_end_to_end(height, width, iterations, args):
+    import random
+    import threading
+
+    monitor_mod, screen, presses = _setup(height, width, forward_ms=args.stub_forward_ms)
+    monitor_mod.PARENT_MODE = False
+    monitor_mod.SKIP_REPORT_INTERVAL = 0
+    thread = threading.Thread(target=monitor_mod.main, daemon=True)
+    thread.start()
+
+    rng = random.Random(0)
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        time.sleep(rng.uniform(0.5, 1.5))  # Safe content for a while
+        screen.show("adult")
+        shown_at = screen.changed_at
+        pressed = len(presses)
+        deadline = time.perf_counter() + 30
+        while len(presses) == pressed and time.perf_counter() < deadline:
+            time.sleep(0.001)
+        if len(presses) > pressed:
+            latencies.append(presses[pressed][0] - shown_at)
+        else:
+            screen.show("safe")
+    elapsed = time.perf_counter() - started
+    monitor_mod.stop_monitoring()
+    thread.join(10)
+    pipeline_stats = monitor_mod.get_pipeline_stats()
+    return {
+        "detection_latency": summarize(latencies),
+        "missed": iterations - len(latencies),
+        "frames_per_s": pipeline_stats.get("frames_captured", 0) / elapsed,
+        "pipeline": pipeline_stats,
+    }
+
+
+def _run_worker(name, resolution, iterations, args):
+    from monitor.memory import peak_rss_mb
+    width, height = (int(value) for value in resolution.split("x"))
+    result = globals()[f"bench_{name}"](height, width, iterations, args)
+    return {"benchmark": name, "resolution": resolution, "iterations": iterations,
+            "cases": result, "peak_rss_mb": peak_rss_mb()}
+
+
+def run(benchmarks=DEFAULT_BENCHMARKS, resolutions=DEFAULT_RESOLUTIONS, iterations=50, e2e_iterations=10,
+        stub_forward_ms=0.0, verbose=False):
+    """Run each benchmark at each resolution in a subprocess and return the results document."""
+    results = []
+    for name in benchmarks:
+        for resolution in resolutions:
+            with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+                output = f.name
+            command = [sys.executable, "-m", "benchmarks.suite", "--worker", name, resolution, output,
+                       "--iterations", str(e2e_iterations if name == "end_to_end" else iterations),
+                       "--stub-forward-ms", str(stub_forward_ms)]
+            print(f"Running {name} at {resolution}...", flush=True)
+            completed = subprocess.run(command, stdout=None if verbose else subprocess.DEVNULL,
+                                       stderr=None if verbose else subprocess.PIPE, text=True)
+            if completed.returncode == 0:
+                with open(output) as f:
+                    results.append(json.load(f))
+            else:
+                error = (completed.stderr or "").strip().splitlines()[-1:] or [f"exit code {completed.returncode}"]
+                results.append({"benchmark": name, "resolution": resolution, "error": error[0]})
+            os.unlink(output)
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "stub_forward_ms": stub_forward_ms,
+        },
+        "results": results,
+    }
+
+
+def _latency_cases(result):
+    for case, stats in result.get("cases", {}).items():
+        if isinstance(stats, dict) and "n" in stats:
+            yield case, stats
+
+
+def print_results(document, previous=None):
+    baseline = {}
+    if previous:
+        for result in previous["results"]:
+            for case, stats in _latency_cases(result):
+                baseline[(result["benchmark"], result["resolution"], case)] = stats
+    for result in document["results"]:
+        header = f"{result['benchmark']} @ {result['resolution']}"
+        if "error" in result:
+            print(f"{header}: FAILED ({result['error']})")
+            continue
+        if "skipped" in result["cases"]:
+            print(f"{header}: skipped ({result['cases']['skipped']})")
+            continue
+        print(f"{header}  (peak RSS {result['peak_rss_mb']:.0f} MB)")
+        for case, stats in _latency_cases(result):
+            if not stats.get("n"):
+                print(f"  {case:<26} no samples")
+                continue
+            line = (f"  {case:<26} {stats['throughput_per_s']:9.1f}/s  p50 {stats['p50_ms']:8.2f} ms"
+                    f"  p95 {stats['p95_ms']:8.2f} ms  p99 {stats['p99_ms']:8.2f} ms")
+            old = baseline.get((result["benchmark"], result["resolution"], case))
+            if old and old.get("p50_ms"):
+                line += f"  (p50 x{stats['p50_ms'] / old['p50_ms']:.2f} vs previous)"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--benchmarks", nargs="+", choices=BENCHMARKS, default=list(DEFAULT_BENCHMARKS))
+    parser.add_argument("--real-model", action="store_true", help="Also run classify_model")
+    parser.add_argument("--resolutions", nargs="+", default=list(DEFAULT_RESOLUTIONS), help="WIDTHxHEIGHT")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--e2e-iterations", type=int, default=10, help="Detections measured by end_to_end")
+    parser.add_argument("--stub-forward-ms", type=float, default=0.0, help="Emulated model time per stub forward pass")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Previous results JSON to compare p50 latencies against")
+    parser.add_argument("--verbose", action="store_true", help="Show the monitor's output")
+    parser.add_argument("--worker", nargs=3, metavar=("BENCHMARK", "RESOLUTION", "OUTPUT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        name, resolution, output = args.worker
+        result = _run_worker(name, resolution, args.iterations, args)
+        with open(output, "w") as f:
+            json.dump(result, f)
+        os._exit(0)  # Do not wait for daemon threads of the monitor
+
+    benchmarks = list(args.benchmarks)
+    if args.real_model and "classify_model" not in benchmarks:
+        benchmarks.append("classify_model")
+    document = run(benchmarks, args.resolutions, args.iterations, args.e2e_iterations, args.stub_forward_ms, args.verbose)
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+    print_results(document, previous)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(document, f, indent=2)
+        print(f"Results saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
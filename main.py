@@ -1,9 +1,12 @@
+from utils.startup import startup_report
+startup_report.install_import_timer()
 import customtkinter as ctk
 import threading
 import sys
 import os
 import json
-from monitor import main, stop_monitoring, load_model, loading_complete, loading_error, set_nsfw_threshold, NSFW_THRESHOLD
+from monitor import main, stop_monitoring, load_model, set_nsfw_threshold, NSFW_THRESHOLD
+import monitor.monitor as monitor_mod
 from utils import setup_auto_start, get_close_tab_action, set_close_tab_action
 import pystray
 from pystray import Menu, MenuItem
@@ -26,6 +29,8 @@ __version__ = "1.0"
 __publisher__ = "Automnex Team"
 __publish_date__ = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
 
+startup_report.mark("imports")
+
 class App:
     def __init__(self, root: ctk.CTk) -> None:
         self.root = root
@@ -65,11 +70,14 @@ class App:
         self.parent_mode = False
         self.parent_password = ""
         self.parent_mode_first_time = True
+        self.monitor_settings = {}
+        self.thread_tuning = None
 
         # Config setup
         self.config_dir = Path.home() / ".Guard"
         self.config_dir.mkdir(exist_ok=True)
         self.config_path = self.config_dir / "config.json"
+        startup_report.path = self.config_dir / "startup_report.json"
         self.load_config()
 
         # Show window only on first run (isStarted=False and not background)
@@ -77,6 +85,7 @@ class App:
             self.root.deiconify()
             self.root.update()
             self.is_visible = True
+            startup_report.mark("first_window")
             logging.info("First run: Window shown")
         else:
             self.root.withdraw()
@@ -98,7 +107,7 @@ class App:
             self.main_frame, fg_color="#1e1e1e", corner_radius=20, border_width=2, border_color="#3a3a3a"
         )
         self.box_frame.grid(row=0, column=0, sticky="nsew", padx=40, pady=40)
-        self.box_frame.grid_rowconfigure((0, 1, 2, 3, 4, 5), weight=0)
+        self.box_frame.grid_rowconfigure((0, 1, 2, 3, 4, 5, 6), weight=0)
         self.box_frame.grid_columnconfigure((0, 1), weight=1)
 
         # Title
@@ -124,18 +133,22 @@ class App:
         self.loader_label = ctk.CTkLabel(self.box_frame, text="", font=ctk.CTkFont("Segoe UI", 12))
         self.loader_label.grid(row=3, column=0, columnspan=2, pady=(0, 10), padx=10, sticky="n")
 
+        # Live monitor metrics (scan rate, latency, alerts) while running
+        self.metrics_label = ctk.CTkLabel(self.box_frame, text="", font=ctk.CTkFont("Segoe UI", 11), text_color="#888")
+        self.metrics_label.grid(row=4, column=0, columnspan=2, pady=(0, 5), padx=10, sticky="n")
+
         # Background checkbox
         self.background_check = ctk.CTkCheckBox(
             self.box_frame, text="Run in Background", variable=self.run_in_background, command=self.update_background,
             font=ctk.CTkFont("Segoe UI", 12), checkbox_height=22, checkbox_width=22, corner_radius=6, border_width=2
         )
-        self.background_check.grid(row=4, column=0, columnspan=2, pady=10, padx=10, sticky="n")
+        self.background_check.grid(row=5, column=0, columnspan=2, pady=10, padx=10, sticky="n")
 
         # Footer
         self.footer = ctk.CTkLabel(
             self.box_frame, text="© 2025 Guard", font=ctk.CTkFont("Segoe UI", 10), text_color="#888"
         )
-        self.footer.grid(row=5, column=0, columnspan=2, pady=(15, 5), padx=10, sticky="n")
+        self.footer.grid(row=6, column=0, columnspan=2, pady=(15, 5), padx=10, sticky="n")
 
         # Settings Button
         self.settings_button = ctk.CTkButton(
@@ -147,6 +160,7 @@ class App:
         # Window close handler
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         self.setup_tray()
+        startup_report.mark("tray_ready")
 
         # Auto-start monitoring if isStarted=True
         if self.isStarted and self.status != "Running":
@@ -177,6 +191,8 @@ class App:
                     self.parent_mode = config.get("parent_mode", default_config["parent_mode"])
                     self.parent_password = config.get("parent_password", default_config["parent_password"])
                     self.parent_mode_first_time = config.get("parent_mode_first_time", default_config["parent_mode_first_time"])
+                    self.monitor_settings = config.get("monitor", {})
+                    self.thread_tuning = config.get("thread_tuning")
                     set_close_tab_action(close_tab_action)
                     logging.info(f"Loaded config: nsfw_threshold={NSFW_THRESHOLD}, close_tab_action={close_tab_action}, isStarted={self.isStarted}, motivational_url={self.motivational_url}, enable_redirect={self.enable_redirect}, parent_mode={self.parent_mode}, parent_mode_first_time={self.parent_mode_first_time}")
             else:
@@ -202,6 +218,17 @@ class App:
             set_close_tab_action(default_config["close_tab_action"])
             self.save_config(NSFW_THRESHOLD, get_close_tab_action(), self.isStarted, self.motivational_url, self.enable_redirect, self.parent_mode, self.parent_password, self.parent_mode_first_time)
 
+    def load_thread_tuning(self):
+        """Re-read the "thread_tuning" section from config.json, keeping the last value if it cannot be read."""
+        try:
+            with open(self.config_path, 'r') as f:
+                self.thread_tuning = json.load(f).get("thread_tuning")
+        except FileNotFoundError:
+            self.thread_tuning = None
+        except Exception as e:
+            logging.error(f"Error reading thread tuning from {self.config_path}: {e}")
+        return self.thread_tuning
+
     def save_config(self, threshold: float, close_tab_action: list, is_started: bool, motivational_url: str, enable_redirect: bool, parent_mode: bool, parent_password: str, parent_mode_first_time: bool) -> None:
         try:
             config = {
@@ -212,8 +239,13 @@ class App:
                 "enable_redirect": enable_redirect,
                 "parent_mode": parent_mode,
                 "parent_password": parent_password,
-                "parent_mode_first_time": parent_mode_first_time
+                "parent_mode_first_time": parent_mode_first_time,
+                "monitor": self.monitor_settings
             }
+            # Written by python -m monitor.thread_tuning, possibly while the app is open, so keep what is on disk
+            thread_tuning = self.load_thread_tuning()
+            if thread_tuning:
+                config["thread_tuning"] = thread_tuning
             with open(self.config_path, 'w') as f:
                 json.dump(config, f, indent=2)
             logging.info(f"Saved config to {self.config_path}: {config}")
@@ -263,10 +295,13 @@ class App:
             self.root.lift()
             self.root.update()
             self.is_visible = True
+            startup_report.mark("first_window")
             logging.info("Window shown via toggle")
 
     def exit_app(self, icon=None, item=None) -> None:
         stop_monitoring()
+        startup_report.uninstall_import_timer()
+        startup_report.save()
         if self.running_thread and self.running_thread.is_alive():
             self.running_thread.join(timeout=2)
         self.save_config(NSFW_THRESHOLD, get_close_tab_action(), False, self.motivational_url, self.enable_redirect, self.parent_mode, self.parent_password, self.parent_mode_first_time)
@@ -398,8 +433,12 @@ class App:
         def load_model_thread():
             try:
                 start_time = time.time()
-                load_model()
+                monitor_mod.apply_thread_tuning(self.load_thread_tuning())  # The tuner may have run since startup
+                monitor_mod.apply_settings(self.monitor_settings)  # Before loading, so the backend choice applies
+                load_model(progress_callback=lambda percent, message: self.root.after(
+                    0, lambda: self.loader_label.configure(text=message, text_color="lightgray")))
                 elapsed_time = time.time() - start_time
+                startup_report.mark("model_loaded")
                 self.root.after(0, lambda: self.handle_model_loaded(elapsed_time))
             except Exception as e:
                 self.root.after(0, lambda: self.handle_model_error(str(e)))
@@ -408,18 +447,18 @@ class App:
         self.running_thread.start()
 
     def handle_model_loaded(self, elapsed_time: float) -> None:
-        if loading_error:
-            self.handle_model_error(loading_error)
+        if monitor_mod.loading_error:
+            self.handle_model_error(monitor_mod.loading_error)
         else:
             logging.info(f"Model loaded in {elapsed_time:.2f} seconds")
             self.model_loaded_once = True
             # Pass motivational_url and enable_redirect and parent_mode to monitor
-            import monitor.monitor as monitor_mod
             monitor_mod.MOTIVATIONAL_URL = self.motivational_url
             monitor_mod.ENABLE_REDIRECT = self.enable_redirect
             monitor_mod.PARENT_MODE = self.parent_mode
-            monitor_mod.PARENT_REPORT_PATH = str(self.config_dir / "parent_report.json")
+            monitor_mod.PARENT_REPORT_PATH = str(self.config_dir / "parent_report.jsonl")
             monitor_mod.PARENT_SCREENSHOT_DIR = str(self.config_dir / "screenshots")
+            monitor_mod.METRICS_PATH = str(self.config_dir / "metrics.json")
             self.running_thread = threading.Thread(target=main, daemon=True)
             self.running_thread.start()
             self.status = "Running"
@@ -427,6 +466,7 @@ class App:
             self.start_stop_button.configure(text="Stop", state="normal")
             self.loader_label.configure(text=f"Model loaded in {elapsed_time:.2f} seconds", text_color="green")
             self.update_tray_status()
+            self.root.after(2000, self.update_metrics_status)
             if self.run_in_background.get():
                 setup_auto_start(True, self.script_path)
                 if self.is_visible:
@@ -434,6 +474,16 @@ class App:
             self.isStarted = True
             self.save_config(NSFW_THRESHOLD, get_close_tab_action(), self.isStarted, self.motivational_url, self.enable_redirect, self.parent_mode, self.parent_password, self.parent_mode_first_time)
 
+    def update_metrics_status(self) -> None:
+        if self.status != "Running":
+            self.metrics_label.configure(text="")
+            return
+        try:
+            self.metrics_label.configure(text=monitor_mod.get_status_line())
+        except Exception as e:
+            logging.debug(f"Metrics status unavailable: {e}")
+        self.root.after(2000, self.update_metrics_status)
+
     def handle_model_error(self, error_msg: str) -> None:
         self.status = "Stopped"
         self.status_label.configure(text=f"Status: {self.status}")
@@ -452,6 +502,7 @@ class App:
             self.status_label.configure(text=f"Status: {self.status}")
             self.start_stop_button.configure(text="Start", state="normal")
             self.loader_label.configure(text="")
+            self.metrics_label.configure(text="")
             self.update_tray_status()
             self.isStarted = False
             self.save_config(NSFW_THRESHOLD, get_close_tab_action(), self.isStarted, self.motivational_url, self.enable_redirect, self.parent_mode, self.parent_password, self.parent_mode_first_time)
@@ -0,0 +1,212 @@
+"""Local, pre-resolved copy of the classifier under ~/.Guard/models.
+
+The first load resolves the model through the transformers auto classes (which need
+the network and the auto-factory scan that breaks in frozen builds, see problem.txt)
+and saves:
+
+- model/: weights (safetensors), config and image-processor config
+- traced.pt: a TorchScript trace of the model for the torchscript backend
+- manifest.json: model and processor class names, library versions, and size, mtime
+  and sha256 of every file
+
+Later loads read the manifest and instantiate the concrete classes it names straight
+from disk, with no network access and no auto-factory.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_FORMAT = 1
+DEFAULT_ROOT = Path.home() / ".Guard" / "models"
+MANIFEST_NAME = "manifest.json"
+
+
+def _sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _file_record(path):
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": _sha256(path)}
+
+
+class ModelArtifact:
+    """A verified artifact directory; see the module docstring for its layout."""
+
+    def __init__(self, path, manifest):
+        self.path = Path(path)
+        self.manifest = manifest
+
+    @property
+    def model_dir(self):
+        return self.path / "model"
+
+    @property
+    def id2label(self):
+        return {int(k): v for k, v in self.manifest["id2label"].items()}
+
+    def load_processor(self):
+        import transformers
+        processor_class = getattr(transformers, self.manifest["processor_class"])
+        return processor_class.from_pretrained(self.model_dir, local_files_only=True)
+
+    def load_model(self, mmap=False, **kwargs):
+        """Instantiate the model; with `mmap` its weights stay memory-mapped from model.safetensors.
+
+        Memory-mapped weights are read from disk as they are first used, and their
+        pages are backed by the file, so the OS can share and reclaim them instead of
+        holding a private copy. If the model cannot be built that way it is loaded
+        normally.
+        """
+        import transformers
+        model_class = getattr(transformers, self.manifest["model_class"])
+        if mmap and not kwargs:
+            model = self._load_mmap(model_class)
+            if model is not None:
+                return model
+        return model_class.from_pretrained(self.model_dir, local_files_only=True, **kwargs).eval()
+
+    def _load_mmap(self, model_class):
+        import torch
+        from safetensors import safe_open
+        weights_path = self.model_dir / "model.safetensors"
+        if not weights_path.exists():
+            return None
+        config = model_class.config_class.from_pretrained(self.model_dir, local_files_only=True)
+        # Build the module tree without allocating weights, then adopt the mapped tensors as parameters
+        with torch.device("meta"):
+            model = model_class(config)
+        with safe_open(str(weights_path), framework="pt") as f:
+            state = {name: f.get_tensor(name) for name in f.keys()}
+        model.load_state_dict(state, strict=False, assign=True)
+        model.tie_weights()
+        leftover = [name for name, tensor in [*model.named_parameters(), *model.named_buffers()] if tensor.is_meta]
+        if leftover:
+            logger.warning(f"Memory-mapped load left {len(leftover)} tensors unset (e.g. {leftover[0]}), loading normally")
+            return None
+        return model.eval()
+
+    def load_traced(self):
+        import torch
+        traced_path = self.path / "traced.pt"
+        if not traced_path.exists():
+            raise FileNotFoundError(f"No traced graph in {self.path}")
+        return torch.jit.load(str(traced_path), map_location="cpu").eval()
+
+
+def artifact_path(model_name, root=DEFAULT_ROOT):
+    return Path(root) / model_name.replace("/", "--")
+
+
+def verify_artifact(path):
+    """Return the manifest if every file matches it, else None.
+
+    Sizes are always compared; a file is rehashed only when its mtime no longer
+    matches, so the common case does not read hundreds of MB at startup.
+    """
+    path = Path(path)
+    try:
+        with open(path / MANIFEST_NAME) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("format") != ARTIFACT_FORMAT:
+        return None
+    for name, record in manifest.get("files", {}).items():
+        file_path = path / name
+        try:
+            stat = file_path.stat()
+        except OSError:
+            return None
+        if stat.st_size != record["size"]:
+            return None
+        if stat.st_mtime_ns != record["mtime_ns"] and _sha256(file_path) != record["sha256"]:
+            return None
+    return manifest
+
+
+def build_artifact(model_name, path, trace=True, progress=None):
+    """Resolve `model_name` through the hub and write a fresh artifact to `path`.
+
+    The artifact is assembled in a temporary sibling directory and moved into place
+    at the end, so an interrupted build never leaves a half-written artifact.
+    `progress(message)` is called at each stage.
+    """
+    import torch
+    import transformers
+    from transformers import AutoImageProcessor, AutoModelForImageClassification
+
+    def report(message):
+        logger.info(message)
+        if progress:
+            progress(message)
+
+    path = Path(path)
+    staging = path.with_name(path.name + ".building")
+    shutil.rmtree(staging, ignore_errors=True)
+    (staging / "model").mkdir(parents=True)
+
+    report("Downloading model...")
+    processor = AutoImageProcessor.from_pretrained(model_name)
+    model = AutoModelForImageClassification.from_pretrained(model_name).eval()
+
+    report("Saving local model copy...")
+    model.save_pretrained(staging / "model", safe_serialization=True)
+    processor.save_pretrained(staging / "model")
+
+    if trace:
+        report("Tracing optimized graph...")
+        try:
+            size = processor.size
+            example = torch.zeros(1, 3, size["height"], size["width"])
+            traced_model = model.__class__.from_pretrained(staging / "model", torchscript=True).eval()
+            with torch.no_grad():
+                traced = torch.jit.freeze(torch.jit.trace(traced_model, example))
+            traced.save(str(staging / "traced.pt"))
+        except Exception as e:
+            # The traced graph only serves the torchscript backend; the rest of the artifact is still usable
+            logger.warning(f"Tracing failed, artifact will not include traced.pt: {e}")
+
+    report("Writing integrity metadata...")
+    files = {str(p.relative_to(staging).as_posix()): _file_record(p) for p in sorted(staging.rglob("*")) if p.is_file()}
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "model_name": model_name,
+        "model_class": type(model).__name__,
+        "processor_class": type(processor).__name__,
+        "id2label": {str(k): v for k, v in model.config.id2label.items()},
+        "torch_version": torch.__version__,
+        "transformers_version": transformers.__version__,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "files": files,
+    }
+    with open(staging / MANIFEST_NAME, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(staging, path)
+    return ModelArtifact(path, manifest)
+
+
+def load_or_build_artifact(model_name, root=DEFAULT_ROOT, require_trace=False, progress=None):
+    """Return the verified local artifact for `model_name`, building it on first use.
+
+    With `require_trace`, an otherwise valid artifact without traced.pt is rebuilt.
+    """
+    path = artifact_path(model_name, root)
+    manifest = verify_artifact(path)
+    if manifest is not None and (not require_trace or "traced.pt" in manifest["files"]):
+        return ModelArtifact(path, manifest)
+    if path.exists():
+        logger.warning(f"Model cache at {path} is incomplete or failed verification, rebuilding")
+    return build_artifact(model_name, path, progress=progress)
@@ -0,0 +1,231 @@
+"""Inference engines behind `monitor.classifier`.
+
+Every backend is called like the transformers image-classification pipeline (which
+they replace) with a list of PIL images, `backend(images, batch_size=n)`, and returns one list of
+{"label", "score"} dicts per image, sorted by descending score.
+
+Backends also expose `preprocessor` (a FramePreprocessor matching the model's image
+processor) and `predict_pixel_values(pixel_values, batch_size)`, which skips the
+image processor and takes an already normalized NxCxHxW float32 array.
+"""
+from pathlib import Path
+
+import numpy as np
+
+from .preprocess import FramePreprocessor
+
+DEFAULT_CACHE_DIR = Path.home() / ".Guard" / "models"
+
+
+def _format_results(logits, id2label):
+    logits = logits.astype(np.float64)
+    logits -= logits.max(axis=1, keepdims=True)
+    probs = np.exp(logits)
+    probs /= probs.sum(axis=1, keepdims=True)
+    results = []
+    for row in probs:
+        order = np.argsort(row)[::-1]
+        results.append([{"label": id2label[int(i)], "score": float(row[i])} for i in order])
+    return results
+
+
+def _chunks(array, batch_size):
+    batch_size = max(1, int(batch_size))
+    for start in range(0, len(array), batch_size):
+        yield array[start:start + batch_size]
+
+
+class _ProcessorBackend:
+    """Runs the HF image processor itself and turns logits into pipeline-style results.
+
+    With an `artifact` (see monitor.artifact) the processor and model come from the
+    local copy through their concrete classes, with memory-mapped weights if
+    `mmap_weights`; otherwise they are resolved from the hub through the transformers
+    auto classes.
+    """
+
+    name = None
+
+    def __init__(self, model_name, artifact=None, mmap_weights=False, **kwargs):
+        self.artifact = artifact
+        self.mmap_weights = mmap_weights
+        if artifact is not None:
+            self.processor = artifact.load_processor()
+            self.id2label = artifact.id2label
+        else:
+            from transformers import AutoImageProcessor
+            self.processor = AutoImageProcessor.from_pretrained(model_name)
+            self.id2label = {}
+        self.preprocessor = FramePreprocessor.from_processor(self.processor)
+
+    def _load_model(self, model_name):
+        if self.artifact is not None:
+            return self.artifact.load_model(mmap=self.mmap_weights)
+        from transformers import AutoModelForImageClassification
+        model = AutoModelForImageClassification.from_pretrained(model_name).eval()
+        self.id2label = model.config.id2label
+        return model
+
+    def _logits(self, pixel_values):
+        raise NotImplementedError
+
+    def __call__(self, images, batch_size=1):
+        results = []
+        for chunk in _chunks(images, batch_size):
+            pixel_values = self.processor(chunk, return_tensors="np")["pixel_values"].astype(np.float32)
+            results.extend(_format_results(self._logits(pixel_values), self.id2label))
+        return results
+
+    def predict_pixel_values(self, pixel_values, batch_size=1):
+        results = []
+        for chunk in _chunks(pixel_values, batch_size):
+            results.extend(_format_results(self._logits(chunk), self.id2label))
+        return results
+
+
+class TransformersBackend(_ProcessorBackend):
+    """The fp32 transformers model on torch."""
+
+    name = "transformers"
+
+    def __init__(self, model_name, artifact=None, device="cpu", **kwargs):
+        super().__init__(model_name, artifact, **kwargs)
+        import torch
+        self.model = self._load_model(model_name).to(device)
+        self._torch = torch
+
+    def _logits(self, pixel_values):
+        with self._torch.inference_mode():
+            inputs = self._torch.from_numpy(pixel_values).to(self.model.device)
+            return self.model(pixel_values=inputs).logits.cpu().numpy()
+
+
+class TorchScriptBackend(_ProcessorBackend):
+    """The frozen TorchScript trace stored in the local model artifact."""
+
+    name = "torchscript"
+
+    def __init__(self, model_name, artifact=None, **kwargs):
+        if artifact is None:
+            raise ValueError("The torchscript backend needs the local model artifact (use_model_artifact)")
+        super().__init__(model_name, artifact)
+        import torch
+        self.model = artifact.load_traced()
+        self._torch = torch
+
+    def _logits(self, pixel_values):
+        with self._torch.inference_mode():
+            return self.model(self._torch.from_numpy(pixel_values))[0].numpy()
+
+
+class QuantizedTorchBackend(_ProcessorBackend):
+    """The same model with its Linear layers dynamically quantized to int8 on torch CPU."""
+
+    name = "int8"
+
+    def __init__(self, model_name, artifact=None, **kwargs):
+        super().__init__(model_name, artifact, **kwargs)
+        import torch
+        model = self._load_model(model_name)
+        self.model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self._torch = torch
+
+    def _logits(self, pixel_values):
+        with self._torch.inference_mode():
+            return self.model(pixel_values=self._torch.from_numpy(pixel_values)).logits.numpy()
+
+
+class OnnxBackend(_ProcessorBackend):
+    """ONNX Runtime on CPU, using a graph exported once into the model cache directory.
+
+    With `quantize=True` the exported graph is also dynamically quantized to int8.
+    `intra_op_threads` / `inter_op_threads` size ONNX Runtime's thread pools (None
+    keeps its defaults). Requires the optional `onnxruntime` package.
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_name, artifact=None, cache_dir=DEFAULT_CACHE_DIR, quantize=False,
+                 intra_op_threads=None, inter_op_threads=None, **kwargs):
+        super().__init__(model_name, artifact)
+        try:
+            import onnxruntime
+        except ImportError as e:
+            raise ImportError("The onnx backend needs onnxruntime: pip install onnxruntime") from e
+        if artifact is not None:
+            export_dir = artifact.path / "onnx"
+        else:
+            from transformers import AutoConfig
+            self.id2label = AutoConfig.from_pretrained(model_name).id2label
+            export_dir = Path(cache_dir) / model_name.replace("/", "--") / "onnx"
+        onnx_path = export_dir / ("model.int8.onnx" if quantize else "model.onnx")
+        if not onnx_path.exists():
+            self._export(model_name, export_dir, quantize)
+        options = onnxruntime.SessionOptions()
+        if intra_op_threads:
+            options.intra_op_num_threads = int(intra_op_threads)
+        if inter_op_threads:
+            options.inter_op_num_threads = int(inter_op_threads)
+        self.session = onnxruntime.InferenceSession(str(onnx_path), options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def _export(self, model_name, export_dir, quantize):
+        import torch
+        export_dir.mkdir(parents=True, exist_ok=True)
+        fp32_path = export_dir / "model.onnx"
+        if not fp32_path.exists():
+            model = self._load_model(model_name)
+            size = self.processor.size
+            dummy = torch.zeros(1, 3, size["height"], size["width"])
+            torch.onnx.export(
+                model, (dummy,), str(fp32_path), input_names=["pixel_values"], output_names=["logits"],
+                dynamic_axes={"pixel_values": {0: "batch"}, "logits": {0: "batch"}}, opset_version=17,
+            )
+        if quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            quantize_dynamic(str(fp32_path), str(export_dir / "model.int8.onnx"), weight_type=QuantType.QInt8)
+
+    def _logits(self, pixel_values):
+        return self.session.run(None, {self.input_name: np.ascontiguousarray(pixel_values)})[0]
+
+
+class QuantizedOnnxBackend(OnnxBackend):
+    name = "onnx-int8"
+
+    def __init__(self, model_name, **kwargs):
+        kwargs["quantize"] = True
+        super().__init__(model_name, **kwargs)
+
+
+BACKENDS = {backend.name: backend for backend in (
+    TransformersBackend, TorchScriptBackend, QuantizedTorchBackend, OnnxBackend, QuantizedOnnxBackend,
+)}
+
+
+def create_backend(name, model_name, artifact=None, **kwargs):
+    """Instantiate the backend registered under `name` (see BACKENDS)."""
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown inference backend '{name}', expected one of: {', '.join(BACKENDS)}") from None
+    return backend_class(model_name, artifact=artifact, **kwargs)
+
+
+def check_parity(reference, candidate, images, label="nsfw", tolerance=0.05, batch_size=8):
+    """Compare the `label` scores two backends give the same images.
+
+    Returns a dict with the max/mean absolute score difference and whether every
+    difference is within `tolerance`.
+    """
+    def scores(backend):
+        return np.array([next((r["score"] for r in results if r["label"] == label), 0.0)
+                         for results in backend(images, batch_size=batch_size)])
+
+    diff = np.abs(scores(reference) - scores(candidate))
+    return {
+        "images": len(images),
+        "max_abs_diff": float(diff.max()) if len(diff) else 0.0,
+        "mean_abs_diff": float(diff.mean()) if len(diff) else 0.0,
+        "tolerance": tolerance,
+        "passed": bool((diff <= tolerance).all()),
+    }
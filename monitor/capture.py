@@ -0,0 +1,126 @@
+import threading
+
+import cv2
+import mss
+import numpy as np
+
+
+class ScreenCapture:
+    """Long-lived mss session that grabs monitors into reusable RGB buffers.
+
+    mss sessions are bound to the thread that opened them, so each thread needs its
+    own instance (see `get_screen_capture`). Each monitor has its own buffer, and the
+    array returned by `grab()` is overwritten by the next grab of the same monitor;
+    copy it if it has to outlive the current frame.
+    """
+
+    def __init__(self, monitor_index=1):
+        self.monitor_index = monitor_index
+        self._sct = mss.mss()
+        self._buffers = {}
+
+    def monitor_indices(self):
+        """Indices of the individual monitors (mss index 0 is the combined virtual screen)."""
+        return list(range(1, len(self._sct.monitors)))
+
+    def grab_bgra(self, monitor_index=None):
+        """Grab a monitor as a zero-copy HxWx4 BGRA view of mss's own buffer.
+
+        mss allocates a fresh buffer per grab, so unlike `grab()` the result stays
+        valid after later grabs and can be handed to other threads as is.
+        """
+        index = self.monitor_index if monitor_index is None else monitor_index
+        shot = self._sct.grab(self._sct.monitors[index])
+        return np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+
+    def grab(self, monitor_index=None):
+        index = self.monitor_index if monitor_index is None else monitor_index
+        bgra = self.grab_bgra(index)
+        rgb = self._buffers.get(index)
+        if rgb is None or rgb.shape[:2] != bgra.shape[:2]:
+            rgb = np.empty((*bgra.shape[:2], 3), dtype=np.uint8)
+            self._buffers[index] = rgb
+        cv2.cvtColor(bgra, cv2.COLOR_BGRA2RGB, dst=rgb)
+        return rgb
+
+    def grab_all(self, monitor_indices=None, raw=False):
+        """Grab several monitors (all by default) as a list of (monitor_index, frame).
+
+        Frames are RGB buffers from `grab()`, or BGRA views from `grab_bgra()` if `raw`.
+        """
+        available = self.monitor_indices()
+        indices = [i for i in monitor_indices if i in available] if monitor_indices else available
+        grab = self.grab_bgra if raw else self.grab
+        return [(index, grab(index)) for index in indices]
+
+    def monitor_at(self, left, top, width, height):
+        """Index of the monitor that contains the centre of a rectangle, or None if none does."""
+        x, y = left + width // 2, top + height // 2
+        for index in self.monitor_indices():
+            monitor = self._sct.monitors[index]
+            if monitor["left"] <= x < monitor["left"] + monitor["width"] and monitor["top"] <= y < monitor["top"] + monitor["height"]:
+                return index
+        return None
+
+    def grab_foreground(self, raw=False):
+        """Grab only the foreground window as [(monitor_index, frame)], or None if it cannot be located.
+
+        The window rectangle (see monitor.window) is clipped to the monitor holding its
+        centre, which is also the reported index. Frames are fresh BGRA arrays if `raw`,
+        otherwise RGB in a reusable buffer as with `grab()`.
+        """
+        from .window import MIN_WINDOW_SIDE, foreground_window_rect
+        rect = foreground_window_rect()
+        if rect is None:
+            return None
+        index = self.monitor_at(*rect)
+        if index is None:
+            return None
+        monitor = self._sct.monitors[index]
+        left, top = max(rect[0], monitor["left"]), max(rect[1], monitor["top"])
+        right = min(rect[0] + rect[2], monitor["left"] + monitor["width"])
+        bottom = min(rect[1] + rect[3], monitor["top"] + monitor["height"])
+        if right - left < MIN_WINDOW_SIDE or bottom - top < MIN_WINDOW_SIDE:
+            return None
+        shot = self._sct.grab({"left": left, "top": top, "width": right - left, "height": bottom - top})
+        bgra = np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+        if raw:
+            return [(index, bgra)]
+        rgb = self._buffers.get("foreground")
+        if rgb is None or rgb.shape[:2] != bgra.shape[:2]:
+            rgb = np.empty((*bgra.shape[:2], 3), dtype=np.uint8)
+            self._buffers["foreground"] = rgb
+        cv2.cvtColor(bgra, cv2.COLOR_BGRA2RGB, dst=rgb)
+        return [(index, rgb)]
+
+    def close(self):
+        if self._sct is not None:
+            self._sct.close()
+            self._sct = None
+        self._buffers.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_sessions = threading.local()
+
+
+def get_screen_capture():
+    """Return the calling thread's capture session, opening it on first use."""
+    capture = getattr(_sessions, "capture", None)
+    if capture is None:
+        capture = ScreenCapture()
+        _sessions.capture = capture
+    return capture
+
+
+def close_screen_capture():
+    """Close the calling thread's capture session, if it has one."""
+    capture = getattr(_sessions, "capture", None)
+    if capture is not None:
+        capture.close()
+        _sessions.capture = None
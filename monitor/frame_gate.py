@@ -0,0 +1,54 @@
+import cv2
+import numpy as np
+
+
+class FrameChangeGate:
+    """Skips classification of frames that barely differ from the last classified one.
+
+    Each frame is reduced to a small grayscale signature (area downsample), and the
+    fraction of signature cells whose brightness moved by more than `pixel_tolerance`
+    is compared against `threshold`. The reference signature only advances when a
+    frame is let through, so slow drift still adds up to a reclassification.
+    """
+
+    def __init__(self, threshold=0.005, size=(64, 36), pixel_tolerance=8):
+        self.threshold = float(threshold)
+        self.size = tuple(size)
+        self.pixel_tolerance = float(pixel_tolerance)
+        self._reference = None
+        self.frames_seen = 0
+        self.frames_skipped = 0
+        self.last_change = 1.0
+
+    def signature(self, frame):
+        # Resize the whole frame and drop alpha afterwards: slicing first would copy the full frame
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)[..., :3]
+        # Averaging the colour channels keeps the signature independent of RGB/BGR order
+        return small.mean(axis=2, dtype=np.float32)
+
+    def change_ratio(self, signature):
+        if self._reference is None or self._reference.shape != signature.shape:
+            return 1.0
+        return float(np.count_nonzero(np.abs(signature - self._reference) > self.pixel_tolerance)) / signature.size
+
+    def should_classify(self, frame):
+        self.frames_seen += 1
+        signature = self.signature(frame)
+        self.last_change = self.change_ratio(signature)
+        if self.last_change < self.threshold:
+            self.frames_skipped += 1
+            return False
+        self._reference = signature
+        return True
+
+    def reset(self):
+        """Forget the reference frame so the next frame is always classified."""
+        self._reference = None
+
+    def stats(self):
+        return {
+            "frames_seen": self.frames_seen,
+            "frames_skipped": self.frames_skipped,
+            "skip_ratio": self.frames_skipped / self.frames_seen if self.frames_seen else 0.0,
+            "last_change": self.last_change,
+        }
@@ -0,0 +1,65 @@
+import ctypes
+import gc
+import platform
+import statistics
+import sys
+from collections import deque
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB."""
+    import psutil
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process since it started, in MB, as reported by the OS."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:  # Windows
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+
+
+def trim_memory():
+    """Collect garbage and, on glibc, hand freed heap pages back to the OS."""
+    gc.collect()
+    if platform.system() == "Linux":
+        try:
+            ctypes.CDLL("libc.so.6").malloc_trim(0)
+        except (OSError, AttributeError):
+            pass  # Not glibc (e.g. musl)
+
+
+class MemoryWatcher:
+    """Samples RSS and reports current, steady-state and peak memory against an optional budget.
+
+    The steady-state figure is the median of the last `window` samples, so a single
+    load or reload spike does not move it; the peak is the OS's figure for the whole
+    process lifetime, model loading included. `over_budget()` is true while the latest
+    sample exceeds `budget_mb` (None means no budget).
+    """
+
+    def __init__(self, budget_mb=None, window=20):
+        self.budget_mb = budget_mb
+        self._samples = deque(maxlen=max(1, int(window)))
+        self.peak_mb = 0.0
+
+    def sample(self):
+        rss = current_rss_mb()
+        self._samples.append(rss)
+        self.peak_mb = max(self.peak_mb, rss)
+        return rss
+
+    def over_budget(self):
+        return bool(self.budget_mb) and bool(self._samples) and self._samples[-1] > self.budget_mb
+
+    def stats(self):
+        return {
+            "rss_mb": self._samples[-1] if self._samples else None,
+            "steady_rss_mb": statistics.median(self._samples) if self._samples else None,
+            "peak_rss_mb": max(self.peak_mb, peak_rss_mb()) if self._samples else None,
+            "budget_mb": self.budget_mb,
+        }
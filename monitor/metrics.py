@@ -0,0 +1,168 @@
+"""In-process metrics for the monitor loop.
+
+`metrics` collects per-stage timers (rolling windows with percentiles and a
+bucketed histogram), counters and gauges. The monitor writes a snapshot to a
+JSON file periodically, and can serve it on a loopback-only HTTP port:
+
+    curl http://127.0.0.1:<port>/metrics
+"""
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Upper bounds (ms) of the histogram buckets; the last bucket is everything slower
+HISTOGRAM_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class RollingTimer:
+    """The last `window` durations of one stage, plus totals since start."""
+
+    def __init__(self, window=1000):
+        self._samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        self._samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+
+    def stats(self):
+        samples = sorted(self._samples)
+        if not samples:
+            return {"count": self.count}
+
+        def percentile(p):
+            return 1000 * samples[min(len(samples) - 1, int(p / 100 * len(samples)))]
+
+        histogram = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        bucket = 0
+        for sample in samples:
+            while bucket < len(HISTOGRAM_BUCKETS_MS) and 1000 * sample > HISTOGRAM_BUCKETS_MS[bucket]:
+                bucket += 1
+            histogram[bucket] += 1
+        return {
+            "count": self.count,
+            "total_s": self.total,
+            "mean_ms": 1000 * sum(samples) / len(samples),
+            "p50_ms": percentile(50),
+            "p95_ms": percentile(95),
+            "p99_ms": percentile(99),
+            "max_ms": 1000 * samples[-1],
+            "histogram": dict(zip([f"le_{b}ms" for b in HISTOGRAM_BUCKETS_MS] + ["slower"], histogram)),
+        }
+
+
+class Metrics:
+    """Thread-safe registry of named timers, counters and gauges."""
+
+    def __init__(self, window=1000):
+        self.window = window
+        self.started = time.time()
+        self._timers = {}
+        self._counters = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds):
+        with self._lock:
+            timer = self._timers.get(name)
+            if timer is None:
+                timer = self._timers[name] = RollingTimer(self.window)
+            timer.observe(seconds)
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def set_gauge(self, name, value):
+        with self._lock:
+            self._gauges[name] = value
+
+    def counter(self, name):
+        return self._counters.get(name, 0)
+
+    def timer_stats(self, name):
+        with self._lock:
+            timer = self._timers.get(name)
+            return timer.stats() if timer else {"count": 0}
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self._timers.clear()
+            self._counters.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "time": time.time(),
+                "uptime_s": time.time() - self.started,
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "timers": {name: timer.stats() for name, timer in self._timers.items()},
+            }
+
+
+def status_line(snapshot):
+    """One line for the GUI, e.g. "1.8 scans/s · scan p95 42 ms · 3 alerts · 0 errors · 850 MB"."""
+    counters, timers = snapshot["counters"], snapshot["timers"]
+    scans = counters.get("scans", 0)
+    rate = scans / snapshot["uptime_s"] if snapshot["uptime_s"] > 0 else 0.0
+    parts = [f"{rate:.1f} scans/s"]
+    scan = timers.get("scan", {})
+    if "p95_ms" in scan:
+        parts.append(f"scan p95 {scan['p95_ms']:.0f} ms")
+    seen = counters.get("frames_seen", 0)
+    if seen:
+        parts.append(f"{counters.get('frames_skipped', 0) / seen:.0%} skipped")
+    parts.append(f"{counters.get('alerts', 0)} alerts")
+    parts.append(f"{counters.get('errors', 0)} errors")
+    rss = snapshot.get("gauges", {}).get("rss_mb")
+    if rss:
+        parts.append(f"{rss:.0f} MB")
+    return " · ".join(parts)
+
+
+class MetricsServer:
+    """Serves `snapshot()` as JSON on 127.0.0.1 only, from a daemon thread (port 0 picks a free port)."""
+
+    def __init__(self, snapshot, port):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = json.dumps(snapshot()).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass  # Keep polling out of the log
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", int(port)), Handler)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="guard-metrics", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+metrics = Metrics()
@@ -1,29 +1,55 @@
-import mss
-import cv2
-import numpy as np
-import pyttsx3
+# Heavy dependencies (torch, transformers, cv2, numpy, mss, PIL, pyautogui, pyttsx3) are
+# imported inside the functions that need them, so importing this module stays cheap and
+# the GUI can come up before any of them are loaded.
+import logging
 import time
-from transformers import pipeline
-from PIL import Image
-import torch
-from pyautogui import hotkey
 from utils.config import get_close_tab_action
+from utils.startup import startup_report
+from .memory import MemoryWatcher, trim_memory
+from .metrics import MetricsServer, metrics, status_line
+from .pipeline import MonitorPipeline
+from .scheduler import AdaptiveScheduler
+from .verdict_cache import VerdictCache
 import threading
 import webbrowser
 import os
 import json
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 # Set device to CPU
-device = torch.device("cpu")
+device = "cpu"
 
-# Initialize text-to-speech engine
-engine = pyttsx3.init()
-engine.setProperty('rate', 150)
-engine.setProperty('volume', 0.9)
+# Text-to-speech engine, created on first use by get_tts_engine()
+engine = None
 
 # Model loading variables
 MODEL_NAME = "Falconsai/nsfw_image_detection"
+INFERENCE_BACKEND = "transformers"  # One of backends.BACKENDS: transformers, torchscript, int8, onnx, onnx-int8
+# Load from a verified local copy under ~/.Guard/models, built on first load, instead of the hub
+USE_MODEL_ARTIFACT = True
+# Inference threading, None keeps the library defaults. apply_thread_tuning() loads the choice
+# of monitor.thread_tuning; the same names in the "monitor" config section override it
+INTRA_OP_THREADS = None
+INTER_OP_THREADS = None
+CPU_AFFINITY = None  # CPU indices the whole process may run on, e.g. [0, 1, 2, 3]
+# Memory: with MODEL_MMAP the weights stay memory-mapped from the local artifact's safetensors file
+# (transformers and int8 backends). The model is unloaded after IDLE_UNLOAD_SECONDS without a forward
+# pass (monitoring stopped, or a screen that does not change) and reloaded by the next frame that
+# needs it; over MEMORY_BUDGET_MB of RSS an idle model is unloaded early (see monitor.memory)
+MODEL_MMAP = True
+IDLE_UNLOAD_SECONDS = 600  # None keeps the model loaded for the whole session
+MEMORY_BUDGET_MB = None
+MEMORY_SAMPLE_INTERVAL = 10  # Seconds between RSS samples
+BUDGET_MIN_IDLE = 10  # Seconds without a forward pass before the budget may unload the model
+model_artifact = None
+model_unloaded = False
+last_inference = 0.0
+memory_watcher = None
+unreachable_budget = None  # A budget that unloading was seen not to meet, so it no longer unloads
+housekeeping_thread = None
+model_load_seconds = None
 classifier = None
 loading_complete = False
 loading_error = None
@@ -33,144 +59,895 @@ NSFW_THRESHOLD = 0.5  # Default threshold
 MOTIVATIONAL_URL = "https://www.youtube.com/shorts/8SVZLF75P2M"
 ENABLE_REDIRECT = True
 PARENT_MODE = False
-PARENT_REPORT_PATH = None
+PARENT_REPORT_PATH = None  # Append-only JSON Lines event log (see utils.event_log)
+EVENT_STORE = "jsonl"  # jsonl, or sqlite for an indexed store next to it (see utils.event_store)
+event_log = None
+
+# Parent-mode screenshots, encoded off the hot path by a background writer
+SCREENSHOT_FORMAT = "jpeg"  # jpeg, webp or png
+SCREENSHOT_QUALITY = 85  # For jpeg and webp
+SCREENSHOT_MAX_WIDTH = None  # Downscale wider screenshots to this width
+# Screenshots go into a content-addressed store in PARENT_SCREENSHOT_DIR (see utils.screenshot_store)
+SCREENSHOT_STORE_MAX_MB = 500  # Disk budget; entries are evicted beyond it
+SCREENSHOT_DEDUP_DISTANCE = 10  # Max dhash bit difference (of 256) for a near-duplicate
+SCREENSHOT_EVICTION = "oldest"  # oldest or least_referenced
+screenshot_writer = None
 PARENT_SCREENSHOT_DIR = None
 monitoring_active = True
 
+# Frame-change gating: fraction of the downsampled frame that must change before it is reclassified
+FRAME_CHANGE_THRESHOLD = 0.005
+SKIP_REPORT_INTERVAL = 60  # Log gating, cache and pipeline stats every N scan cycles
+frame_gates = {}  # monitor index -> FrameChangeGate
+
+# Verdict cache: scores of recently seen screens, keyed by perceptual hash (size 0 disables it)
+VERDICT_CACHE_SIZE = 256
+VERDICT_CACHE_TTL = 300  # Seconds before a cached score is considered stale
+verdict_cache = None
+
+# Tiled mode: classify only the changed cells of a TILE_ROWS x TILE_COLS grid
+TILED_MODE = False
+TILE_ROWS = 3
+TILE_COLS = 3
+TILE_CHANGE_THRESHOLD = 0.02  # Fraction of a tile that must change for it to be reclassified
+TILE_MERGE = False  # Merge adjacent dirty tiles into larger rectangles before classifying
+INFERENCE_BATCH_SIZE = 8
+# Preprocess frames straight into model tensors instead of going through PIL and the HF image processor
+FAST_PREPROCESS = True
+tile_trackers = {}  # monitor index -> TileTracker
+
+# Detection cascade: a skin-tone prefilter on a downscaled frame clears obviously safe
+# screens (editors, terminals, spreadsheets) before the classifier (see monitor.prefilter).
+# Off by default: grayscale, sepia and strongly tinted frames have no skin tones and would be
+# cleared (and cached) unseen, so measure recall with benchmarks.prefilter_eval before enabling it
+PREFILTER_ENABLED = False
+PREFILTER_THRESHOLD = 0.005  # Fraction of skin-toned pixels below which a frame is cleared
+prefilter = None
+
+# Temporal voting: routine scans classify a downscaled frame; a score above NEAR_THRESHOLD_RATIO
+# of the threshold starts a burst of full-resolution (and tiled) confirmation frames, and the
+# alert fires only if VOTE_K of VOTE_N of them are over the threshold (see monitor.voting)
+TEMPORAL_VOTING = False
+LOW_RES_MAX_SIDE = 448  # Longer side, in pixels, of the frames routine scans classify
+VOTE_K = 2
+VOTE_N = 3
+CONFIRM_INTERVAL = 0.2  # Seconds between captures during a confirmation burst
+CONFIRM_TILE_ROWS = 2  # Confirmation frames are also classified as a grid of tiles (1 x 1 disables)
+CONFIRM_TILE_COLS = 2
+voter = None
+
+# Monitors to scan, as mss indices starting at 1; None scans every attached monitor
+MONITORS = None
+# "screen" grabs whole monitors; "foreground_window" grabs only the focused window (the one an
+# alert closes a tab in), falling back to whole monitors when it cannot be located (see monitor.window)
+CAPTURE_MODE = "screen"
+
+# Pipeline: capture, inference and action run concurrently, joined by drop-oldest queues
+SCAN_INTERVAL = 1.0  # Seconds between captures (the base interval when scheduling adaptively)
+PIPELINE_QUEUE_SIZE = 2
+pipeline = None
+# Adaptive scheduling: scan faster around suspicious scores, back off while the screen is idle
+ADAPTIVE_SCHEDULING = True
+MIN_SCAN_INTERVAL = 0.25
+MAX_SCAN_INTERVAL = 3.0
+NEAR_THRESHOLD_RATIO = 0.5  # Scores above this fraction of NSFW_THRESHOLD count as near-threshold
+scheduler = None
+monitor_run_id = 0  # Bumped by each main() call so stages of a stopped run never outlive it
+run_lock = threading.Lock()  # Orders a run's start against the previous run's teardown
+
+# Instrumentation (see monitor.metrics); per-frame details are logged at DEBUG
+LOG_LEVEL = "INFO"  # Level of the monitor package's loggers
+METRICS_PATH = None  # JSON snapshot of the metrics, rewritten every METRICS_INTERVAL seconds
+METRICS_INTERVAL = 5.0
+METRICS_PORT = None  # Serve the metrics on http://127.0.0.1:<port>/metrics
+metrics_server = None
+_metrics_written = 0.0
+
+# Names that may be overridden from the "monitor" section of config.json
+TUNABLE_SETTINGS = (
+    "FRAME_CHANGE_THRESHOLD", "SKIP_REPORT_INTERVAL", "VERDICT_CACHE_SIZE", "VERDICT_CACHE_TTL",
+    "TILED_MODE", "TILE_ROWS", "TILE_COLS", "TILE_CHANGE_THRESHOLD", "TILE_MERGE", "INFERENCE_BATCH_SIZE", "MONITORS",
+    "INFERENCE_BACKEND", "USE_MODEL_ARTIFACT", "SCAN_INTERVAL", "PIPELINE_QUEUE_SIZE",
+    "FAST_PREPROCESS", "ADAPTIVE_SCHEDULING", "MIN_SCAN_INTERVAL", "MAX_SCAN_INTERVAL", "NEAR_THRESHOLD_RATIO",
+    "SCREENSHOT_FORMAT", "SCREENSHOT_QUALITY", "SCREENSHOT_MAX_WIDTH",
+    "SCREENSHOT_STORE_MAX_MB", "SCREENSHOT_DEDUP_DISTANCE", "SCREENSHOT_EVICTION", "EVENT_STORE",
+    "LOG_LEVEL", "METRICS_INTERVAL", "METRICS_PORT", "PREFILTER_ENABLED", "PREFILTER_THRESHOLD",
+    "TEMPORAL_VOTING", "LOW_RES_MAX_SIDE", "VOTE_K", "VOTE_N", "CONFIRM_INTERVAL", "CONFIRM_TILE_ROWS", "CONFIRM_TILE_COLS",
+    "CAPTURE_MODE", "INTRA_OP_THREADS", "INTER_OP_THREADS", "CPU_AFFINITY",
+    "MODEL_MMAP", "IDLE_UNLOAD_SECONDS", "MEMORY_BUDGET_MB", "MEMORY_SAMPLE_INTERVAL",
+)
+
+def get_tts_engine():
+    """Return the text-to-speech engine, initializing pyttsx3 on first use."""
+    global engine
+    if engine is None:
+        import pyttsx3
+        engine = pyttsx3.init()
+        engine.setProperty('rate', 150)
+        engine.setProperty('volume', 0.9)
+    return engine
+
 def set_nsfw_threshold(threshold):
     global NSFW_THRESHOLD
     NSFW_THRESHOLD = float(threshold)
-    print(f"NSFW threshold updated to: {NSFW_THRESHOLD}")
+    logger.info(f"NSFW threshold updated to: {NSFW_THRESHOLD}")
+
+def apply_log_level():
+    logging.getLogger("monitor").setLevel(str(LOG_LEVEL).upper())
+
+def apply_settings(settings):
+    """Apply overrides from the "monitor" config section, e.g. {"frame_change_threshold": 0.01}."""
+    for key, value in (settings or {}).items():
+        name = key.upper()
+        if name in TUNABLE_SETTINGS:
+            globals()[name] = value
+            logger.info(f"Monitor setting {name} set to: {value}")
+        else:
+            logger.warning(f"Ignoring unknown monitor setting: {key}")
+    apply_log_level()
+
+apply_log_level()
+
+def apply_thread_tuning(tuning):
+    """Apply the "thread_tuning" section written by monitor.thread_tuning; call before apply_settings()."""
+    for key in ("intra_op_threads", "inter_op_threads", "cpu_affinity"):
+        if (tuning or {}).get(key) is not None:
+            globals()[key.upper()] = tuning[key]
+    if tuning:
+        logger.info(f"Tuned threading: intra-op {INTRA_OP_THREADS}, inter-op {INTER_OP_THREADS}, affinity {CPU_AFFINITY}")
+
+def apply_threading():
+    """Apply CPU_AFFINITY to this process and the thread counts to torch, before the model is loaded.
+
+    torch only accepts the inter-op thread count before its first parallel work, so
+    a change after that takes effect on the next start.
+    """
+    if CPU_AFFINITY:
+        try:
+            import psutil
+            psutil.Process().cpu_affinity([int(cpu) for cpu in CPU_AFFINITY])
+        except (AttributeError, ValueError, OSError) as e:  # AttributeError: not supported on macOS
+            logger.warning(f"Could not set CPU affinity to {CPU_AFFINITY}: {e}")
+    if INFERENCE_BACKEND.startswith("onnx") or not (INTRA_OP_THREADS or INTER_OP_THREADS):
+        return  # ONNX Runtime gets the thread counts through its session options
+    import torch
+    if INTRA_OP_THREADS:
+        torch.set_num_threads(int(INTRA_OP_THREADS))
+    if INTER_OP_THREADS and torch.get_num_interop_threads() != int(INTER_OP_THREADS):
+        try:
+            torch.set_num_interop_threads(int(INTER_OP_THREADS))
+        except RuntimeError as e:
+            logger.warning(f"Could not set inter-op threads to {INTER_OP_THREADS}: {e}")
+
+def get_frame_gate_stats():
+    """Return how many captured frames were skipped by the change gates, overall and per monitor."""
+    per_monitor = {index: gate.stats() for index, gate in frame_gates.items()}
+    seen = sum(stats["frames_seen"] for stats in per_monitor.values())
+    skipped = sum(stats["frames_skipped"] for stats in per_monitor.values())
+    return {
+        "frames_seen": seen,
+        "frames_skipped": skipped,
+        "skip_ratio": skipped / seen if seen else 0.0,
+        "monitors": per_monitor,
+    }
+
+def get_verdict_cache():
+    global verdict_cache
+    if verdict_cache is None or verdict_cache.max_size != VERDICT_CACHE_SIZE or verdict_cache.ttl != (VERDICT_CACHE_TTL or None):
+        verdict_cache = VerdictCache(max_size=VERDICT_CACHE_SIZE, ttl=VERDICT_CACHE_TTL)
+    return verdict_cache
+
+def get_verdict_cache_stats():
+    """Return verdict cache hit/miss counters."""
+    return get_verdict_cache().stats()
+
+def get_prefilter():
+    """Return the cascade's first stage, or None if PREFILTER_ENABLED is off."""
+    global prefilter
+    if not PREFILTER_ENABLED:
+        return None
+    if prefilter is None or prefilter.threshold != PREFILTER_THRESHOLD:
+        from .prefilter import SkinPrefilter
+        prefilter = SkinPrefilter(threshold=PREFILTER_THRESHOLD)
+    return prefilter
+
+def _create_classifier(artifact):
+    apply_threading()
+    from .backends import create_backend
+    return create_backend(INFERENCE_BACKEND, MODEL_NAME, artifact=artifact, device=device, mmap_weights=MODEL_MMAP,
+                          intra_op_threads=INTRA_OP_THREADS, inter_op_threads=INTER_OP_THREADS)
 
 def load_model(progress_callback=None):
-    global classifier, loading_complete, loading_error, loading_start_time
+    global classifier, loading_complete, loading_error, loading_start_time, model_load_seconds, model_artifact, last_inference
     with model_lock:
         if loading_complete or classifier is not None:
-            print("Model already loaded or loading complete, skipping.")
+            logger.info("Model already loaded or loading complete, skipping.")
             if progress_callback:
                 progress_callback(100, "Model already loaded!")
             return
-        print(f"Loading model (attempt: {getattr(load_model, 'call_count', 0) + 1})")
+        logger.info(f"Loading model (attempt: {getattr(load_model, 'call_count', 0) + 1})")
         load_model.call_count = getattr(load_model, 'call_count', 0) + 1
         loading_start_time = time.time()
-        try:
-            if progress_callback:
-                progress_callback(0, "Starting model load...")
-            print(f"Attempting to load model from: {MODEL_NAME}, device: {device}")
-            classifier = pipeline("image-classification", model=MODEL_NAME, device=device, use_fast=True)  # Removed cache_dir
-            print(f"Classifier initialized: {classifier is not None}")
+        loading_error = None
+
+        def report(percent, message):
+            logger.info(f"[{time.time() - loading_start_time:.2f}s] {message}")
             if progress_callback:
-                progress_callback(50, "Model half-loaded...")
-            print(f"Model loaded in {time.time() - loading_start_time:.2f} seconds!")
+                progress_callback(percent, message)
+
+        try:
+            report(0, "Starting model load...")
+            logger.info(f"Attempting to load model from: {MODEL_NAME}, device: {device}, backend: {INFERENCE_BACKEND}")
+            artifact = None
+            if USE_MODEL_ARTIFACT:
+                from .artifact import load_or_build_artifact
+                report(10, "Checking local model cache...")
+                artifact = load_or_build_artifact(
+                    MODEL_NAME, require_trace=INFERENCE_BACKEND == "torchscript",
+                    progress=lambda message: report(30, message),
+                )
+            report(60, f"Loading {INFERENCE_BACKEND} inference engine...")
+            classifier = _create_classifier(artifact)
+            model_artifact = artifact
+            last_inference = time.monotonic()
+            _start_housekeeping()
+            model_load_seconds = time.time() - loading_start_time
+            metrics.set_gauge("model_load_seconds", model_load_seconds)
+            logger.info(f"Model loaded in {model_load_seconds:.2f} seconds!")
             loading_complete = True
-            if progress_callback:
-                progress_callback(100, "Model loaded successfully!")
+            report(100, f"Model loaded in {model_load_seconds:.2f} seconds")
         except Exception as e:
             loading_error = str(e)
-            print(f"Failed to load model: {e}")
+            logger.error(f"Failed to load model: {e}")
             classifier = None  # Ensure classifier is None on failure
             if progress_callback:
                 progress_callback(100, f"Error: {e}")
 
+def model_ready():
+    """True once the model has loaded, including while it is unloaded for being idle."""
+    return classifier is not None or model_unloaded
+
+def ensure_model():
+    """Return the classifier, first reloading it if it was unloaded (None if it never loaded)."""
+    global classifier, model_unloaded
+    model = classifier
+    if model is not None or not model_unloaded:
+        return model
+    with model_lock:
+        if classifier is None and model_unloaded:
+            start = time.perf_counter()
+            classifier = _create_classifier(model_artifact)
+            model_unloaded = False
+            elapsed = time.perf_counter() - start
+            metrics.observe("model_reload", elapsed)
+            metrics.increment("model_reloads")
+            logger.info(f"Model reloaded in {elapsed:.2f}s")
+        return classifier
+
+def unload_model(reason="idle"):
+    """Release the classifier's memory; ensure_model() reloads it when a frame needs it."""
+    global classifier, model_unloaded
+    with model_lock:
+        if classifier is None:
+            return False
+        classifier = None
+        model_unloaded = True
+    trim_memory()
+    metrics.increment("model_unloads")
+    logger.info(f"Model unloaded ({reason})")
+    return True
+
+def get_memory_watcher():
+    global memory_watcher
+    if memory_watcher is None:
+        memory_watcher = MemoryWatcher(budget_mb=MEMORY_BUDGET_MB)
+    memory_watcher.budget_mb = MEMORY_BUDGET_MB
+    return memory_watcher
+
+def get_memory_stats():
+    """Return current, steady-state and peak RSS (MB), the budget, and whether the model is loaded."""
+    return dict(get_memory_watcher().stats(), model_loaded=classifier is not None,
+                budget_unloads=bool(MEMORY_BUDGET_MB) and unreachable_budget != MEMORY_BUDGET_MB)
+
+def check_memory():
+    """Sample RSS and unload the model if it has been idle too long or memory is over budget.
+
+    If memory is still over budget right after a budget unload, unloading cannot meet
+    that budget, and reloading for the next frame would only repeat the cycle, so the
+    budget stops unloading the model until it is changed.
+    """
+    global unreachable_budget
+    watcher = get_memory_watcher()
+    rss = watcher.sample()
+    if classifier is None:
+        return
+    idle = time.monotonic() - last_inference
+    if IDLE_UNLOAD_SECONDS and idle >= IDLE_UNLOAD_SECONDS:
+        unload_model(f"no inference for {idle:.0f}s")
+    elif watcher.over_budget() and unreachable_budget != MEMORY_BUDGET_MB:
+        if idle >= BUDGET_MIN_IDLE:
+            if unload_model(f"RSS {rss:.0f} MB over the {MEMORY_BUDGET_MB} MB budget"):
+                rss = watcher.sample()
+                if watcher.over_budget():
+                    unreachable_budget = MEMORY_BUDGET_MB
+                    logger.warning(f"RSS is still {rss:.0f} MB after unloading the model, over the {MEMORY_BUDGET_MB} MB "
+                                   "budget; the budget will not unload the model again until it is changed")
+        else:
+            logger.debug("RSS %.0f MB over the %s MB budget, but the model is in use", rss, MEMORY_BUDGET_MB)
+
+def _housekeeping():
+    while True:
+        time.sleep(MEMORY_SAMPLE_INTERVAL or 10)
+        try:
+            check_memory()
+        except Exception as e:
+            logger.warning(f"Memory check failed: {e}")
+
+def _start_housekeeping():
+    global housekeeping_thread
+    if housekeeping_thread is None:
+        housekeeping_thread = threading.Thread(target=_housekeeping, name="guard-memory", daemon=True)
+        housekeeping_thread.start()
+
+def _to_pil(image):
+    import numpy as np
+    from PIL import Image
+    from .preprocess import to_rgb
+    if isinstance(image, np.ndarray):
+        return Image.fromarray(to_rgb(image))
+    if isinstance(image, Image.Image):
+        return image.convert("RGB")
+    raise ValueError("Input must be a NumPy array or PIL.Image")
+
+def _classify_misses(images, batch_size):
+    global last_inference
+    import numpy as np
+    from PIL import Image
+    # A local reference, so an idle unload on another thread cannot pull the model from under this call
+    model = ensure_model()
+    last_inference = time.monotonic()
+    metrics.increment("images_classified", len(images))
+    if FAST_PREPROCESS and hasattr(model, "predict_pixel_values"):
+        with metrics.timer("convert"):
+            frames = [np.asarray(image.convert("RGB")) if isinstance(image, Image.Image) else image for image in images]
+            pixel_values = model.preprocessor.batch(frames)
+        with metrics.timer("inference"):
+            return model.predict_pixel_values(pixel_values, batch_size=batch_size)
+    with metrics.timer("convert"):
+        pil_images = [_to_pil(image) for image in images]
+    # The image processor runs inside the classifier here, so this includes its preprocessing
+    with metrics.timer("inference"):
+        return model(pil_images, batch_size=batch_size)
+
+def _score_images(images, batch_size=None, use_cache=True):
+    """Return the NSFW score of each image.
+
+    Arrays may be RGB (3 channels, not OpenCV's BGR), raw BGRA screen buffers
+    (4 channels) or grayscale (2-D or 1 channel); see has_adult_content().
+    Images are looked up in the verdict cache before being converted (unless
+    `use_cache` is false); misses that the prefilter clears score 0, and the rest
+    go through the classifier together in batches of `batch_size`
+    (INFERENCE_BATCH_SIZE by default).
+    """
+    from utils.phash import dhash
+    batch_size = batch_size or INFERENCE_BATCH_SIZE
+    cache = get_verdict_cache()
+    with metrics.timer("hash"):
+        keys = [dhash(image) for image in images] if use_cache and cache.max_size > 0 else [None] * len(images)
+    scores = [cache.get(key) if key is not None else None for key in keys]
+    misses = [i for i, score in enumerate(scores) if score is None]
+    if len(misses) < len(images):
+        metrics.increment("cache_hits", len(images) - len(misses))
+        logger.debug("Verdict cache hits: %d/%d", len(images) - len(misses), len(images))
+    stage_one = get_prefilter()
+    if stage_one and misses:
+        import numpy as np
+        from PIL import Image
+        with metrics.timer("prefilter"):
+            escalate = [stage_one.should_escalate(np.asarray(images[i].convert("RGB")) if isinstance(images[i], Image.Image) else images[i])
+                        for i in misses]
+        for i, escalated in zip(misses, escalate):
+            if not escalated:
+                scores[i] = 0.0
+                if keys[i] is not None:
+                    cache.put(keys[i], 0.0)
+        cleared = escalate.count(False)
+        metrics.increment("prefilter_cleared", cleared)
+        metrics.increment("prefilter_escalated", len(escalate) - cleared)
+        misses = [i for i, escalated in zip(misses, escalate) if escalated]
+    if misses:
+        batch = [images[i] for i in misses]
+        all_results = _classify_misses(batch, max(1, min(batch_size, len(batch))))
+        debug = logger.isEnabledFor(logging.DEBUG)
+        for i, results in zip(misses, all_results):
+            if debug:
+                logger.debug("Prediction scores: %s", {r['label']: f"{r['score']:.4f}" for r in results})
+            scores[i] = next((r['score'] for r in results if r['label'] == 'nsfw'), 0)
+            if keys[i] is not None:
+                cache.put(keys[i], scores[i])
+    return scores
+
 def has_adult_content(image):
+    """Return (is_adult, content_type, score) for one image.
+
+    `image` is a PIL image or a uint8 array: RGB with 3 channels, BGRA with 4 (as
+    mss grabs it) or grayscale. 3-channel arrays used to be read as BGR; convert
+    OpenCV images with cv2.cvtColor(image, cv2.COLOR_BGR2RGB) before passing them.
+    """
     global classifier, loading_error, NSFW_THRESHOLD
-    print(f"Checking adult content, classifier: {classifier is not None}, threshold: {NSFW_THRESHOLD}")
-    if not classifier:
+    logger.debug("Checking adult content, classifier: %s, threshold: %s", classifier is not None, NSFW_THRESHOLD)
+    if not model_ready():
         return False, None, 0
     try:
-        if isinstance(image, np.ndarray):
-            img_pil = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
-        elif isinstance(image, Image.Image):
-            img_pil = image.convert("RGB")
-        else:
-            raise ValueError("Input must be a NumPy array or PIL.Image")
-        
-        results = classifier(img_pil)
-        print("Prediction scores:", {r['label']: f"{r['score']:.4f}" for r in results})
-        
-        nsfw_result = next((r for r in results if r['label'] == 'nsfw'), {'score': 0})
-        nsfw_score = nsfw_result['score']
+        nsfw_score = _score_images([image])[0]
+        # Cached scores are re-checked against the current threshold
         is_adult = nsfw_score > NSFW_THRESHOLD
         content_type = "NSFW" if is_adult else None
-        
-        print(f"Adult content check: {is_adult}, Type: {content_type}, Score: {nsfw_score:.4f}")
+
+        logger.debug("Adult content check: %s, Type: %s, Score: %.4f", is_adult, content_type, nsfw_score)
         return is_adult, content_type, nsfw_score
     except Exception as e:
-        print(f"Error in adult content detection: {e}")
+        metrics.increment("errors")
+        logger.error(f"Error in adult content detection: {e}")
         return False, None, 0
 
+def score_images(images, batch_size=None, use_cache=True):
+    """Return the NSFW score of each image, in input order, with batched forward passes.
+
+    Images are taken as in has_adult_content(), so 3-channel arrays must be RGB.
+    Unlike has_adult_content_batch(), errors are raised rather than reported as
+    scores of 0, for callers that must not mistake a failure for a safe image.
+    """
+    if not model_ready():
+        raise RuntimeError(f"Model is not loaded: {loading_error}")
+    return _score_images(list(images), batch_size=batch_size, use_cache=use_cache)
+
+def has_adult_content_batch(images, batch_size=None):
+    """Classify many images (PIL images or arrays, as in has_adult_content()) with batched forward passes.
+
+    Returns one (is_adult, content_type, score) tuple per image, in input order.
+    """
+    images = list(images)
+    if not model_ready():
+        return [(False, None, 0)] * len(images)
+    try:
+        scores = _score_images(images, batch_size=batch_size)
+    except Exception as e:
+        metrics.increment("errors")
+        logger.error(f"Error in batched adult content detection: {e}")
+        return [(False, None, 0)] * len(images)
+    verdicts = []
+    for score in scores:
+        is_adult = score > NSFW_THRESHOLD
+        verdicts.append((is_adult, "NSFW" if is_adult else None, score))
+    return verdicts
+
+def scan_frames(frames):
+    """Classify (monitor_index, frame) pairs with a single batched classifier call.
+
+    Frames that the per-monitor change gate lets through (or only their dirty tiles
+    in tiled mode) are scored together. Returns one
+    (monitor_index, is_adult, content_type, score) per scanned monitor, using the
+    highest region score for that monitor.
+    """
+    if not model_ready():
+        return []
+    from .frame_gate import FrameChangeGate
+    from .tiling import TileTracker
+    images, owners = [], []
+    gate_start = time.perf_counter()
+    for index, frame in frames:
+        gate = frame_gates.get(index)
+        if gate is None:
+            gate = frame_gates[index] = FrameChangeGate(threshold=FRAME_CHANGE_THRESHOLD)
+        metrics.increment("frames_seen")
+        if not gate.should_classify(frame):
+            metrics.increment("frames_skipped")
+            continue
+        if TILED_MODE:
+            tracker = tile_trackers.get(index)
+            if tracker is None:
+                tracker = tile_trackers[index] = TileTracker(rows=TILE_ROWS, cols=TILE_COLS, threshold=TILE_CHANGE_THRESHOLD)
+            dirty = tracker.update(frame)
+            rects = tracker.dirty_rects(frame.shape, dirty, merge=TILE_MERGE) if dirty else []
+            regions = [frame[top:bottom, left:right] for top, bottom, left, right in rects]
+        else:
+            regions = [frame]
+        images.extend(regions)
+        owners.extend([index] * len(regions))
+    metrics.observe("gate", time.perf_counter() - gate_start)
+    if not images:
+        return []
+    try:
+        scores = _score_images(images)
+    except Exception as e:
+        metrics.increment("errors")
+        logger.error(f"Error in adult content detection: {e}")
+        return []
+    best = {}
+    for index, score in zip(owners, scores):
+        best[index] = max(score, best.get(index, 0))
+    verdicts = []
+    for index, score in best.items():
+        is_adult = score > NSFW_THRESHOLD
+        content_type = "NSFW" if is_adult else None
+        logger.debug("Adult content check (monitor %s): %s, Type: %s, Score: %.4f", index, is_adult, content_type, score)
+        verdicts.append((index, is_adult, content_type, score))
+    return verdicts
+
+def reset_scan_state():
+    """Make every monitor (and every tile) get reclassified on the next scan."""
+    for gate in frame_gates.values():
+        gate.reset()
+    for tracker in tile_trackers.values():
+        tracker.reset()
+    if voter:
+        voter.reset()
+
+def _vote_frames(frames):
+    """Scan (monitor_index, frame) pairs in temporal voting mode.
+
+    Monitors in a confirmation burst are classified at full resolution plus a
+    CONFIRM_TILE_ROWS x CONFIRM_TILE_COLS grid of tiles, and their verdict is a vote;
+    every other monitor gets a routine scan of a frame downscaled to LOW_RES_MAX_SIDE,
+    which starts a burst if its score is near the threshold. Returns the verdicts of
+    this cycle (as scan_frames does) and those whose vote just passed.
+    """
+    from .voting import confirmation_regions, downscale
+    confirming = voter.confirming
+    routine = [(index, downscale(frame, LOW_RES_MAX_SIDE)) for index, frame in frames if index not in confirming]
+    verdicts = scan_frames(routine) if routine else []
+    for index, _, _, score in verdicts:
+        if score > NEAR_THRESHOLD_RATIO * NSFW_THRESHOLD:
+            logger.debug("Monitor %s scored %.4f at low resolution, confirming", index, score)
+            voter.trigger(index)
+            metrics.increment("votes_triggered")
+    confirmed = []
+    images, owners = [], []
+    for index, frame in frames:
+        if index in confirming:
+            regions = confirmation_regions(frame, CONFIRM_TILE_ROWS, CONFIRM_TILE_COLS)
+            images.extend(regions)
+            owners.extend([index] * len(regions))
+    if images:
+        try:
+            # The full frame usually hashes like its low-resolution scan, so a cache hit
+            # would just repeat the score this look is meant to check
+            with metrics.timer("confirm"):
+                scores = _score_images(images, use_cache=False)
+        except Exception as e:
+            metrics.increment("errors")
+            logger.error(f"Error in adult content confirmation: {e}")
+            return verdicts, confirmed
+        best = {}
+        for index, score in zip(owners, scores):
+            best[index] = max(score, best.get(index, 0))
+        for index, score in best.items():
+            is_adult = score > NSFW_THRESHOLD
+            verdict = (index, is_adult, "NSFW" if is_adult else None, score)
+            verdicts.append(verdict)
+            decision = voter.vote(index, is_adult)
+            logger.debug("Confirmation vote (monitor %s): %s, Score: %.4f, Decision: %s", index, is_adult, score, decision)
+            if decision:
+                metrics.increment("votes_confirmed")
+                confirmed.append(verdict)
+            elif decision is False:
+                metrics.increment("votes_rejected")
+    if voter.confirming and pipeline:
+        pipeline.wake()  # Take the next confirmation frame now, not after a routine interval
+    return verdicts, confirmed
+
+def _next_capture_interval():
+    if voter and voter.confirming:
+        return CONFIRM_INTERVAL
+    return scheduler.next_interval() if scheduler else SCAN_INTERVAL
+
+def get_screenshot_writer():
+    """Return the background screenshot writer, starting it on first use."""
+    global screenshot_writer
+    if screenshot_writer is None:
+        from utils.screenshot_store import ScreenshotStore
+        from .screenshot_writer import ScreenshotWriter
+        store = ScreenshotStore(PARENT_SCREENSHOT_DIR, max_bytes=SCREENSHOT_STORE_MAX_MB * 1024 * 1024,
+                                dedup_distance=SCREENSHOT_DEDUP_DISTANCE, eviction=SCREENSHOT_EVICTION)
+        screenshot_writer = ScreenshotWriter(store, fmt=SCREENSHOT_FORMAT, quality=SCREENSHOT_QUALITY, max_width=SCREENSHOT_MAX_WIDTH)
+    return screenshot_writer
+
+def close_screenshot_writer():
+    """Finish writing queued screenshots and stop the writer thread."""
+    global screenshot_writer
+    if screenshot_writer is not None:
+        screenshot_writer.close()
+        screenshot_writer = None
+
+def get_screenshot_writer_stats():
+    """Return encode latency and queue depth of the screenshot writer."""
+    return screenshot_writer.stats() if screenshot_writer else {}
+
+def get_event_log():
+    """Return the parent-mode event log at PARENT_REPORT_PATH, opening (and migrating) it on first use.
+
+    With EVENT_STORE = "sqlite" this is the SQLite store next to it (parent_report.db),
+    which first imports any events of the JSON Lines log it does not have yet.
+    """
+    global event_log
+    path = PARENT_REPORT_PATH
+    if EVENT_STORE == "sqlite":
+        path = os.path.splitext(PARENT_REPORT_PATH)[0] + ".db"
+    if event_log is None or str(event_log.path) != str(path):
+        if event_log is not None:
+            event_log.close()
+        if EVENT_STORE == "sqlite":
+            from utils.event_store import open_event_store
+            event_log = open_event_store(path, import_from=PARENT_REPORT_PATH)
+        else:
+            from utils.event_log import open_event_log
+            event_log = open_event_log(path)
+    return event_log
+
+def close_event_log():
+    global event_log
+    if event_log is not None:
+        event_log.close()
+        event_log = None
+
 def capture_screen():
-    with mss.mss() as sct:
-        monitor = sct.monitors[1]
-        screenshot = sct.grab(monitor)
-        img = np.array(screenshot)
-        if img.shape[2] == 4:  # RGBA
-            img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
-        return img
-
-def speak_alert(content_type, score):
-    message = f"Warning: Detected {content_type} with confidence {score:.2f}. Please review the content."
-    print(message)
+    """Grab the primary monitor as an RGB array.
+
+    The session and buffer are reused per thread, so the returned array is
+    overwritten by the next call from the same thread.
+    """
+    from .capture import get_screen_capture
+    return get_screen_capture().grab()
+
+def capture_screens(raw=False):
+    """Grab every monitor listed in MONITORS (all by default) as (monitor_index, frame) pairs.
+
+    Frames are RGB, or zero-copy BGRA screen buffers if `raw`. With CAPTURE_MODE
+    "foreground_window" only the focused window is grabbed, as one pair for the
+    monitor it is on (none if that monitor is not in MONITORS).
+    """
+    from .capture import get_screen_capture
+    capture = get_screen_capture()
+    if CAPTURE_MODE == "foreground_window":
+        frames = capture.grab_foreground(raw=raw)
+        if frames is not None:
+            metrics.increment("window_captures")
+            return [(index, frame) for index, frame in frames if not MONITORS or index in MONITORS]
+        metrics.increment("window_fallbacks")
+    return capture.grab_all(MONITORS, raw=raw)
+
+def speak_alert(content_type, score, monitor=None, frame=None):
+    """Close the offending tab, log the event in parent mode and open the redirect.
+
+    `frame` is the frame that was classified; it is handed to the background
+    screenshot writer as is, so it must not be modified afterwards. Without it the
+    screen is captured again. The event is logged once the screenshot is in the
+    store, with the id of its store entry.
+    """
+    where = f" on monitor {monitor}" if monitor is not None else ""
+    message = f"Warning: Detected {content_type}{where} with confidence {score:.2f}. Please review the content."
+    logger.warning(message)
     if PARENT_MODE:
         try:
-            # Ensure screenshot dir exists
-            if PARENT_SCREENSHOT_DIR:
-                os.makedirs(PARENT_SCREENSHOT_DIR, exist_ok=True)
-                # Save screenshot
-                img = capture_screen()
-                timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-                screenshot_filename = f"screenshot_{timestamp}.png"
-                screenshot_path = os.path.join(PARENT_SCREENSHOT_DIR, screenshot_filename)
-                if isinstance(img, np.ndarray):
-                    img_pil = Image.fromarray(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
-                else:
-                    img_pil = img
-                img_pil.save(screenshot_path)
-                # Log event
-                event = {
-                    "timestamp": timestamp,
-                    "score": score,
-                    "screenshot": screenshot_filename,
-                    "content_type": content_type
-                }
+            timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            event = {
+                "timestamp": timestamp,
+                "score": score,
+                "screenshot_id": None,
+                "content_type": content_type,
+                "monitor": monitor
+            }
+
+            def log_event(entry_id):
+                event["screenshot_id"] = entry_id
                 if PARENT_REPORT_PATH:
-                    os.makedirs(os.path.dirname(PARENT_REPORT_PATH), exist_ok=True)
-                    if os.path.exists(PARENT_REPORT_PATH):
-                        with open(PARENT_REPORT_PATH, "r") as f:
-                            report = json.load(f)
-                    else:
-                        report = []
-                    report.insert(0, event)  # newest first
-                    with open(PARENT_REPORT_PATH, "w") as f:
-                        json.dump(report, f, indent=2)
+                    get_event_log().append(event)
+
+            if PARENT_SCREENSHOT_DIR:
+                if frame is None:
+                    from .capture import get_screen_capture
+                    # The capture buffer is reused, so the writer gets its own copy
+                    frame = (get_screen_capture().grab(monitor) if monitor is not None else capture_screen()).copy()
+                # Encoding happens on the writer thread, after the tab is already closed
+                get_screenshot_writer().submit(frame, on_done=log_event)
+            else:
+                log_event(None)
         except Exception as e:
-            print(f"Parent mode logging failed: {e}")
+            metrics.increment("errors")
+            logger.error(f"Parent mode logging failed: {e}")
+    from pyautogui import hotkey
     hotkey(*get_close_tab_action())
     time.sleep(0.1)
-    # engine.say(message)
-    # engine.runAndWait()
+    # get_tts_engine().say(message)
+    # get_tts_engine().runAndWait()
     if ENABLE_REDIRECT and MOTIVATIONAL_URL:
         try:
             webbrowser.get("chrome").open_new_tab(MOTIVATIONAL_URL)
         except Exception:
             webbrowser.open_new_tab(MOTIVATIONAL_URL)
 
+def _close_stage_capture():
+    from .capture import close_screen_capture
+    close_screen_capture()
+
+def _capture_stage_frames():
+    # Raw BGRA frames are fresh per grab, so they can cross to the inference thread without a copy
+    with metrics.timer("capture"):
+        return capture_screens(raw=True)
+
+def _classify_stage(frames):
+    start = time.perf_counter()
+    if voter:
+        verdicts, flagged = _vote_frames(frames)
+    else:
+        verdicts = scan_frames(frames)
+        flagged = [verdict for verdict in verdicts if verdict[1]]
+    elapsed = time.perf_counter() - start
+    metrics.observe("scan", elapsed)
+    metrics.increment("scans")
+    if scheduler:
+        scores = [verdict[3] for verdict in verdicts]
+        scheduler.record(changed=bool(verdicts), score=max(scores) if scores else None,
+                         threshold=NSFW_THRESHOLD, inference_time=elapsed)
+    _classify_stage.cycles += 1
+    if _classify_stage.cycles == 1:
+        startup_report.mark("first_scan", final=True)
+    if SKIP_REPORT_INTERVAL and _classify_stage.cycles % SKIP_REPORT_INTERVAL == 0:
+        stats = get_frame_gate_stats()
+        logger.info(f"Frame gate: skipped {stats['frames_skipped']}/{stats['frames_seen']} frames ({stats['skip_ratio']:.0%})")
+        cache_stats = get_verdict_cache_stats()
+        logger.info(f"Verdict cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses ({cache_stats['hit_ratio']:.0%})")
+        logger.info(f"Pipeline: {pipeline.stats()}")
+        if scheduler:
+            schedule = scheduler.stats()
+            logger.info(f"Scheduler: interval {schedule['interval']:.2f}s, effective scan rate {schedule['scan_rate']:.2f}/s")
+        if screenshot_writer:
+            logger.info(f"Screenshot writer: {screenshot_writer.stats()}")
+        if voter:
+            logger.info(f"Temporal voting: {voter.stats()}")
+        memory = get_memory_stats()
+        if memory["rss_mb"] is not None:
+            logger.info(f"Memory: {memory['rss_mb']:.0f} MB RSS, steady {memory['steady_rss_mb']:.0f} MB, peak {memory['peak_rss_mb']:.0f} MB")
+    if METRICS_PATH and time.monotonic() - _metrics_written >= METRICS_INTERVAL:
+        write_metrics()
+    if not flagged:
+        return None
+    monitor_index, _, content_type, score = max(flagged, key=lambda verdict: verdict[3])
+    frame = next(frame for index, frame in frames if index == monitor_index)
+    return {"monitor": monitor_index, "content_type": content_type, "score": score, "frame": frame}
+
+_classify_stage.cycles = 0
+
+def _action_stage(alert):
+    metrics.increment("alerts")
+    if scheduler:
+        scheduler.record_positive()
+    with metrics.timer("action"):
+        speak_alert(alert["content_type"], alert["score"], monitor=alert["monitor"], frame=alert["frame"])
+
+def get_scheduler_stats():
+    """Return the current scan interval and effective scan rate."""
+    if scheduler:
+        return scheduler.stats()
+    return {"interval": SCAN_INTERVAL, "scan_rate": 1.0 / SCAN_INTERVAL if SCAN_INTERVAL else 0.0}
+
+def get_pipeline_stats():
+    """Return frame, queue and action counters of the running (or last) pipeline."""
+    return pipeline.stats() if pipeline else {}
+
+def get_metrics():
+    """Return stage timers, counters and gauges of the current run (see monitor.metrics).
+
+    Pipeline, scheduler and screenshot writer state is sampled into the gauges, and
+    the pipeline's own stage errors are added to the "errors" counter.
+    """
+    snapshot = metrics.snapshot()
+    pipeline_stats = get_pipeline_stats()
+    snapshot["counters"]["errors"] = snapshot["counters"].get("errors", 0) + pipeline_stats.get("errors", 0)
+    snapshot["gauges"].update(
+        scan_interval=get_scheduler_stats()["interval"],
+        frame_queue_depth=pipeline_stats.get("frame_queue_depth", 0),
+        frames_dropped=pipeline_stats.get("frames_dropped", 0),
+        screenshot_queue_depth=get_screenshot_writer_stats().get("queue_depth", 0),
+        verdict_cache_hit_ratio=get_verdict_cache_stats()["hit_ratio"],
+    )
+    memory = get_memory_stats()
+    snapshot["gauges"].update(
+        rss_mb=memory["rss_mb"],
+        steady_rss_mb=memory["steady_rss_mb"],
+        peak_rss_mb=memory["peak_rss_mb"],
+        memory_budget_mb=memory["budget_mb"],
+        model_loaded=memory["model_loaded"],
+    )
+    return snapshot
+
+def get_status_line():
+    """One-line summary of the current run for the GUI."""
+    return status_line(get_metrics())
+
+def write_metrics():
+    """Write get_metrics() to METRICS_PATH."""
+    global _metrics_written
+    _metrics_written = time.monotonic()
+    try:
+        tmp_path = f"{METRICS_PATH}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(get_metrics(), f, indent=2)
+        os.replace(tmp_path, METRICS_PATH)
+    except OSError as e:
+        logger.warning(f"Could not write metrics to {METRICS_PATH}: {e}")
+
+def _start_metrics_server():
+    global metrics_server
+    if METRICS_PORT is None or metrics_server is not None:
+        return
+    try:
+        metrics_server = MetricsServer(get_metrics, METRICS_PORT)
+        logger.info(f"Metrics served on http://127.0.0.1:{metrics_server.port}/metrics")
+    except OSError as e:
+        logger.warning(f"Could not serve metrics on port {METRICS_PORT}: {e}")
+
+def _stop_metrics_server():
+    global metrics_server
+    if metrics_server is not None:
+        metrics_server.close()
+        metrics_server = None
+
 def main():
-    global classifier, loading_complete, monitoring_active
+    global classifier, loading_complete, monitoring_active, pipeline, monitor_run_id, scheduler, voter
     monitoring_active = True
-    print("Starting screen monitoring for adult content...")
-    while monitoring_active:
-        if not classifier:
-            print("Model not loaded yet.")
-            time.sleep(1)
-            continue
-        screen_img = capture_screen()
-        is_adult, content_type, score = has_adult_content(screen_img)
-        if is_adult:
-            speak_alert(content_type, score)
+    with run_lock:
+        monitor_run_id += 1
+        run_id = monitor_run_id
+    frame_gates.clear()
+    tile_trackers.clear()
+    _classify_stage.cycles = 0
+    logger.info("Starting screen monitoring for adult content...")
+    while monitoring_active and monitor_run_id == run_id and not model_ready():
+        logger.info("Model not loaded yet.")
         time.sleep(1)
+    if not monitoring_active or monitor_run_id != run_id:
+        return
+    scheduler = AdaptiveScheduler(
+        base_interval=SCAN_INTERVAL, min_interval=MIN_SCAN_INTERVAL, max_interval=MAX_SCAN_INTERVAL,
+        near_ratio=NEAR_THRESHOLD_RATIO,
+    ) if ADAPTIVE_SCHEDULING else None
+    from .voting import TemporalVoter
+    voter = TemporalVoter(k=VOTE_K, n=VOTE_N) if TEMPORAL_VOTING else None
+    pipeline = run_pipeline = MonitorPipeline(
+        capture=_capture_stage_frames,
+        classify=_classify_stage,
+        act=_action_stage,
+        is_running=lambda: monitoring_active and monitor_run_id == run_id,
+        # After an action the tab should be gone; make sure the next frames are checked regardless
+        reset=reset_scan_state,
+        interval=_next_capture_interval,
+        queue_size=PIPELINE_QUEUE_SIZE,
+        on_stage_exit=_close_stage_capture,
+    )
+    metrics.reset()
+    if model_load_seconds is not None:
+        metrics.set_gauge("model_load_seconds", model_load_seconds)
+    _start_metrics_server()
+    run_pipeline.run()
+    # The writer, event log, metrics and their server are module-wide: after a quick
+    # stop and start they already belong to the next run, which must not lose them
+    with run_lock:
+        if monitor_run_id == run_id:
+            close_screenshot_writer()
+            close_event_log()
+            if METRICS_PATH:
+                write_metrics()
+            _stop_metrics_server()
+        else:
+            logger.debug("Run %d ended after run %d started, leaving shared resources open", run_id, monitor_run_id)
+    stats = get_frame_gate_stats()
+    logger.info(f"Monitoring stopped, frame gate skipped {stats['frames_skipped']}/{stats['frames_seen']} frames")
+    logger.info(f"Pipeline: {run_pipeline.stats()}")
+    logger.info(f"Memory: {get_memory_stats()}")
 
 def stop_monitoring():
     global monitoring_active
-    print("Stopping monitoring...")
+    logger.info("Stopping monitoring...")
     monitoring_active = False
\ No newline at end of file
@@ -0,0 +1,324 @@
+"""Scan image folders and video files with the detector, without the GUI or a screen.
+
+    python -m monitor.offline_scan ~/screenshots recordings/ --output results.csv
+    python -m monitor.offline_scan dataset/ --positive nsfw porn --curve curve.json
+
+Paths are walked recursively. A pool of worker threads decodes images and samples
+videos every --video-interval seconds into a bounded queue, and the main thread
+scores the frames in batches with monitor.score_images(), so the inference backend
+and prefilter behave as in the live loop. Inference itself runs one batch at a
+time: the backend already spreads each batch over its intra-op threads, and
+concurrent batches would only compete for the same cores. Unlike the live loop,
+the verdict cache is bypassed, so near-duplicate images are each scored rather
+than sharing one cached score, and a failing batch stops the scan. Results stream
+to a CSV or JSON Lines file as they are scored. With --positive, everything below a
+folder with one of those names is labelled positive (the rest negative) and
+precision and recall are reported across thresholds.
+
+Settings come from the "monitor" section and nsfw_threshold of ~/.Guard/config.json
+unless --config points elsewhere; command-line options override them.
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp", ".bmp"}
+VIDEO_SUFFIXES = {".mp4", ".mkv", ".avi", ".mov", ".webm", ".wmv", ".m4v"}
+DEFAULT_THRESHOLDS = tuple(round(0.05 * i, 2) for i in range(1, 20))
+_DONE = object()
+
+
+def iter_media(paths):
+    """Yield (file, folders) for every image or video in `paths`, sorted.
+
+    Directories are walked recursively; `folders` are the names of the directories
+    between the given path and the file.
+    """
+    for path in map(Path, paths):
+        candidates = sorted(path.rglob("*")) if path.is_dir() else [path]
+        for candidate in candidates:
+            if candidate.suffix.lower() in IMAGE_SUFFIXES | VIDEO_SUFFIXES and candidate.is_file():
+                folders = candidate.parent.relative_to(path).parts if path.is_dir() else ()
+                yield candidate, folders
+
+
+def read_image(path):
+    """Decode an image file to an RGB array, or None if it cannot be read."""
+    import cv2
+    import numpy as np
+    # imdecode instead of imread, which cannot open non-ASCII paths on Windows
+    bgr = cv2.imdecode(np.fromfile(str(path), dtype=np.uint8), cv2.IMREAD_COLOR)
+    return cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB) if bgr is not None else None
+
+
+def iter_video_frames(path, interval=1.0):
+    """Yield (seconds, RGB frame) every `interval` seconds of a video.
+
+    Skipped frames are only grabbed, not decoded into images.
+    """
+    import cv2
+    capture = cv2.VideoCapture(str(path))
+    try:
+        fps = capture.get(cv2.CAP_PROP_FPS) or 25.0
+        step = max(1, round(fps * interval))
+        index = 0
+        while capture.grab():
+            if index % step == 0:
+                ok, bgr = capture.retrieve()
+                if ok:
+                    yield index / fps, cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+            index += 1
+    finally:
+        capture.release()
+
+
+def label_for(folders, positive):
+    """True if any of `folders` is named in `positive`, None without labels."""
+    if not positive:
+        return None
+    return any(folder.lower() in positive for folder in folders)
+
+
+class FrameReader:
+    """Decodes media files on `workers` threads into a queue of (path, seconds, frame) items.
+
+    Images have seconds None. The queue holds at most `queue_size` frames, so decoding
+    never runs far ahead of inference. Files that cannot be read are counted in
+    `unreadable` and skipped.
+    """
+
+    def __init__(self, paths, workers=4, video_interval=1.0, queue_size=32):
+        self._paths = queue.Queue()
+        for path in paths:
+            self._paths.put(path)
+        self.workers = max(1, int(workers))
+        self.video_interval = video_interval
+        self.frames = queue.Queue(maxsize=max(1, int(queue_size)))
+        self.unreadable = 0
+        self.decode_seconds = 0.0
+        self._lock = threading.Lock()
+        self._threads = [threading.Thread(target=self._work, name=f"guard-scan-{i}", daemon=True) for i in range(self.workers)]
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def _work(self):
+        try:
+            while True:
+                try:
+                    path = self._paths.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    self._read(path)
+                except Exception as e:
+                    with self._lock:
+                        self.unreadable += 1
+                    logger.warning(f"Could not read {path}: {e}")
+        finally:
+            self.frames.put(_DONE)
+
+    def _read(self, path):
+        start = time.perf_counter()
+        if path.suffix.lower() in VIDEO_SUFFIXES:
+            frames = iter_video_frames(path, self.video_interval)
+        else:
+            image = read_image(path)
+            if image is None:
+                raise ValueError("not a readable image")
+            frames = iter([(None, image)])
+        for seconds, frame in frames:
+            with self._lock:
+                self.decode_seconds += time.perf_counter() - start
+            self.frames.put((path, seconds, frame))
+            start = time.perf_counter()
+
+    def __iter__(self):
+        remaining = self.workers
+        while remaining:
+            item = self.frames.get()
+            if item is _DONE:
+                remaining -= 1
+            else:
+                yield item
+
+
+def iter_batches(items, batch_size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class ResultWriter:
+    """Streams one row per scored frame to a CSV or JSON Lines file (chosen by `fmt`)."""
+
+    FIELDS = ("path", "seconds", "score", "is_adult", "label")
+
+    def __init__(self, path, fmt):
+        self.fmt = fmt
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        if fmt == "csv":
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(self.FIELDS)
+
+    def write(self, row):
+        if self.fmt == "csv":
+            self._csv.writerow(["" if value is None else value for value in row])
+        else:
+            self._file.write(json.dumps(dict(zip(self.FIELDS, row))) + "\n")
+
+    def close(self):
+        self._file.close()
+
+
+def precision_recall(scored, thresholds=DEFAULT_THRESHOLDS):
+    """Precision, recall and F1 of (score, label) pairs at each threshold (score > threshold is positive)."""
+    curve = []
+    for threshold in thresholds:
+        tp = sum(1 for score, label in scored if label and score > threshold)
+        fp = sum(1 for score, label in scored if not label and score > threshold)
+        fn = sum(1 for score, label in scored if label and score <= threshold)
+        precision = tp / (tp + fp) if tp + fp else 1.0
+        recall = tp / (tp + fn) if tp + fn else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        curve.append({"threshold": threshold, "precision": precision, "recall": recall, "f1": f1,
+                      "tp": tp, "fp": fp, "fn": fn, "tn": len(scored) - tp - fp - fn})
+    return curve
+
+
+def load_config(path):
+    """Return (nsfw_threshold, monitor settings) from the app's config.json, or defaults if it is missing."""
+    try:
+        with open(path, "r") as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        return None, {}
+    return config.get("nsfw_threshold"), config.get("monitor", {})
+
+
+def scan(paths, output=None, fmt=None, positive=None, workers=4, batch_size=None, video_interval=1.0,
+         thresholds=DEFAULT_THRESHOLDS, progress_every=5.0):
+    """Score every image and sampled video frame under `paths` with the loaded model.
+
+    Writes one row per frame to `output` if given and returns a summary with
+    throughput and, when `positive` folder names are given, the precision/recall
+    curve. load_model() must have been called.
+    """
+    from . import monitor as monitor_mod
+    from .metrics import metrics
+    if not monitor_mod.model_ready():
+        raise RuntimeError(f"Model is not loaded: {monitor_mod.loading_error}")
+    positive = {name.lower() for name in positive or ()}
+    batch_size = batch_size or monitor_mod.INFERENCE_BATCH_SIZE
+    media = dict(iter_media(paths))
+    writer = ResultWriter(output, fmt or ("csv" if str(output).lower().endswith(".csv") else "jsonl")) if output else None
+    reader = FrameReader(media, workers=workers, video_interval=video_interval, queue_size=4 * batch_size).start()
+    metrics.reset()
+    scored, flagged, frames = [], 0, 0
+    start = last_progress = time.perf_counter()
+    try:
+        for batch in iter_batches(reader, batch_size):
+            # Not has_adult_content_batch(): it reports errors as scores of 0, which would skew the results
+            scores = monitor_mod.score_images([frame for _, _, frame in batch], batch_size=batch_size, use_cache=False)
+            for (path, seconds, _), score in zip(batch, scores):
+                is_adult = score > monitor_mod.NSFW_THRESHOLD
+                label = label_for(media[path], positive)
+                if writer:
+                    writer.write((str(path), seconds, round(float(score), 6), is_adult, label))
+                if label is not None:
+                    scored.append((float(score), label))
+                flagged += bool(is_adult)
+            frames += len(batch)
+            if progress_every and time.perf_counter() - last_progress >= progress_every:
+                last_progress = time.perf_counter()
+                logger.info(f"{frames} frames scored, {frames / (last_progress - start):.1f}/s")
+    finally:
+        if writer:
+            writer.close()
+    elapsed = time.perf_counter() - start
+    snapshot = metrics.snapshot()
+    summary = {
+        "files": len(media),
+        "unreadable": reader.unreadable,
+        "frames": frames,
+        "flagged": flagged,
+        "threshold": monitor_mod.NSFW_THRESHOLD,
+        "seconds": elapsed,
+        "frames_per_s": frames / elapsed if elapsed else 0.0,
+        "decode_seconds": reader.decode_seconds,
+        "stages": {name: snapshot["timers"][name] for name in ("hash", "prefilter", "convert", "inference") if name in snapshot["timers"]},
+        "counters": snapshot["counters"],
+    }
+    if positive:
+        curve = precision_recall(scored, thresholds)
+        summary["curve"] = curve
+        summary["best_f1"] = max(curve, key=lambda point: point["f1"]) if curve else None
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score image folders and video files with the detector, without the GUI.")
+    parser.add_argument("paths", nargs="+", help="Image or video files, or folders to walk")
+    parser.add_argument("--output", help="Write one row per frame here (.csv, otherwise JSON Lines)")
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="Output format (default: from the --output suffix)")
+    parser.add_argument("--positive", nargs="+", help="Folder names whose contents are labelled positive, e.g. nsfw porn")
+    parser.add_argument("--curve", help="Write the summary with the precision/recall curve to this JSON file")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=list(DEFAULT_THRESHOLDS))
+    parser.add_argument("--threshold", type=float, help="Threshold for the is_adult column (default: nsfw_threshold from the config)")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1), help="Decoding threads")
+    parser.add_argument("--batch-size", type=int, help="Frames per forward pass (default: inference_batch_size)")
+    parser.add_argument("--video-interval", type=float, default=1.0, help="Seconds between sampled video frames")
+    parser.add_argument("--backend", help="Inference backend (default: inference_backend from the config)")
+    parser.add_argument("--no-prefilter", action="store_true", help="Score every frame with the model, e.g. for unbiased curves")
+    parser.add_argument("--config", default=str(Path.home() / ".Guard" / "config.json"))
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s", force=True)
+
+    from . import monitor as monitor_mod
+    threshold, settings = load_config(args.config)
+    monitor_mod.apply_settings(settings)
+    if args.backend:
+        monitor_mod.INFERENCE_BACKEND = args.backend
+    if args.no_prefilter:
+        monitor_mod.PREFILTER_ENABLED = False
+    if args.threshold is not None or threshold is not None:
+        monitor_mod.set_nsfw_threshold(args.threshold if args.threshold is not None else threshold)
+    monitor_mod.load_model()
+    if monitor_mod.classifier is None:
+        sys.exit(f"Model failed to load: {monitor_mod.loading_error}")
+
+    summary = scan(args.paths, output=args.output, fmt=args.format, positive=args.positive, workers=args.workers,
+                   batch_size=args.batch_size, video_interval=args.video_interval, thresholds=args.thresholds)
+    print(f"{summary['frames']} frames from {summary['files']} files in {summary['seconds']:.1f}s "
+          f"({summary['frames_per_s']:.1f} frames/s), {summary['flagged']} over {summary['threshold']}, "
+          f"{summary['unreadable']} unreadable")
+    if "curve" in summary:
+        print("threshold  precision  recall     f1")
+        for point in summary["curve"]:
+            print(f"{point['threshold']:9.2f}  {point['precision']:9.3f}  {point['recall']:6.3f}  {point['f1']:5.3f}")
+        best = summary["best_f1"]
+        if best:
+            print(f"Best F1 {best['f1']:.3f} at threshold {best['threshold']}")
+    if args.curve:
+        with open(args.curve, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class DropOldestQueue:
+    """Bounded queue whose put() discards the oldest item instead of blocking when full.
+
+    `on_drop(item)`, if given, is called for every discarded item.
+    """
+
+    def __init__(self, maxsize, on_drop=None):
+        self._queue = queue.Queue(maxsize=max(1, int(maxsize)))
+        self.on_drop = on_drop
+        self.dropped = 0
+
+    def put(self, item):
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    discarded = self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    continue
+                if self.on_drop:
+                    self.on_drop(discarded)
+
+    def get(self, timeout=None):
+        """Return the next item, raising queue.Empty after `timeout` seconds."""
+        return self._queue.get(timeout=timeout)
+
+    def qsize(self):
+        return self._queue.qsize()
+
+
+class MonitorPipeline:
+    """Runs capture, inference and action as three threads joined by drop-oldest queues.
+
+    - `capture()` returns the frames of one scan cycle.
+    - `classify(frames)` returns an alert (anything truthy) or None.
+    - `act(alert)` handles an alert, e.g. closes the tab and logs the event.
+    - `reset()`, if given, is called from the inference thread before it looks at
+      the first frame captured after an action completed.
+
+    While an action is pending, and for frames captured before it finished, the
+    inference stage discards frames so one piece of content cannot trigger a second
+    action (a second tab close) while the first is still being handled.
+    `is_running()` is polled by every stage; `run()` returns once all have exited.
+    `interval` is either a fixed number of seconds between captures or a callable
+    returning the next delay, e.g. `AdaptiveScheduler.next_interval`.
+    `wake()` cuts the current wait between captures short.
+    `on_stage_exit()`, if given, runs at the end of each stage thread, e.g. to release
+    thread-bound resources such as capture sessions.
+    """
+
+    POLL_TIMEOUT = 0.5
+
+    def __init__(self, capture, classify, act, is_running, reset=None, interval=1.0, queue_size=2, on_stage_exit=None):
+        self.capture = capture
+        self.classify = classify
+        self.act = act
+        self.is_running = is_running
+        self.reset = reset
+        self.interval = interval
+        self.on_stage_exit = on_stage_exit
+        self.frame_queue = DropOldestQueue(queue_size)
+        self.action_queue = DropOldestQueue(queue_size)
+        self._action_pending = threading.Event()
+        self._last_action_done = 0.0
+        self._reset_needed = False
+        self._wake = threading.Event()
+        self.frames_captured = 0
+        self.frames_classified = 0
+        self.frames_discarded = 0
+        self.actions = 0
+        self.errors = 0
+
+    def run(self):
+        stages = [
+            threading.Thread(target=self._run_stage, args=(self._capture_stage,), name="guard-capture", daemon=True),
+            threading.Thread(target=self._run_stage, args=(self._inference_stage,), name="guard-inference", daemon=True),
+            threading.Thread(target=self._run_stage, args=(self._action_stage,), name="guard-action", daemon=True),
+        ]
+        for stage in stages:
+            stage.start()
+        for stage in stages:
+            stage.join()
+
+    def _run_stage(self, stage):
+        try:
+            stage()
+        finally:
+            if self.on_stage_exit:
+                self.on_stage_exit()
+
+    def _capture_stage(self):
+        while self.is_running():
+            try:
+                frames = self.capture()
+                self.frame_queue.put((time.monotonic(), frames))
+                self.frames_captured += 1
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Capture failed: {e}")
+            self._sleep(self.interval() if callable(self.interval) else self.interval)
+
+    def _inference_stage(self):
+        while self.is_running():
+            try:
+                captured_at, frames = self.frame_queue.get(timeout=self.POLL_TIMEOUT)
+            except queue.Empty:
+                continue
+            if self._action_pending.is_set() or captured_at <= self._last_action_done:
+                self.frames_discarded += 1
+                continue
+            if self._reset_needed and self.reset:
+                self.reset()
+            self._reset_needed = False
+            try:
+                alert = self.classify(frames)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Inference failed: {e}")
+                continue
+            self.frames_classified += 1
+            if alert:
+                self._action_pending.set()
+                self.action_queue.put(alert)
+
+    def _action_stage(self):
+        while self.is_running():
+            try:
+                alert = self.action_queue.get(timeout=self.POLL_TIMEOUT)
+            except queue.Empty:
+                continue
+            try:
+                self.act(alert)
+                self.actions += 1
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Alert action failed: {e}")
+            finally:
+                self._last_action_done = time.monotonic()
+                self._reset_needed = True
+                self._action_pending.clear()
+
+    def wake(self):
+        self._wake.set()
+
+    def _sleep(self, seconds):
+        # Sleep in short slices so stop requests are noticed promptly
+        deadline = time.monotonic() + seconds
+        while self.is_running():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            if self._wake.wait(min(remaining, self.POLL_TIMEOUT)):
+                self._wake.clear()
+                return
+
+    def stats(self):
+        return {
+            "frames_captured": self.frames_captured,
+            "frames_classified": self.frames_classified,
+            "frames_discarded": self.frames_discarded,
+            "frames_dropped": self.frame_queue.dropped,
+            "alerts_dropped": self.action_queue.dropped,
+            "frame_queue_depth": self.frame_queue.qsize(),
+            "action_queue_depth": self.action_queue.qsize(),
+            "actions": self.actions,
+            "errors": self.errors,
+        }
@@ -0,0 +1,55 @@
+import cv2
+import numpy as np
+
+# Skin chrominance box in YCrCb (Chai & Ngan); luma is ignored so lighting matters less
+SKIN_CR = (133, 173)
+SKIN_CB = (77, 127)
+
+
+class SkinPrefilter:
+    """First stage of the detection cascade: clears frames with almost no skin tones.
+
+    The frame is area-downscaled so its longer side is `max_side` pixels, converted
+    to YCrCb, and the fraction of pixels inside the skin chrominance box is its
+    score. Frames scoring below `threshold` are cleared without running the model;
+    everything else escalates. Code editors, terminals, spreadsheets and most UI
+    score close to zero, while any visible photo of people escalates, so a low
+    threshold keeps recall high. Arrays with 4 channels are BGRA, 3 channels RGB.
+    """
+
+    def __init__(self, threshold=0.005, max_side=128):
+        self.threshold = float(threshold)
+        self.max_side = int(max_side)
+        self.cleared = 0
+        self.escalated = 0
+
+    def score(self, frame):
+        """Fraction of skin-toned pixels in the downscaled frame (0-1)."""
+        height, width = frame.shape[:2]
+        scale = self.max_side / max(height, width)
+        if scale < 1:
+            frame = cv2.resize(frame, (max(1, round(width * scale)), max(1, round(height * scale))), interpolation=cv2.INTER_AREA)
+        if frame.ndim == 2:
+            return 0.0  # No colour, no skin tones
+        code = cv2.COLOR_BGR2YCrCb if frame.shape[2] == 4 else cv2.COLOR_RGB2YCrCb
+        ycrcb = cv2.cvtColor(np.ascontiguousarray(frame[..., :3]), code)
+        cr, cb = ycrcb[..., 1], ycrcb[..., 2]
+        skin = (cr >= SKIN_CR[0]) & (cr <= SKIN_CR[1]) & (cb >= SKIN_CB[0]) & (cb <= SKIN_CB[1])
+        return float(np.count_nonzero(skin)) / skin.size
+
+    def should_escalate(self, frame):
+        """Return True if `frame` has to go to the classifier."""
+        escalate = self.score(frame) >= self.threshold
+        if escalate:
+            self.escalated += 1
+        else:
+            self.cleared += 1
+        return escalate
+
+    def stats(self):
+        total = self.cleared + self.escalated
+        return {
+            "cleared": self.cleared,
+            "escalated": self.escalated,
+            "pass_through_rate": self.escalated / total if total else 0.0,
+        }
@@ -0,0 +1,85 @@
+import time
+from collections import deque
+
+
+class AdaptiveScheduler:
+    """Chooses the delay before the next capture from recent scan results.
+
+    - Right after a positive verdict, or after a score within `near_ratio` of the
+      threshold, scans run at `min_interval`. Both last `positive_hold` seconds; a
+      near-threshold score also lapses once the screen has been idle for more than
+      `idle_after` cycles.
+    - While the screen keeps changing, scans run at `base_interval`.
+    - After `idle_after` cycles without change the interval grows by `idle_backoff`
+      per further idle cycle, up to `max_interval`.
+    - The interval never drops below the smoothed inference time, since capturing
+      faster than frames can be classified only fills the queue.
+    """
+
+    def __init__(self, base_interval=1.0, min_interval=0.25, max_interval=3.0, near_ratio=0.5,
+                 positive_hold=30.0, idle_after=5, idle_backoff=1.3, window=30):
+        self.base_interval = float(base_interval)
+        self.min_interval = float(min_interval)
+        self.max_interval = float(max_interval)
+        self.near_ratio = float(near_ratio)
+        self.positive_hold = float(positive_hold)
+        self.idle_after = int(idle_after)
+        self.idle_backoff = float(idle_backoff)
+        self.idle_streak = 0
+        self.last_score = 0.0
+        self.last_threshold = 1.0
+        self.last_score_at = None
+        self.last_positive_at = None
+        self.inference_time = 0.0
+        self._captures = deque(maxlen=max(2, int(window)))
+        self.current_interval = self.base_interval
+
+    def record(self, changed, score=None, threshold=None, inference_time=None):
+        """Feed the outcome of one inference cycle."""
+        self.idle_streak = 0 if changed else self.idle_streak + 1
+        if score is not None:
+            self.last_score = float(score)
+            self.last_score_at = time.monotonic()
+        if threshold is not None:
+            self.last_threshold = float(threshold)
+        if inference_time is not None:
+            # Exponential moving average, so one slow pass does not stall scanning
+            self.inference_time = inference_time if not self.inference_time else 0.7 * self.inference_time + 0.3 * inference_time
+
+    def record_positive(self):
+        self.last_positive_at = time.monotonic()
+        self.idle_streak = 0
+
+    def next_interval(self):
+        """Return the delay before the next capture and note the capture time for rate reporting."""
+        now = time.monotonic()
+        self._captures.append(now)
+        recently_positive = self.last_positive_at is not None and now - self.last_positive_at < self.positive_hold
+        # Unchanged frames carry no new score, so a borderline one must not pin the interval forever
+        near_threshold = (self.last_score_at is not None and now - self.last_score_at < self.positive_hold
+                          and self.idle_streak <= self.idle_after
+                          and self.last_score >= self.near_ratio * self.last_threshold)
+        if recently_positive or near_threshold:
+            interval = self.min_interval
+        elif self.idle_streak > self.idle_after:
+            interval = self.base_interval * self.idle_backoff ** (self.idle_streak - self.idle_after)
+        else:
+            interval = self.base_interval
+        interval = max(interval, self.inference_time)
+        self.current_interval = min(self.max_interval, max(self.min_interval, interval))
+        return self.current_interval
+
+    def scan_rate(self):
+        """Captures per second over the recent window."""
+        if len(self._captures) < 2:
+            return 0.0
+        span = self._captures[-1] - self._captures[0]
+        return (len(self._captures) - 1) / span if span > 0 else 0.0
+
+    def stats(self):
+        return {
+            "interval": self.current_interval,
+            "scan_rate": self.scan_rate(),
+            "idle_streak": self.idle_streak,
+            "inference_time": self.inference_time,
+        }
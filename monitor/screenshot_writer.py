@@ -0,0 +1,110 @@
+import io
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+from .pipeline import DropOldestQueue
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {"jpeg": ("JPEG", ".jpg"), "webp": ("WEBP", ".webp"), "png": ("PNG", ".png")}
+
+
+class ScreenshotWriter:
+    """Encodes alert screenshots on a background thread and adds them to a ScreenshotStore.
+
+    `submit()` only enqueues the frame, so closing the offending tab is never held
+    up by image encoding. Frames may be RGB arrays, BGRA screen buffers or PIL
+    images; they must not be modified after submission. If more than `queue_size`
+    screenshots are waiting, the oldest is dropped and counted.
+    """
+
+    def __init__(self, store, fmt="jpeg", quality=85, max_width=None, queue_size=8):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown screenshot format '{fmt}', expected one of: {', '.join(FORMATS)}")
+        self.store = store
+        self.format, self.extension = FORMATS[fmt]
+        self.quality = int(quality)
+        self.max_width = int(max_width) if max_width else None
+        self._queue = DropOldestQueue(queue_size, on_drop=self._dropped)
+        self._encode_times = deque(maxlen=100)
+        self.written = 0
+        self.failed = 0
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="guard-screenshots", daemon=True)
+        self._thread.start()
+
+    def submit(self, frame, on_done=None):
+        """Queue `frame` to be stored.
+
+        `on_done(entry_id)`, if given, runs on the writer thread with the id of the
+        store entry holding the screenshot, or None if it could not be saved. If
+        the frame is dropped from a full queue it runs with None right away.
+        """
+        self._queue.put((frame, on_done))
+
+    def _dropped(self, item):
+        frame, on_done = item
+        if on_done:
+            on_done(None)
+
+    def _run(self):
+        while self._running or self._queue.qsize():
+            try:
+                frame, on_done = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            start = time.perf_counter()
+            entry_id = None
+            try:
+                data, phash = self._encode(frame)
+                entry_id = self.store.put(data, self.extension, phash)
+                self.written += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Failed to save screenshot: {e}")
+            self._encode_times.append(time.perf_counter() - start)
+            if on_done:
+                on_done(entry_id)
+
+    def _encode(self, frame):
+        """Return the encoded image bytes and the perceptual hash used for dedup."""
+        import cv2
+        import numpy as np
+        from PIL import Image
+        from utils.phash import dhash
+
+        if isinstance(frame, np.ndarray):
+            if frame.ndim == 3 and frame.shape[2] == 4:
+                frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2RGB)
+            if self.max_width and frame.shape[1] > self.max_width:
+                height = round(frame.shape[0] * self.max_width / frame.shape[1])
+                frame = cv2.resize(frame, (self.max_width, height), interpolation=cv2.INTER_AREA)
+            image = Image.fromarray(frame)
+        else:
+            image = frame.convert("RGB")
+            if self.max_width and image.width > self.max_width:
+                image = image.resize((self.max_width, round(image.height * self.max_width / image.width)), Image.Resampling.LANCZOS)
+        options = {"quality": self.quality} if self.format in ("JPEG", "WEBP") else {"optimize": False}
+        buffer = io.BytesIO()
+        image.save(buffer, self.format, **options)
+        return buffer.getvalue(), dhash(image)
+
+    def close(self, timeout=5.0):
+        """Stop after writing whatever is still queued (waiting at most `timeout` seconds)."""
+        self._running = False
+        self._thread.join(timeout)
+
+    def stats(self):
+        times = sorted(self._encode_times)
+        return {
+            "queue_depth": self._queue.qsize(),
+            "written": self.written,
+            "failed": self.failed,
+            "dropped": self._queue.dropped,
+            **self.store.stats(),
+            "encode_ms_avg": 1000 * sum(times) / len(times) if times else 0.0,
+            "encode_ms_p95": 1000 * times[int(0.95 * (len(times) - 1))] if times else 0.0,
+        }
@@ -0,0 +1,182 @@
+"""Find the inference threading that suits this machine and save it to config.json.
+
+    python -m monitor.thread_tuning              # measure, then save the choice
+    python -m monitor.thread_tuning --dry-run    # measure only
+
+Every candidate (intra-op threads, inter-op threads, optional CPU affinity) is
+measured in its own subprocess, because torch fixes its inter-op pool on first use
+and affinity applies to the whole process. Each one loads the model with the
+configured backend and times forward passes of screen-sized frames through the
+monitor's own classification path, recording latency and CPU time per pass.
+
+The choice is the candidate with the fewest threads (then the fewest cores, then
+the lowest CPU time) whose median latency is within --tolerance of the fastest,
+so the detector does not hold cores it gains almost nothing from. It is saved
+under "thread_tuning" in ~/.Guard/config.json and applied each time monitoring
+starts, including by an app that is already open (which keeps the saved result
+when it writes its own settings); intra_op_threads, inter_op_threads and cpu_affinity in the "monitor" section
+override it.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+DEFAULT_CONFIG_PATH = Path.home() / ".Guard" / "config.json"
+TUNING_KEYS = ("intra_op_threads", "inter_op_threads", "cpu_affinity")
+
+
+def candidate_settings(logical=None, physical=None):
+    """Thread counts up to the physical core count, each with and without inter-op parallelism.
+
+    On machines with 4 or more logical CPUs every combination is also tried pinned to
+    the first half of them, leaving the rest to foreground applications.
+    """
+    import psutil
+    logical = logical or os.cpu_count() or 1
+    physical = physical or psutil.cpu_count(logical=False) or logical
+    intra_counts = sorted({count for count in (1, 2, 4, physical // 2, physical) if 1 <= count <= physical})
+    affinities = [None]
+    if logical >= 4 and hasattr(psutil.Process(), "cpu_affinity"):
+        affinities.append(list(range(logical // 2)))
+    candidates = []
+    for affinity in affinities:
+        cores = len(affinity) if affinity else logical
+        for intra in intra_counts:
+            if intra > cores:
+                continue
+            for inter in (1, 2):
+                candidates.append({"intra_op_threads": intra, "inter_op_threads": inter, "cpu_affinity": affinity})
+    return candidates
+
+
+def measure(candidate, iterations=20, batch_size=1, warmup=3, height=1080, width=1920, settings=None):
+    """Load the model under `candidate` in this process and time `iterations` forward passes."""
+    import numpy as np
+    from . import monitor as monitor_mod
+    monitor_mod.apply_settings(settings or {})
+    monitor_mod.INTRA_OP_THREADS = candidate["intra_op_threads"]
+    monitor_mod.INTER_OP_THREADS = candidate["inter_op_threads"]
+    monitor_mod.CPU_AFFINITY = candidate["cpu_affinity"]
+    monitor_mod.load_model()
+    if monitor_mod.classifier is None:
+        raise RuntimeError(f"Model failed to load: {monitor_mod.loading_error}")
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, size=(height, width, 4), dtype=np.uint8) for _ in range(batch_size)]
+    for _ in range(warmup):
+        monitor_mod._classify_misses(frames, batch_size)
+    latencies, cpu = [], []
+    for _ in range(iterations):
+        wall, process = time.perf_counter(), time.process_time()
+        monitor_mod._classify_misses(frames, batch_size)
+        latencies.append(time.perf_counter() - wall)
+        cpu.append(time.process_time() - process)
+    latencies.sort()
+    return {
+        "p50_ms": 1000 * latencies[len(latencies) // 2],
+        "p95_ms": 1000 * latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+        "cpu_ms": 1000 * sum(cpu) / len(cpu),
+    }
+
+
+def measure_in_subprocess(candidate, iterations, batch_size, settings, timeout=600):
+    """Run `measure()` for one candidate in a fresh interpreter; returns its result or {"error": ...}."""
+    command = [sys.executable, "-m", "monitor.thread_tuning", "--worker", json.dumps(candidate),
+               "--iterations", str(iterations), "--batch-size", str(batch_size), "--settings", json.dumps(settings)]
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, timeout=timeout,
+                                cwd=Path(__file__).resolve().parent.parent)
+    except subprocess.TimeoutExpired:
+        return {"error": f"timed out after {timeout}s"}
+    lines = result.stdout.strip().splitlines()
+    if result.returncode != 0 or not lines:
+        return {"error": (result.stderr.strip().splitlines() or [f"exit code {result.returncode}"])[-1]}
+    return json.loads(lines[-1])
+
+
+def choose(results, tolerance=0.1):
+    """Pick the cheapest successful candidate whose p50 latency is within `tolerance` of the fastest."""
+    measured = [result for result in results if "p50_ms" in result]
+    if not measured:
+        return None
+    fastest = min(result["p50_ms"] for result in measured)
+    eligible = [result for result in measured if result["p50_ms"] <= fastest * (1 + tolerance)]
+    logical = os.cpu_count() or 1
+    return min(eligible, key=lambda result: (
+        result["intra_op_threads"] + result["inter_op_threads"],
+        len(result["cpu_affinity"]) if result["cpu_affinity"] else logical,
+        result["cpu_ms"],
+    ))
+
+
+def save_tuning(choice, config_path=DEFAULT_CONFIG_PATH, results=None, backend=None):
+    """Store `choice` under "thread_tuning" in config.json, keeping everything else in the file."""
+    config_path = Path(config_path)
+    config = {}
+    if config_path.exists():
+        with open(config_path, "r") as f:
+            config = json.load(f)
+    config["thread_tuning"] = {
+        **{key: choice[key] for key in TUNING_KEYS},
+        "p50_ms": choice["p50_ms"],
+        "cpu_ms": choice["cpu_ms"],
+        "backend": backend,
+        "tuned_at": datetime.now().isoformat(timespec="seconds"),
+        "candidates": results or [],
+    }
+    config_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = config_path.with_suffix(".json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(config, f, indent=2)
+    os.replace(tmp_path, config_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure inference threading settings and save the best one.")
+    parser.add_argument("--config", default=str(DEFAULT_CONFIG_PATH))
+    parser.add_argument("--iterations", type=int, default=20, help="Timed forward passes per candidate")
+    parser.add_argument("--batch-size", type=int, default=1, help="Frames per forward pass (1 is typical of live scanning)")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Accept candidates this much slower than the fastest if they use fewer threads")
+    parser.add_argument("--dry-run", action="store_true", help="Do not write the config")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--settings", default="{}", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        result = measure(json.loads(args.worker), iterations=args.iterations, batch_size=args.batch_size,
+                         settings=json.loads(args.settings))
+        print(json.dumps(result))
+        return
+
+    settings = {}
+    if Path(args.config).exists():
+        with open(args.config, "r") as f:
+            settings = json.load(f).get("monitor", {})
+    # Measure the configured model and backend, but never a manual threading override
+    settings = {key: value for key, value in settings.items() if key not in TUNING_KEYS}
+    candidates = candidate_settings()
+    results = []
+    for number, candidate in enumerate(candidates, 1):
+        print(f"[{number}/{len(candidates)}] intra={candidate['intra_op_threads']} inter={candidate['inter_op_threads']} "
+              f"affinity={candidate['cpu_affinity'] or 'all'} ... ", end="", flush=True)
+        result = dict(candidate, **measure_in_subprocess(candidate, args.iterations, args.batch_size, settings))
+        results.append(result)
+        print(result["error"] if "error" in result else f"p50 {result['p50_ms']:.1f} ms, cpu {result['cpu_ms']:.1f} ms")
+    choice = choose(results, args.tolerance)
+    if choice is None:
+        sys.exit("No candidate could be measured")
+    print(f"Chosen: intra={choice['intra_op_threads']} inter={choice['inter_op_threads']} "
+          f"affinity={choice['cpu_affinity'] or 'all'} (p50 {choice['p50_ms']:.1f} ms)")
+    if not args.dry_run:
+        from . import monitor as monitor_mod
+        save_tuning(choice, args.config, results, backend=settings.get("inference_backend", monitor_mod.INFERENCE_BACKEND))
+        print(f"Saved to {args.config}; applied the next time monitoring starts "
+              "(a changed inter-op thread count needs the app to be restarted)")
+
+
+if __name__ == "__main__":
+    main()
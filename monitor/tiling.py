@@ -0,0 +1,102 @@
+import cv2
+import numpy as np
+
+
+class TileTracker:
+    """Splits frames into a rows x cols grid and reports which tiles changed since the last pass.
+
+    The whole frame is area-downsampled once to `cell` pixels per tile, so tracking
+    costs about the same as the full-frame change gate regardless of grid size.
+    """
+
+    def __init__(self, rows=3, cols=3, threshold=0.02, cell=16, pixel_tolerance=8):
+        self.rows = int(rows)
+        self.cols = int(cols)
+        self.threshold = float(threshold)
+        self.cell = int(cell)
+        self.pixel_tolerance = float(pixel_tolerance)
+        self._reference = None
+        self.tiles_checked = 0
+        self.tiles_dirty = 0
+
+    def signature(self, frame):
+        size = (self.cols * self.cell, self.rows * self.cell)
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)[..., :3]
+        return small.mean(axis=2, dtype=np.float32)
+
+    def update(self, frame):
+        """Return the (row, col) tiles that changed since the previous call."""
+        signature = self.signature(frame)
+        reference, self._reference = self._reference, signature
+        all_tiles = [(r, c) for r in range(self.rows) for c in range(self.cols)]
+        self.tiles_checked += len(all_tiles)
+        if reference is None:
+            self.tiles_dirty += len(all_tiles)
+            return all_tiles
+        changed = np.abs(signature - reference) > self.pixel_tolerance
+        # Fraction of changed cells per tile
+        per_tile = changed.reshape(self.rows, self.cell, self.cols, self.cell).mean(axis=(1, 3))
+        dirty = [(r, c) for r, c in all_tiles if per_tile[r, c] >= self.threshold]
+        self.tiles_dirty += len(dirty)
+        return dirty
+
+    def reset(self):
+        """Forget the reference so every tile is dirty on the next update."""
+        self._reference = None
+
+    def tile_rect(self, frame_shape, r0, c0, r1=None, c1=None):
+        """Pixel rectangle (top, bottom, left, right) covering tiles r0..r1 x c0..c1 inclusive."""
+        r1 = r0 if r1 is None else r1
+        c1 = c0 if c1 is None else c1
+        height, width = frame_shape[:2]
+        return (r0 * height // self.rows, (r1 + 1) * height // self.rows,
+                c0 * width // self.cols, (c1 + 1) * width // self.cols)
+
+    def dirty_rects(self, frame_shape, dirty, merge=False):
+        """Pixel bounds of the dirty tiles, optionally merged into larger rectangles.
+
+        Merging means fewer crops per batch but each is squashed harder into the
+        model input, so per-tile crops are the default.
+        """
+        if merge:
+            return [self.tile_rect(frame_shape, *block) for block in merge_tiles(dirty)]
+        return [self.tile_rect(frame_shape, r, c) for r, c in dirty]
+
+    def stats(self):
+        return {
+            "grid": [self.rows, self.cols],
+            "tiles_checked": self.tiles_checked,
+            "tiles_dirty": self.tiles_dirty,
+            "dirty_ratio": self.tiles_dirty / self.tiles_checked if self.tiles_checked else 0.0,
+        }
+
+
+def merge_tiles(tiles):
+    """Merge (row, col) tiles into rectangles (r0, c0, r1, c1).
+
+    Horizontal runs are found per row, then a run is extended downward while the
+    next row has a run with exactly the same columns.
+    """
+    tiles = set(tiles)
+    runs = []
+    for r in sorted({r for r, _ in tiles}):
+        cols = sorted(c for rr, c in tiles if rr == r)
+        start = prev = cols[0]
+        for c in cols[1:] + [None]:
+            if c is not None and c == prev + 1:
+                prev = c
+                continue
+            runs.append((r, start, prev))
+            if c is not None:
+                start = prev = c
+    rects = []
+    open_rects = {}  # (c0, c1) -> index into rects of a rectangle ending on the previous row
+    for r, c0, c1 in runs:
+        index = open_rects.get((c0, c1))
+        if index is not None and rects[index][2] == r - 1:
+            r0, _, _, _ = rects[index]
+            rects[index] = (r0, c0, r, c1)
+        else:
+            rects.append((r, c0, r, c1))
+            open_rects[(c0, c1)] = len(rects) - 1
+    return [(r0, c0, r1, c1) for r0, c0, r1, c1 in rects]
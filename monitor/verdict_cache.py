@@ -0,0 +1,55 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class VerdictCache:
+    """Bounded LRU cache of NSFW scores keyed by a perceptual hash of the frame.
+
+    Only the raw score is stored; callers compare it against the current threshold,
+    so changing the sensitivity never requires flushing the cache.
+    """
+
+    def __init__(self, max_size=256, ttl=300.0):
+        self.max_size = int(max_size)
+        self.ttl = float(ttl) if ttl else None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                score, stored_at = entry
+                if self.ttl is None or time.monotonic() - stored_at <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return score
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, score):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (float(score), time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
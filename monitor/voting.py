@@ -0,0 +1,78 @@
+import cv2
+
+
+def downscale(frame, max_side):
+    """Area-downscale `frame` so its longer side is at most `max_side` pixels (returned as is if smaller)."""
+    height, width = frame.shape[:2]
+    scale = max_side / max(height, width)
+    if scale >= 1:
+        return frame
+    return cv2.resize(frame, (max(1, round(width * scale)), max(1, round(height * scale))), interpolation=cv2.INTER_AREA)
+
+
+def confirmation_regions(frame, rows, cols):
+    """The full frame followed by the cells of a rows x cols grid, for a high-resolution look."""
+    height, width = frame.shape[:2]
+    regions = [frame]
+    if rows * cols > 1:
+        regions.extend(frame[r * height // rows:(r + 1) * height // rows, c * width // cols:(c + 1) * width // cols]
+                       for r in range(rows) for c in range(cols))
+    return regions
+
+
+class TemporalVoter:
+    """Decides alerts by a k-of-n vote over confirmation frames instead of a single score.
+
+    Routine scans only nominate a monitor: `trigger(index)` starts a confirmation
+    burst for it. Each following confirmation frame casts one vote via
+    `vote(index, positive)`, which returns True once `k` of the last `n` votes are
+    positive (alert), False once that can no longer happen within the burst
+    (cleared), and None while undecided. A burst lasts at most `n` frames.
+    """
+
+    def __init__(self, k=2, n=3):
+        self.n = max(1, int(n))
+        self.k = min(max(1, int(k)), self.n)
+        self._bursts = {}  # monitor index -> votes cast so far
+        self.triggered = 0
+        self.confirmed = 0
+        self.rejected = 0
+
+    @property
+    def confirming(self):
+        """Monitors currently in a confirmation burst."""
+        return set(self._bursts)
+
+    def trigger(self, index):
+        if index not in self._bursts:
+            self._bursts[index] = []
+            self.triggered += 1
+
+    def vote(self, index, positive):
+        votes = self._bursts.get(index)
+        if votes is None:
+            return None
+        votes.append(bool(positive))
+        if sum(votes) >= self.k:
+            del self._bursts[index]
+            self.confirmed += 1
+            return True
+        if sum(votes) + self.n - len(votes) < self.k:
+            del self._bursts[index]
+            self.rejected += 1
+            return False
+        return None
+
+    def reset(self):
+        """Abandon every burst in progress."""
+        self._bursts.clear()
+
+    def stats(self):
+        return {
+            "k": self.k,
+            "n": self.n,
+            "confirming": sorted(self._bursts),
+            "triggered": self.triggered,
+            "confirmed": self.confirmed,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,105 @@
+"""Locate the foreground window for the foreground_window capture mode.
+
+`foreground_window_rect()` returns the focused window's (left, top, width, height)
+in virtual-screen pixels, or None whenever the window system cannot tell (nothing
+focused, minimized, Wayland, unsupported OS); callers then grab whole monitors.
+
+- Windows: GetForegroundWindow / GetWindowRect through ctypes. mss makes the
+  process DPI aware, so these are physical pixels like its grabs.
+- X11: the root window's _NET_ACTIVE_WINDOW through python-xlib if it is
+  installed, otherwise `xdotool getactivewindow getwindowgeometry`.
+"""
+import importlib.util
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Windows smaller than this (in either direction) are ignored, e.g. focused tooltips
+MIN_WINDOW_SIDE = 64
+
+_UNRESOLVED = object()
+_locator = _UNRESOLVED
+_xlib = threading.local()
+
+
+def _windows_rect():
+    import ctypes
+    from ctypes import wintypes
+    user32 = ctypes.windll.user32
+    hwnd = user32.GetForegroundWindow()
+    if not hwnd or user32.IsIconic(hwnd):
+        return None
+    rect = wintypes.RECT()
+    if not user32.GetWindowRect(hwnd, ctypes.byref(rect)):
+        return None
+    return rect.left, rect.top, rect.right - rect.left, rect.bottom - rect.top
+
+
+def _xlib_rect():
+    from Xlib import X
+    from Xlib.display import Display
+    # Display connections are not thread safe, so each capture thread opens its own
+    display = getattr(_xlib, "display", None)
+    if display is None:
+        display = _xlib.display = Display()
+    root = display.screen().root
+    active = root.get_full_property(display.intern_atom("_NET_ACTIVE_WINDOW"), X.AnyPropertyType)
+    if not active or not active.value or not active.value[0]:
+        return None
+    window = display.create_resource_object("window", active.value[0])
+    geometry = window.get_geometry()
+    origin = root.translate_coords(window, 0, 0)
+    return origin.x, origin.y, geometry.width, geometry.height
+
+
+def _xdotool_rect():
+    result = subprocess.run(["xdotool", "getactivewindow", "getwindowgeometry", "--shell"],
+                            capture_output=True, text=True, timeout=1)
+    if result.returncode != 0:
+        return None
+    values = dict(line.split("=", 1) for line in result.stdout.splitlines() if "=" in line)
+    return int(values["X"]), int(values["Y"]), int(values["WIDTH"]), int(values["HEIGHT"])
+
+
+def get_window_locator():
+    """Return the lookup function for this platform, or None if there is none."""
+    global _locator
+    if _locator is _UNRESOLVED:
+        _locator = None
+        system = platform.system()
+        if system == "Windows":
+            _locator = _windows_rect
+        elif system == "Linux" and os.environ.get("DISPLAY"):
+            if importlib.util.find_spec("Xlib") is not None:
+                _locator = _xlib_rect
+            elif shutil.which("xdotool"):
+                _locator = _xdotool_rect
+        if _locator is None:
+            logger.warning(f"No way to find the foreground window on {system}; capturing full monitors")
+    return _locator
+
+
+def set_window_locator(locator):
+    """Replace the lookup, e.g. with a stand-in returning a fixed rectangle (None restores autodetection)."""
+    global _locator
+    _locator = _UNRESOLVED if locator is None else locator
+
+
+def foreground_window_rect():
+    """(left, top, width, height) of the foreground window, or None if it cannot be found."""
+    locate = get_window_locator()
+    if locate is None:
+        return None
+    try:
+        rect = locate()
+    except Exception as e:
+        logger.debug("Foreground window lookup failed: %s", e)
+        return None
+    if rect is None or rect[2] < MIN_WINDOW_SIDE or rect[3] < MIN_WINDOW_SIDE:
+        return None
+    return rect
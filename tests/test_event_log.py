@@ -0,0 +1,47 @@
+import json
+
+from utils.event_log import EventLog, _read_lines_reversed, open_event_log
+
+
+def test_events_are_read_back_newest_first_across_rotated_segments(tmp_path):
+    with EventLog(tmp_path / "log.jsonl", max_bytes=60, backups=50) as log:
+        log.extend({"n": n} for n in range(40))
+    assert len(log.segments()) > 2
+    assert [event["n"] for event in log.iter_newest_first()] == list(range(39, -1, -1))
+
+
+def test_rotation_keeps_only_the_configured_backups(tmp_path):
+    with EventLog(tmp_path / "log.jsonl", max_bytes=50, backups=2) as log:
+        log.extend({"n": n} for n in range(20))
+    assert [path.name for path in log.segments()] == ["log.jsonl", "log.jsonl.1", "log.jsonl.2"]
+    newest = [event["n"] for event in log.iter_newest_first()]
+    assert newest[0] == 19
+    assert newest == sorted(newest, reverse=True)
+    assert len(newest) < 20
+
+
+def test_line_cut_short_by_a_crash_is_skipped(tmp_path):
+    path = tmp_path / "log.jsonl"
+    path.write_bytes(b'{"n":0}\n{"n":1')
+    with EventLog(path) as log:
+        log.append({"n": 2})
+    assert [event["n"] for event in log.iter_newest_first()] == [2, 0]
+
+
+def test_reverse_reader_handles_lines_spanning_blocks(tmp_path):
+    path = tmp_path / "lines"
+    lines = [("x" * n).encode() for n in range(1, 30)]
+    path.write_bytes(b"\n".join(lines) + b"\n")
+    assert list(_read_lines_reversed(path, block_size=7)) == lines[::-1]
+
+
+def test_legacy_json_report_is_migrated_once(tmp_path):
+    legacy = tmp_path / "parent_report.json"
+    legacy.write_text(json.dumps([{"n": 2}, {"n": 1}, {"n": 0}]))  # newest first
+    with open_event_log(tmp_path / "parent_report.jsonl") as log:
+        assert [event["n"] for event in log.iter_newest_first()] == [2, 1, 0]
+    assert not legacy.exists()
+    assert (tmp_path / "parent_report.json.migrated").exists()
+
+    with open_event_log(tmp_path / "parent_report.jsonl") as log:
+        assert len(list(log.iter_newest_first())) == 3
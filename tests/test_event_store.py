@@ -0,0 +1,88 @@
+import json
+import sqlite3
+
+from utils.event_log import EventLog
+from utils.event_store import EventStore, open_event_store
+
+
+def _event(timestamp, score=0.9, **extra):
+    return {"timestamp": timestamp, "score": score, "monitor": 1, "content_type": "nsfw",
+            "screenshot_id": None, **extra}
+
+
+def test_import_is_incremental_including_events_in_the_same_second(tmp_path):
+    with EventLog(tmp_path / "log.jsonl") as log, EventStore(tmp_path / "events.db") as store:
+        log.extend([_event("2024-01-01_10-00-00"), _event("2024-01-01_10-00-05"),
+                    _event("2024-01-01_10-00-05")])
+        assert store.import_event_log(log) == 3
+        assert store.import_event_log(log) == 0
+        log.extend([_event("2024-01-01_10-00-05", n=1), _event("2024-01-01_10-00-09", n=2)])
+        assert store.import_event_log(log) == 2
+        assert store.count() == 5
+        assert [event.get("n") for event in store.iter_newest_first()][:2] == [2, 1]
+
+
+def test_reopening_does_not_import_twice(tmp_path):
+    with EventLog(tmp_path / "log.jsonl") as log:
+        log.extend(_event(f"2024-01-01_10-00-{n:02d}") for n in range(5))
+    open_event_store(tmp_path / "events.db", import_from=tmp_path / "log.jsonl").close()
+    with open_event_store(tmp_path / "events.db", import_from=tmp_path / "log.jsonl") as store:
+        assert store.count() == 5
+
+
+def test_keyset_pagination_returns_every_event_once_newest_first(tmp_path):
+    with EventStore(tmp_path / "events.db") as store:
+        # Several events share a second, so pages must break ties on id
+        store.extend(_event(f"2024-01-01_10-00-{n // 3:02d}", n=n) for n in range(10))
+        events = list(store.iter_newest_first(page_size=2))
+        assert [event["n"] for event in events] == list(range(9, -1, -1))
+        assert [event["n"] for event in store.iter_newest_first(since="2024-01-01 10:00:02", page_size=2)] == [9, 8, 7, 6]
+        assert len(store.events_between(limit=4)) == 4
+
+
+def test_appends_are_committed_in_batches(tmp_path):
+    path = tmp_path / "events.db"
+    store = EventStore(path, commit_every=3, commit_interval=60)
+
+    def committed():
+        with sqlite3.connect(str(path)) as db:
+            return db.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    store.append(_event("2024-01-01_10-00-00"))
+    store.append(_event("2024-01-01_10-00-01"))
+    assert committed() == 0
+    store.append(_event("2024-01-01_10-00-02"))
+    assert committed() == 3
+    store.append(_event("2024-01-01_10-00-03"))
+    assert store.count() == 4  # Queries see queued appends
+    store.append(_event("2024-01-01_10-00-04"))
+    store.close()
+    assert committed() == 5
+
+
+def test_interval_commits_a_partial_batch(tmp_path):
+    with EventStore(tmp_path / "events.db", commit_every=100, commit_interval=0.05) as store:
+        store.append(_event("2024-01-01_10-00-00"))
+        store._timer.join(timeout=5)
+        assert not store._pending
+
+
+def test_legacy_json_report_reaches_the_store(tmp_path):
+    legacy = tmp_path / "parent_report.json"
+    legacy.write_text(json.dumps([_event("2024-01-01_10-00-01"), _event("2024-01-01_10-00-00")]))
+    with open_event_store(tmp_path / "events.db", import_from=tmp_path / "parent_report.jsonl") as store:
+        assert [event["timestamp"] for event in store.iter_newest_first()] == [
+            "2024-01-01_10-00-01", "2024-01-01_10-00-00"]
+    assert (tmp_path / "parent_report.json.migrated").exists()
+
+
+def test_aggregates(tmp_path):
+    with EventStore(tmp_path / "events.db") as store:
+        store.extend([_event("2024-01-01_10-00-00", 0.95), _event("2024-01-01_10-30-00", 0.55),
+                      _event("2024-01-01_11-00-00", 0.05, monitor=2)])
+        assert [row["count"] for row in store.hourly_counts()] == [2, 1]
+        assert store.daily_counts()[0]["bucket"] == "2024-01-01"
+        assert store.score_histogram(bins=2) == [1, 2]
+        assert [event["score"] for event in store.top_scores(n=2)] == [0.95, 0.55]
+        assert store.count(monitor=2) == 1
+        assert store.count(min_score=0.5, until="2024-01-01 10:30:00") == 1
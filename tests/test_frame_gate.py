@@ -0,0 +1,50 @@
+import numpy as np
+
+from monitor.frame_gate import FrameChangeGate
+
+
+def _frame(value=40, channels=4):
+    return np.full((360, 640, channels), value, dtype=np.uint8)
+
+
+def test_first_frame_is_classified():
+    gate = FrameChangeGate()
+    assert gate.should_classify(_frame())
+
+
+def test_unchanged_frame_is_skipped():
+    gate = FrameChangeGate()
+    gate.should_classify(_frame())
+    assert not gate.should_classify(_frame())
+    assert gate.stats()["frames_skipped"] == 1
+
+
+def test_changed_region_is_classified():
+    gate = FrameChangeGate(threshold=0.005)
+    gate.should_classify(_frame())
+    frame = _frame()
+    frame[:60, :120] = 220
+    assert gate.should_classify(frame)
+
+
+def test_alpha_channel_is_ignored():
+    gate = FrameChangeGate()
+    gate.should_classify(_frame())
+    frame = _frame()
+    frame[..., 3] = 0
+    assert not gate.should_classify(frame)
+
+
+def test_slow_drift_adds_up_to_a_reclassification():
+    gate = FrameChangeGate(threshold=0.005, pixel_tolerance=8)
+    gate.should_classify(_frame(40))
+    # Each step stays under the pixel tolerance of the last classified frame
+    results = [gate.should_classify(_frame(40 + 3 * step)) for step in range(1, 5)]
+    assert results == [False, False, True, False]
+
+
+def test_reset_forces_the_next_frame_through():
+    gate = FrameChangeGate()
+    gate.should_classify(_frame())
+    gate.reset()
+    assert gate.should_classify(_frame())
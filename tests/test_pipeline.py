@@ -0,0 +1,84 @@
+import queue
+import threading
+import time
+
+import pytest
+
+from monitor.pipeline import DropOldestQueue, MonitorPipeline
+
+
+def test_full_queue_drops_the_oldest_item():
+    dropped = []
+    q = DropOldestQueue(2, on_drop=dropped.append)
+    for item in range(4):
+        q.put(item)
+    assert dropped == [0, 1]
+    assert q.dropped == 2
+    assert [q.get(timeout=0), q.get(timeout=0)] == [2, 3]
+    with pytest.raises(queue.Empty):
+        q.get(timeout=0)
+
+
+def _run(pipeline, stop, seconds):
+    runner = threading.Thread(target=pipeline.run)
+    runner.start()
+    time.sleep(seconds)
+    stop.set()
+    runner.join(timeout=5)
+    assert not runner.is_alive()
+
+
+def test_frames_captured_during_an_action_are_discarded():
+    stop = threading.Event()
+    counter = iter(range(10**6))
+    events = []
+
+    def classify(frame):
+        events.append(("classify", frame))
+        return frame == 0  # only the first frame raises an alert
+
+    def act(alert):
+        time.sleep(0.2)
+        events.append(("act", alert))
+
+    pipeline = MonitorPipeline(
+        capture=lambda: next(counter),
+        classify=classify,
+        act=act,
+        is_running=lambda: not stop.is_set(),
+        reset=lambda: events.append(("reset", None)),
+        interval=0.02,
+    )
+    _run(pipeline, stop, 0.6)
+
+    assert pipeline.actions == 1
+    assert events[:2] == [("classify", 0), ("act", True)]
+    # Exactly one reset, before the first frame captured after the action finished
+    assert events[2] == ("reset", None)
+    assert [kind for kind, _ in events].count("reset") == 1
+    assert pipeline.frames_discarded > 0
+    assert pipeline.stats()["errors"] == 0
+
+
+def test_stage_errors_are_counted_and_do_not_stop_the_pipeline():
+    stop = threading.Event()
+    calls = []
+
+    def classify(frame):
+        calls.append(frame)
+        raise RuntimeError("boom")
+
+    exits = []
+    pipeline = MonitorPipeline(
+        capture=lambda: "frame",
+        classify=classify,
+        act=lambda alert: None,
+        is_running=lambda: not stop.is_set(),
+        interval=0.02,
+        on_stage_exit=lambda: exits.append(threading.current_thread().name),
+    )
+    _run(pipeline, stop, 0.2)
+
+    assert len(calls) > 1
+    assert pipeline.errors == len(calls)
+    assert sorted(exits) == ["guard-action", "guard-capture", "guard-inference"]
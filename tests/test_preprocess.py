@@ -0,0 +1,27 @@
+import cv2
+import numpy as np
+
+from monitor.preprocess import FramePreprocessor, to_rgb
+
+
+def _rgb():
+    return np.random.default_rng(0).integers(0, 256, size=(600, 800, 3), dtype=np.uint8)
+
+
+def test_to_rgb_expands_grayscale_and_reorders_bgra():
+    rgb = _rgb()
+    gray = rgb[..., 0]
+    assert to_rgb(rgb) is rgb
+    assert np.array_equal(to_rgb(cv2.cvtColor(rgb, cv2.COLOR_RGB2BGRA)), rgb)
+    assert np.array_equal(to_rgb(gray), np.dstack([gray] * 3))
+    assert np.array_equal(to_rgb(gray[..., None]), np.dstack([gray] * 3))
+
+
+def test_every_layout_of_a_frame_preprocesses_alike():
+    preprocess = FramePreprocessor()
+    gray = _rgb()[..., 0]
+    rgb = np.dstack([gray] * 3)
+    expected = preprocess(rgb)
+    assert expected.shape == (3, 224, 224)
+    for frame in (gray, gray[..., None], cv2.cvtColor(rgb, cv2.COLOR_RGB2BGRA)):
+        assert np.array_equal(preprocess(frame), expected)
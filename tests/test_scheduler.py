@@ -0,0 +1,26 @@
+from monitor import scheduler as scheduler_mod
+from monitor.scheduler import AdaptiveScheduler
+
+
+def test_near_threshold_score_scans_fast():
+    scheduler = AdaptiveScheduler(base_interval=1.0, min_interval=0.25)
+    scheduler.record(changed=True, score=0.3, threshold=0.5)
+    assert scheduler.next_interval() == 0.25
+
+
+def test_near_threshold_expires_when_idle():
+    scheduler = AdaptiveScheduler(base_interval=1.0, min_interval=0.25, max_interval=3.0, idle_after=5)
+    scheduler.record(changed=True, score=0.3, threshold=0.5)
+    for _ in range(50):
+        scheduler.record(changed=False)
+    assert scheduler.next_interval() == 3.0
+
+
+def test_near_threshold_expires_after_hold(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(scheduler_mod.time, "monotonic", lambda: clock[0])
+    scheduler = AdaptiveScheduler(base_interval=1.0, min_interval=0.25, positive_hold=30.0)
+    scheduler.record(changed=True, score=0.3, threshold=0.5)
+    clock[0] += 31.0
+    scheduler.record(changed=True)
+    assert scheduler.next_interval() == 1.0
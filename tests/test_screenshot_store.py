@@ -0,0 +1,61 @@
+import itertools
+
+import pytest
+
+from utils import screenshot_store as screenshot_store_mod
+from utils.screenshot_store import ScreenshotStore
+
+
+@pytest.fixture(autouse=True)
+def ticking_clock(monkeypatch):
+    clock = itertools.count(1000)
+    monkeypatch.setattr(screenshot_store_mod.time, "time", lambda: float(next(clock)))
+
+
+def test_identical_bytes_are_stored_once(tmp_path):
+    store = ScreenshotStore(tmp_path)
+    first = store.put(b"image", ".png")
+    assert store.put(b"image", ".png") == first
+    assert store.stats()["entries"] == 1
+    assert store.stats()["deduplicated"] == 1
+    assert store.path_for(first).read_bytes() == b"image"
+
+
+def test_near_duplicates_share_an_entry(tmp_path):
+    store = ScreenshotStore(tmp_path, dedup_distance=2)
+    first = store.put(b"a", ".png", phash=0b1111)
+    assert store.put(b"b", ".png", phash=0b1100) == first  # 2 bits apart
+    assert store.put(b"c", ".png", phash=0b0000) != first  # 4 bits apart
+    assert store.stats()["entries"] == 2
+
+
+def test_oldest_entries_are_evicted_over_budget(tmp_path):
+    store = ScreenshotStore(tmp_path, max_bytes=25)
+    ids = [store.put(bytes([n]) * 10, ".png") for n in range(3)]
+    assert store.path_for(ids[0]) is None
+    assert not list(tmp_path.glob(ids[0] + "*"))
+    assert store.path_for(ids[1]) is not None and store.path_for(ids[2]) is not None
+    assert store.stats() == {"entries": 2, "bytes": 20, "max_bytes": 25, "deduplicated": 0, "evicted": 1}
+
+
+def test_least_referenced_policy_keeps_reused_entries(tmp_path):
+    store = ScreenshotStore(tmp_path, max_bytes=25, eviction="least_referenced")
+    popular = store.put(b"a" * 10, ".png")
+    store.put(b"a" * 10, ".png")
+    lonely = store.put(b"b" * 10, ".png")
+    newest = store.put(b"c" * 10, ".png")
+    assert store.path_for(popular) is not None
+    assert store.path_for(lonely) is None
+    assert store.path_for(newest) is not None
+
+
+def test_index_survives_reopening(tmp_path):
+    entry_id = ScreenshotStore(tmp_path).put(b"image", ".jpg")
+    reopened = ScreenshotStore(tmp_path)
+    assert reopened.path_for(entry_id).name == entry_id + ".jpg"
+    assert reopened.put(b"image", ".jpg") == entry_id
+
+
+def test_unknown_eviction_policy_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        ScreenshotStore(tmp_path, eviction="random")
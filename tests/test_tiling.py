@@ -0,0 +1,51 @@
+import numpy as np
+
+from monitor.tiling import TileTracker, merge_tiles
+
+
+def _frame():
+    return np.zeros((90, 120, 4), dtype=np.uint8)
+
+
+def test_first_update_marks_every_tile_dirty():
+    tracker = TileTracker(rows=3, cols=4)
+    assert len(tracker.update(_frame())) == 12
+
+
+def test_only_the_changed_tile_is_dirty():
+    tracker = TileTracker(rows=3, cols=4)
+    frame = _frame()
+    tracker.update(frame)
+    assert tracker.update(frame) == []
+    frame = frame.copy()
+    frame[30:60, 60:90, :3] = 255  # exactly tile (1, 2)
+    assert tracker.update(frame) == [(1, 2)]
+    assert tracker.stats()["tiles_dirty"] == 13
+
+
+def test_reset_marks_every_tile_dirty_again():
+    tracker = TileTracker(rows=2, cols=2)
+    tracker.update(_frame())
+    tracker.reset()
+    assert len(tracker.update(_frame())) == 4
+
+
+def test_tile_rect_covers_the_frame_without_gaps():
+    tracker = TileTracker(rows=3, cols=3)
+    shape = (100, 200)
+    assert tracker.tile_rect(shape, 0, 0) == (0, 33, 0, 66)
+    assert tracker.tile_rect(shape, 2, 2) == (66, 100, 133, 200)
+    assert tracker.tile_rect(shape, 0, 0, 2, 2) == (0, 100, 0, 200)
+
+
+def test_dirty_rects_merge_adjacent_tiles():
+    tracker = TileTracker(rows=2, cols=2)
+    dirty = [(0, 0), (0, 1), (1, 0), (1, 1)]
+    assert len(tracker.dirty_rects((100, 100), dirty)) == 4
+    assert tracker.dirty_rects((100, 100), dirty, merge=True) == [(0, 100, 0, 100)]
+
+
+def test_merge_tiles_extends_matching_runs_downward():
+    # Rows 0-1 share columns 0-1; row 2 only has column 1; (0, 3) is on its own
+    tiles = [(0, 0), (0, 1), (1, 0), (1, 1), (2, 1), (0, 3)]
+    assert sorted(merge_tiles(tiles)) == [(0, 0, 1, 1), (0, 3, 0, 3), (2, 1, 2, 1)]
@@ -0,0 +1,77 @@
+import numpy as np
+from PIL import Image
+
+from monitor import monitor as monitor_mod
+from monitor import verdict_cache as verdict_cache_mod
+from monitor.verdict_cache import VerdictCache
+from utils.phash import dhash, hamming_distance
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = VerdictCache(max_size=2, ttl=None)
+    cache.put("a", 0.1)
+    cache.put("b", 0.2)
+    assert cache.get("a") == 0.1  # "b" is now the least recently used
+    cache.put("c", 0.3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 0.1
+    assert cache.get("c") == 0.3
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(verdict_cache_mod.time, "monotonic", lambda: clock[0])
+    cache = VerdictCache(max_size=4, ttl=10.0)
+    cache.put("a", 0.5)
+    clock[0] += 10.0
+    assert cache.get("a") == 0.5
+    clock[0] += 0.1
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_zero_size_cache_stores_nothing():
+    cache = VerdictCache(max_size=0)
+    cache.put("a", 0.5)
+    assert cache.get("a") is None
+
+
+def test_dhash_ignores_channel_order_and_input_type():
+    rgb = np.random.default_rng(0).integers(0, 256, size=(90, 160, 3), dtype=np.uint8)
+    bgra = np.dstack([rgb[..., ::-1], np.full(rgb.shape[:2], 255, np.uint8)])
+    assert dhash(rgb) == dhash(bgra) == dhash(Image.fromarray(rgb))
+
+
+def test_dhash_separates_different_images():
+    rng = np.random.default_rng(0)
+    a, b = (rng.integers(0, 256, size=(90, 160, 3), dtype=np.uint8) for _ in range(2))
+    assert hamming_distance(dhash(a), dhash(b)) > 32
+
+
+def _count_classified(monkeypatch):
+    classified = []
+
+    def classify(images, batch_size):
+        classified.extend(images)
+        return [[{"label": "nsfw", "score": 0.9}, {"label": "normal", "score": 0.1}] for _ in images]
+
+    monkeypatch.setattr(monitor_mod, "_classify_misses", classify)
+    monkeypatch.setattr(monitor_mod, "PREFILTER_ENABLED", False)
+    monkeypatch.setattr(monitor_mod, "verdict_cache", None)
+    return classified
+
+
+def test_repeated_frame_is_scored_from_the_cache(monkeypatch):
+    classified = _count_classified(monkeypatch)
+    frame = np.random.default_rng(0).integers(0, 256, size=(90, 160, 3), dtype=np.uint8)
+    assert monitor_mod._score_images([frame]) == [0.9]
+    assert monitor_mod._score_images([frame.copy()]) == [0.9]
+    assert len(classified) == 1
+
+
+def test_cache_can_be_bypassed(monkeypatch):
+    classified = _count_classified(monkeypatch)
+    frame = np.random.default_rng(0).integers(0, 256, size=(90, 160, 3), dtype=np.uint8)
+    monitor_mod._score_images([frame])
+    monitor_mod._score_images([frame], use_cache=False)
+    assert len(classified) == 2
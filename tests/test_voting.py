@@ -0,0 +1,61 @@
+import numpy as np
+
+from monitor.voting import TemporalVoter, confirmation_regions, downscale
+
+
+def test_alert_is_confirmed_once_k_votes_are_positive():
+    voter = TemporalVoter(k=2, n=3)
+    voter.trigger(0)
+    assert voter.vote(0, True) is None
+    assert voter.vote(0, False) is None
+    assert voter.vote(0, True) is True
+    assert voter.confirming == set()
+
+
+def test_burst_is_rejected_once_k_positives_are_out_of_reach():
+    voter = TemporalVoter(k=2, n=3)
+    voter.trigger(0)
+    assert voter.vote(0, False) is None
+    assert voter.vote(0, False) is False
+    assert voter.stats()["rejected"] == 1
+
+
+def test_votes_outside_a_burst_are_ignored():
+    voter = TemporalVoter(k=1, n=1)
+    assert voter.vote(0, True) is None
+    assert voter.stats()["confirmed"] == 0
+
+
+def test_bursts_are_tracked_per_monitor():
+    voter = TemporalVoter(k=2, n=2)
+    voter.trigger(0)
+    voter.trigger(1)
+    voter.trigger(1)  # already confirming, not counted again
+    assert voter.vote(0, True) is None
+    assert voter.vote(1, False) is False
+    assert voter.vote(0, True) is True
+    assert voter.stats() == {"k": 2, "n": 2, "confirming": [], "triggered": 2, "confirmed": 1, "rejected": 1}
+
+
+def test_k_is_clamped_to_n_and_reset_abandons_bursts():
+    voter = TemporalVoter(k=5, n=2)
+    assert voter.k == 2
+    voter.trigger(0)
+    voter.reset()
+    assert voter.vote(0, True) is None
+
+
+def test_downscale_caps_the_longer_side():
+    frame = np.zeros((1080, 1920, 4), dtype=np.uint8)
+    assert downscale(frame, 640).shape == (360, 640, 4)
+    assert downscale(frame, 4000) is frame
+
+
+def test_confirmation_regions_cover_the_grid():
+    frame = np.arange(6 * 9).reshape(6, 9)
+    regions = confirmation_regions(frame, 2, 3)
+    assert regions[0] is frame
+    assert len(regions) == 7
+    assert all(region.shape == (3, 3) for region in regions[1:])
+    assert sum(region.sum() for region in regions[1:]) == frame.sum()
+    assert confirmation_regions(frame, 1, 1) == [frame]
@@ -0,0 +1,160 @@
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+GUARD_DIR = Path.home() / ".Guard"
+DEFAULT_EVENT_LOG_PATH = GUARD_DIR / "parent_report.jsonl"
+LEGACY_REPORT_PATH = GUARD_DIR / "parent_report.json"
+
+
+class EventLog:
+    """Append-only JSON Lines log of parent-mode events.
+
+    Every append is written and flushed to the OS immediately, so it survives a
+    crash of this process; fsync (needed to survive power loss) is batched to every
+    `fsync_every` events or `fsync_interval` seconds, and always happens on close.
+    A line cut short by a crash is terminated on the next open and skipped by the
+    reader. When the active file exceeds `max_bytes` it is rotated to `<name>.1`,
+    `<name>.2`, ... keeping `backups` old segments.
+    """
+
+    def __init__(self, path=DEFAULT_EVENT_LOG_PATH, max_bytes=5 * 1024 * 1024, backups=20,
+                 fsync_every=5, fsync_interval=2.0):
+        self.path = Path(path)
+        self.max_bytes = int(max_bytes)
+        self.backups = int(backups)
+        self.fsync_every = max(1, int(fsync_every))
+        self.fsync_interval = float(fsync_interval)
+        self._lock = threading.Lock()
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "ab")
+        if self._file.tell() > 0:
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._file.write(b"\n")  # Terminate a line cut short by a crash
+
+    def append(self, event):
+        line = (json.dumps(event, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            if self._file is None:
+                self._open()
+            self._file.write(line)
+            self._file.flush()
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync()
+            if self._file.tell() >= self.max_bytes:
+                self._rotate()
+
+    def extend(self, events):
+        for event in events:
+            self.append(event)
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _rotate(self):
+        self._sync()
+        self._file.close()
+        self._file = None
+        oldest = self._segment(self.backups)
+        if oldest.exists():
+            oldest.unlink()
+        for index in range(self.backups - 1, 0, -1):
+            if self._segment(index).exists():
+                os.replace(self._segment(index), self._segment(index + 1))
+        os.replace(self.path, self._segment(1))
+
+    def _segment(self, index):
+        return self.path.with_name(f"{self.path.name}.{index}") if index else self.path
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None and self._unsynced:
+                self._sync()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._sync()
+                self._file.close()
+                self._file = None
+
+    def segments(self):
+        """Existing log files, newest first."""
+        return [self._segment(i) for i in range(self.backups + 1) if self._segment(i).exists()]
+
+    def iter_newest_first(self):
+        """Yield events newest first, reading each segment backwards in blocks."""
+        for segment in self.segments():
+            for line in _read_lines_reversed(segment):
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # Partial line from an interrupted write
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _read_lines_reversed(path, block_size=64 * 1024):
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        remainder = b""
+        while position > 0:
+            size = min(block_size, position)
+            position -= size
+            f.seek(position)
+            lines = (f.read(size) + remainder).split(b"\n")
+            remainder = lines[0]
+            for line in reversed(lines[1:]):
+                if line.strip():
+                    yield line
+        if remainder.strip():
+            yield remainder
+
+
+def migrate_json_report(log, legacy_path=LEGACY_REPORT_PATH):
+    """Move events from the old parent_report.json array into `log`, once.
+
+    The array is stored newest first, so it is appended in reverse. The old file is
+    renamed to *.migrated afterwards so it is not imported twice.
+    """
+    legacy_path = Path(legacy_path)
+    if not legacy_path.exists():
+        return 0
+    try:
+        with open(legacy_path, "r") as f:
+            events = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning("Could not migrate %s: %s", legacy_path, e)
+        return 0
+    log.extend(reversed(events))
+    log.flush()
+    os.replace(legacy_path, legacy_path.with_name(legacy_path.name + ".migrated"))
+    logger.info("Migrated %d events from %s to %s", len(events), legacy_path, log.path)
+    return len(events)
+
+
+def open_event_log(path=DEFAULT_EVENT_LOG_PATH, **kwargs):
+    """Open the event log at `path`, importing a legacy parent_report.json next to it first."""
+    log = EventLog(path, **kwargs)
+    migrate_json_report(log, Path(path).with_suffix(".json"))
+    return log
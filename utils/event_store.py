@@ -0,0 +1,306 @@
+"""Indexed SQLite store for parent-mode events.
+
+An alternative to the JSON Lines EventLog (same append/extend/iter_newest_first
+interface) for long histories: events are indexed by time, score and monitor, so
+time-window queries, top scores and per-hour or per-day aggregates run in SQL
+instead of scanning the whole history. sqlite3 ships with Python, so the store
+only needs to be switched on (`event_store: "sqlite"` in the monitor settings).
+
+Times are stored as local "YYYY-MM-DD HH:MM:SS" text, which sorts chronologically
+and works with SQLite's date functions.
+"""
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from utils.event_log import GUARD_DIR, open_event_log
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EVENT_STORE_PATH = GUARD_DIR / "parent_report.db"
+TIMESTAMP_FORMAT = "%Y-%m-%d_%H-%M-%S"
+SQL_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+COLUMNS = ("timestamp", "score", "monitor", "content_type", "screenshot_id")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    time TEXT,
+    timestamp TEXT,
+    score REAL,
+    monitor INTEGER,
+    content_type TEXT,
+    screenshot_id TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS events_time ON events (time);
+CREATE INDEX IF NOT EXISTS events_score ON events (score);
+CREATE INDEX IF NOT EXISTS events_monitor_time ON events (monitor, time);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+INSERT_SQL = ("INSERT INTO events (time, timestamp, score, monitor, content_type, screenshot_id, extra) "
+              "VALUES (?, ?, ?, ?, ?, ?, ?)")
+
+
+def _sql_time(value):
+    """Convert a datetime, event timestamp or SQL time string to the stored format."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.strftime(SQL_TIME_FORMAT)
+    try:
+        return datetime.strptime(value, TIMESTAMP_FORMAT).strftime(SQL_TIME_FORMAT)
+    except ValueError:
+        return value
+
+
+def _row(event):
+    try:
+        score = float(event.get("score"))
+    except (TypeError, ValueError):
+        score = None
+    extra = {key: value for key, value in event.items() if key not in COLUMNS}
+    return (_sql_time(event.get("timestamp")), event.get("timestamp"), score, event.get("monitor"),
+            event.get("content_type"), event.get("screenshot_id"), json.dumps(extra) if extra else None)
+
+
+def _event(row):
+    time_, timestamp, score, monitor, content_type, screenshot_id, extra = row
+    event = {"timestamp": timestamp, "score": score, "screenshot_id": screenshot_id,
+             "content_type": content_type, "monitor": monitor}
+    if extra:
+        event.update(json.loads(extra))
+    return event
+
+
+class EventStore:
+    """Parent-mode events in SQLite, indexed by time, score and monitor.
+
+    The connection is shared between threads behind a lock. `append()` queues the
+    event and commits the queue in one transaction every `commit_every` events or
+    `commit_interval` seconds after the first queued one, whichever comes first,
+    like EventLog batches its fsyncs; queries, `flush()` and `close()` commit it
+    first. `extend()` inserts a whole batch in one transaction.
+    """
+
+    def __init__(self, path=DEFAULT_EVENT_STORE_PATH, commit_every=20, commit_interval=2.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.commit_every = max(1, int(commit_every))
+        self.commit_interval = float(commit_interval)
+        self._lock = threading.Lock()
+        self._pending = []
+        self._timer = None
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+    def append(self, event):
+        with self._lock:
+            self._pending.append(_row(event))
+            if len(self._pending) >= self.commit_every:
+                self._commit_pending()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.commit_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def extend(self, events, batch_size=1000):
+        batch = []
+        for event in events:
+            batch.append(_row(event))
+            if len(batch) >= batch_size:
+                self._insert(batch)
+                batch = []
+        if batch:
+            self._insert(batch)
+
+    def _commit_pending(self):
+        # Called with the lock held
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._pending and self._db is not None:
+            with self._db:
+                self._db.executemany(INSERT_SQL, self._pending)
+        self._pending = []
+
+    def _insert(self, rows):
+        with self._lock:
+            self._commit_pending()
+            with self._db:
+                self._db.executemany(INSERT_SQL, rows)
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            self._commit_pending()
+            return self._db.execute(sql, params).fetchall()
+
+    def flush(self):
+        with self._lock:
+            self._commit_pending()
+
+    def close(self):
+        with self._lock:
+            self._commit_pending()
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def segments(self):
+        """The database file if it holds any events (mirrors EventLog.segments)."""
+        return [self.path] if self.count() else []
+
+    def _where(self, since=None, until=None, min_score=None, monitor=None):
+        clauses, params = [], []
+        if since is not None:
+            clauses.append("time >= ?")
+            params.append(_sql_time(since))
+        if until is not None:
+            clauses.append("time < ?")
+            params.append(_sql_time(until))
+        if min_score is not None:
+            clauses.append("score >= ?")
+            params.append(float(min_score))
+        if monitor is not None:
+            clauses.append("monitor = ?")
+            params.append(monitor)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def count(self, since=None, until=None, min_score=None, monitor=None):
+        where, params = self._where(since, until, min_score, monitor)
+        return self._query(f"SELECT COUNT(*) FROM events{where}", params)[0][0]
+
+    def iter_newest_first(self, since=None, until=None, min_score=None, monitor=None, page_size=500):
+        """Yield events newest first, fetching `page_size` rows per query."""
+        where, params = self._where(since, until, min_score, monitor)
+        last = None
+        while True:
+            # Keyset pagination on (time, id): each page is an index range scan
+            page_where, page_params = where, list(params)
+            if last is not None:
+                page_where += (" AND " if where else " WHERE ") + "(time < ? OR (time = ? AND id < ?))"
+                page_params += [last[0], last[0], last[1]]
+            rows = self._query(
+                "SELECT id, time, timestamp, score, monitor, content_type, screenshot_id, extra "
+                f"FROM events{page_where} ORDER BY time DESC, id DESC LIMIT ?", page_params + [page_size])
+            for row in rows:
+                yield _event(row[1:])
+            if len(rows) < page_size:
+                return
+            last = (rows[-1][1], rows[-1][0])
+
+    def events_between(self, since=None, until=None, min_score=None, monitor=None, limit=None):
+        """Events in [since, until), newest first, at most `limit` of them."""
+        events = self.iter_newest_first(since, until, min_score, monitor)
+        return [event for _, event in zip(range(limit), events)] if limit else list(events)
+
+    def top_scores(self, n=10, since=None, until=None, monitor=None):
+        """The `n` highest-scoring events in the window, highest first."""
+        where, params = self._where(since, until, monitor=monitor)
+        rows = self._query(
+            "SELECT time, timestamp, score, monitor, content_type, screenshot_id, extra "
+            f"FROM events{where} ORDER BY score DESC LIMIT ?", params + [n])
+        return [_event(row) for row in rows]
+
+    def _grouped_counts(self, bucket_format, since, until, min_score, monitor):
+        where, params = self._where(since, until, min_score, monitor)
+        rows = self._query(
+            f"SELECT strftime('{bucket_format}', time) AS bucket, COUNT(*), MAX(score), AVG(score) "
+            f"FROM events{where} GROUP BY bucket ORDER BY bucket", params)
+        return [{"bucket": bucket, "count": count, "max_score": max_score, "avg_score": avg_score}
+                for bucket, count, max_score, avg_score in rows]
+
+    def hourly_counts(self, since=None, until=None, min_score=None, monitor=None):
+        """Event count, max and mean score per hour ("YYYY-MM-DD HH:00"), oldest first."""
+        return self._grouped_counts("%Y-%m-%d %H:00", since, until, min_score, monitor)
+
+    def daily_counts(self, since=None, until=None, min_score=None, monitor=None):
+        """Event count, max and mean score per day ("YYYY-MM-DD"), oldest first."""
+        return self._grouped_counts("%Y-%m-%d", since, until, min_score, monitor)
+
+    def score_histogram(self, bins=10, since=None, until=None, min_score=None, monitor=None):
+        """Counts of scores in `bins` equal-width bins over [0, 1]."""
+        where, params = self._where(since, until, min_score, monitor)
+        where += (" AND " if where else " WHERE ") + "score IS NOT NULL"
+        rows = self._query(
+            f"SELECT MIN(MAX(CAST(score * ? AS INTEGER), 0), ?) AS bin, COUNT(*) FROM events{where} GROUP BY bin",
+            [bins, bins - 1] + params)
+        histogram = [0] * bins
+        for index, count in rows:
+            histogram[index] = count
+        return histogram
+
+    def import_event_log(self, log):
+        """Copy the events of a JSON Lines EventLog added since the last import into the store.
+
+        The newest imported time, and how many log events carry it, are kept in the
+        meta table, so each call reads the log only back to that point. Returns the
+        number of events imported.
+        """
+        key = f"imported:{Path(log.path).resolve()}"
+        with self._lock:
+            self._commit_pending()
+        with self._lock, self._db:
+            # Another process importing the same log waits for this transaction
+            self._db.execute("BEGIN IMMEDIATE")
+            row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+            last_time, last_count = None, 0
+            if row:
+                try:
+                    mark = json.loads(row[0])
+                    last_time, last_count = mark["time"], mark["count"]
+                except (ValueError, TypeError, KeyError):
+                    last_time = row[0]  # Stores from before incremental imports kept the import time
+            newer, at_last = [], []
+            for event in log.iter_newest_first():
+                time_ = _sql_time(event.get("timestamp"))
+                if last_time is not None:
+                    if time_ is None:
+                        continue
+                    if time_ < last_time:
+                        break  # The log is append-only, so the rest was imported before
+                    if time_ == last_time:
+                        at_last.append(event)
+                        continue
+                newer.append(event)
+            # Events sharing the last imported time: the newest ones beyond those counted are new
+            events = newer + at_last[:max(0, len(at_last) - last_count)]
+            if not events:
+                return 0
+            self._db.executemany(INSERT_SQL, [_row(event) for event in reversed(events)])
+            times = [time_ for time_ in (_sql_time(event.get("timestamp")) for event in newer) if time_ is not None]
+            if times:
+                mark = {"time": times[0], "count": times.count(times[0])}
+            else:
+                # "" sorts before every time, so untimed events are not imported twice
+                mark = {"time": last_time or "", "count": len(at_last)}
+            self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(mark)))
+        logger.info("Imported %d events from %s into %s", len(events), log.path, self.path)
+        return len(events)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_event_store(path=DEFAULT_EVENT_STORE_PATH, import_from=None):
+    """Open the store at `path`, first importing any events of the JSON Lines log `import_from` not imported yet.
+
+    A legacy parent_report.json next to that log is migrated into it first, as
+    open_event_log() does, so its history reaches the store too.
+    """
+    store = EventStore(path)
+    if import_from is not None:
+        import_from = Path(import_from)
+        if import_from.exists() or import_from.with_suffix(".json").exists():
+            log = open_event_log(import_from)
+            store.import_event_log(log)
+            log.close()
+    return store
@@ -1,124 +1,379 @@
-import os
+"""Parent-mode PDF report.
+
+`build_parent_report()` writes the report headlessly; `generate_parent_report_pdf()`
+wraps it with the save dialog used by the settings window. From a shell:
+
+    python -m utils.parent_report report.pdf --since 2025-06-01 --min-score 0.8
+
+Events are read newest first straight from the event log, twice: once for the
+summary header (counts per day, score histogram) and once for the event rows, so
+memory use does not grow with the size of the log. With the SQLite event store
+(utils.event_store) the summary and filters are indexed queries instead.
+Screenshots are embedded as small thumbnails, cached next to the screenshot store
+so later reports only decode new screenshots.
+"""
+import argparse
 import json
+import logging
+import os
+import platform
+import webbrowser
+from collections import Counter
 from datetime import datetime
 from pathlib import Path
+
 from fpdf import FPDF
-import webbrowser
-import platform
 
-# Try to use CustomTkinter's file dialog, fallback to tkinter if not available
-try:
-    import customtkinter as ctk
-    filedialog = ctk.filedialog
-except ImportError:
-    import tkinter as tk
-    from tkinter import filedialog, messagebox
-    ctk = None
-    # Note: fallback to tkinter dialog if CustomTkinter dialog is not available
+from utils.event_log import open_event_log
+from utils.event_store import open_event_store
+from utils.screenshot_store import ScreenshotStore
 
-def generate_parent_report_pdf():
-    home = Path.home()
-    guard_dir = home / ".Guard"
-    report_json = guard_dir / "parent_report.json"
-    screenshot_dir = guard_dir / "screenshots"
-    downloads_dir = Path.home() / "Downloads"
-    default_pdf_name = "Guard_Report.pdf"
-
-    if not report_json.exists():
-        if ctk:
-            ctk.CTkMessageBox(title="Error", message="No parent report log found.")
+logger = logging.getLogger(__name__)
+
+GUARD_DIR = Path.home() / ".Guard"
+CONFIG_PATH = GUARD_DIR / "config.json"
+TIMESTAMP_FORMAT = "%Y-%m-%d_%H-%M-%S"
+THUMBNAIL_WIDTH = 240  # Pixels; drawn 48 mm wide
+HISTOGRAM_BINS = 10
+MAX_SUMMARY_DAYS = 31
+
+
+def _parse_date(value):
+    """Parse YYYY-MM-DD or YYYY-MM-DD HH:MM[:SS]; pass datetimes through."""
+    if value is None or isinstance(value, datetime):
+        return value
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised date '{value}', expected YYYY-MM-DD or YYYY-MM-DD HH:MM")
+
+
+def _event_time(event):
+    try:
+        return datetime.strptime(event["timestamp"], TIMESTAMP_FORMAT)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _event_score(event):
+    try:
+        return float(event["score"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def iter_report_events(log, since=None, until=None, min_score=None):
+    """Yield (time, score, event) newest first, filtered by date range and score.
+
+    The log is append-only, so reading stops at the first event older than `since`.
+    """
+    for event in log.iter_newest_first():
+        when = _event_time(event)
+        if when is not None:
+            if since is not None and when < since:
+                break
+            if until is not None and when >= until:
+                continue
+        score = _event_score(event)
+        if min_score is not None and (score is None or score < min_score):
+            continue
+        yield when, score, event
+
+
+class ThumbnailCache:
+    """JPEG thumbnails of store screenshots, written once under `<screenshot dir>/thumbnails`."""
+
+    def __init__(self, screenshot_dir, width=THUMBNAIL_WIDTH):
+        self.screenshot_dir = Path(screenshot_dir)
+        self.store = ScreenshotStore(self.screenshot_dir)
+        self.width = width
+        self.root = self.screenshot_dir / "thumbnails"
+        self.created = 0
+        self.reused = 0
+
+    def source_for(self, event):
+        """Path of the event's screenshot, or None if it has none or it was evicted."""
+        if event.get("screenshot_id"):
+            path = self.store.path_for(event["screenshot_id"])
+        elif event.get("screenshot"):
+            # Events logged before the screenshot store name the file directly
+            path = self.screenshot_dir / event["screenshot"]
         else:
-            messagebox.showerror("Error", "No parent report log found.")
+            path = None
+        return path if path is not None and path.exists() else None
+
+    def get(self, source):
+        """Return (path, width, height) of the thumbnail for `source`, creating it if needed."""
+        from PIL import Image
+
+        thumb_path = self.root / f"{source.stem}_{self.width}.jpg"
+        if thumb_path.exists() and thumb_path.stat().st_mtime >= source.stat().st_mtime:
+            self.reused += 1
+            with Image.open(thumb_path) as thumb:
+                return thumb_path, thumb.width, thumb.height
+        self.root.mkdir(parents=True, exist_ok=True)
+        with Image.open(source) as image:
+            image.draft("RGB", (self.width, self.width))  # Lets JPEG decode at reduced scale
+            image = image.convert("RGB")
+            image.thumbnail((self.width, self.width * 4))
+            tmp_path = thumb_path.with_suffix(".tmp")
+            image.save(tmp_path, "JPEG", quality=70)
+        os.replace(tmp_path, thumb_path)
+        self.created += 1
+        return thumb_path, image.width, image.height
+
+
+class _ReportPDF(FPDF):
+    def footer(self):
+        self.set_y(-12)
+        self.set_font("Arial", size=8)
+        self.set_text_color(128, 128, 128)
+        self.cell(0, 6, f"Page {self.page_no()}/{{nb}}", align="C")
+        self.set_text_color(0, 0, 0)
+
+
+def _configured_event_store():
+    """The monitor's event_store setting from config.json ("jsonl" unless set)."""
+    try:
+        with open(CONFIG_PATH, "r") as f:
+            return json.load(f).get("monitor", {}).get("event_store", "jsonl")
+    except (OSError, ValueError):
+        return "jsonl"
+
+
+def _open_events(log_path):
+    """Open the SQLite event store if `log_path` is one, else the JSON Lines log.
+
+    By default this is whichever the monitor writes to, per its event_store setting.
+    """
+    if log_path is None:
+        jsonl_path = GUARD_DIR / "parent_report.jsonl"
+        if _configured_event_store() == "sqlite":
+            return open_event_store(GUARD_DIR / "parent_report.db", import_from=jsonl_path)
+        return open_event_log(jsonl_path)
+    if Path(log_path).suffix == ".db":
+        return open_event_store(log_path)
+    return open_event_log(log_path)
+
+
+def _store_events(store, since, until, min_score):
+    for event in store.iter_newest_first(since, until, min_score):
+        yield _event_time(event), _event_score(event), event
+
+
+def _summarize_store(store, since, until, min_score):
+    per_day = Counter({row["bucket"] or "unknown": row["count"] for row in store.daily_counts(since, until, min_score)})
+    histogram = store.score_histogram(HISTOGRAM_BINS, since, until, min_score)
+    return store.count(since, until, min_score), per_day, histogram
+
+
+def _summarize(events):
+    per_day = Counter()
+    histogram = [0] * HISTOGRAM_BINS
+    total = 0
+    for when, score, _ in events:
+        total += 1
+        per_day[when.strftime("%Y-%m-%d") if when else "unknown"] += 1
+        if score is not None:
+            histogram[min(max(int(score * HISTOGRAM_BINS), 0), HISTOGRAM_BINS - 1)] += 1
+    return total, per_day, histogram
+
+
+def _write_summary(pdf, total, per_day, histogram, since, until, min_score, threshold):
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(0, 10, "Parent Mode Report", ln=True, align="C")
+    pdf.ln(3)
+    pdf.set_font("Arial", size=11)
+    if threshold is not None:
+        pdf.cell(0, 7, f"Sensitivity Threshold: {int(threshold * 100)}%", ln=True)
+    period = f"{since:%Y-%m-%d %H:%M} to " if since else "Up to "
+    period += f"{until:%Y-%m-%d %H:%M}" if until else "now"
+    pdf.cell(0, 7, f"Period: {period}", ln=True)
+    if min_score is not None:
+        pdf.cell(0, 7, f"Minimum score: {int(min_score * 100)}%", ln=True)
+    pdf.cell(0, 7, f"Events: {total}", ln=True)
+    if not total:
         return
+    pdf.ln(3)
+
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(0, 8, "Events per day", ln=True)
+    pdf.set_font("Arial", size=10)
+    days = sorted(per_day.items(), reverse=True)
+    for day, count in days[:MAX_SUMMARY_DAYS]:
+        pdf.cell(40, 6, day)
+        pdf.cell(0, 6, str(count), ln=True)
+    if len(days) > MAX_SUMMARY_DAYS:
+        older = sum(count for _, count in days[MAX_SUMMARY_DAYS:])
+        pdf.cell(0, 6, f"... {older} events on {len(days) - MAX_SUMMARY_DAYS} earlier days", ln=True)
+    pdf.ln(3)
+
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(0, 8, "Score distribution", ln=True)
+    pdf.set_font("Arial", size=9)
+    largest = max(histogram) or 1
+    for index, count in enumerate(histogram):
+        low, high = 100 * index // HISTOGRAM_BINS, 100 * (index + 1) // HISTOGRAM_BINS
+        pdf.cell(22, 5, f"{low}-{high}%")
+        if count:
+            pdf.set_fill_color(46, 137, 255)
+            pdf.rect(pdf.get_x(), pdf.get_y() + 1, 120 * count / largest, 3, style="F")
+        pdf.set_x(pdf.get_x() + 124)
+        pdf.cell(0, 5, str(count), ln=True)
+
+
+def _write_event(pdf, when, score, event, thumbnails):
+    source = thumbnails.source_for(event) if thumbnails else None
+    thumb = None
+    if source is not None:
+        try:
+            thumb = thumbnails.get(source)
+        except Exception as e:
+            logger.warning("Could not create thumbnail for %s: %s", source, e)
+    image_width = 48
+    image_height = image_width * thumb[2] / thumb[1] if thumb else 0
+    row_height = max(image_height, 24) + 4
+    if pdf.get_y() + row_height > pdf.page_break_trigger:
+        pdf.add_page()
+
+    top = pdf.get_y()
+    if thumb:
+        pdf.image(str(thumb[0]), x=pdf.l_margin, y=top, w=image_width, h=image_height)
+    text_x = pdf.l_margin + image_width + 4
+    pdf.set_xy(text_x, top)
+    pdf.set_font("Arial", "B", 11)
+    pdf.cell(0, 6, when.strftime("%Y-%m-%d %H:%M:%S") if when else str(event.get("timestamp")), ln=True)
+    pdf.set_font("Arial", size=10)
+    details = [f"NSFW Score: {int(score * 100)}%" if score is not None else f"NSFW Score: {event.get('score')}",
+               f"Content Type: {event.get('content_type', 'adult')}"]
+    if event.get("monitor") is not None:
+        details.append(f"Monitor: {event['monitor']}")
+    if not thumb:
+        details.append("Screenshot: not available")
+    for line in details:
+        pdf.set_x(text_x)
+        pdf.cell(0, 6, line, ln=True)
+    pdf.set_y(top + row_height)
+
+
+def build_parent_report(pdf_path, log_path=None, screenshot_dir=None, since=None, until=None,
+                        min_score=None, thumbnails=True, threshold=None):
+    """Write the parent report to `pdf_path` and return a summary dict.
+
+    `since`/`until` are datetimes or "YYYY-MM-DD[ HH:MM]" strings (`until` is
+    exclusive; a bare date means midnight). `threshold` is printed in the header.
+    """
+    screenshot_dir = Path(screenshot_dir or GUARD_DIR / "screenshots")
+    since, until = _parse_date(since), _parse_date(until)
+    thumbnail_cache = ThumbnailCache(screenshot_dir) if thumbnails else None
+
+    log = _open_events(log_path)
+    try:
+        if hasattr(log, "daily_counts"):
+            # SQLite store: aggregates and filters run as indexed queries
+            total, per_day, histogram = _summarize_store(log, since, until, min_score)
+            events = _store_events(log, since, until, min_score)
+        else:
+            total, per_day, histogram = _summarize(iter_report_events(log, since, until, min_score))
+            events = iter_report_events(log, since, until, min_score)
+
+        pdf = _ReportPDF()
+        pdf.alias_nb_pages()
+        pdf.set_auto_page_break(auto=True, margin=15)
+        pdf.add_page()
+        _write_summary(pdf, total, per_day, histogram, since, until, min_score, threshold)
+        if total:
+            pdf.add_page()
+            for when, score, event in events:
+                _write_event(pdf, when, score, event, thumbnail_cache)
+        pdf.output(str(pdf_path))
+    finally:
+        log.close()
+
+    result = {"path": str(pdf_path), "events": total, "pages": pdf.page_no()}
+    if thumbnail_cache:
+        result.update(thumbnails_created=thumbnail_cache.created, thumbnails_reused=thumbnail_cache.reused)
+    return result
+
+
+def _open_file(path):
+    try:
+        if platform.system() == "Windows":
+            os.startfile(path)
+        elif platform.system() == "Darwin":
+            os.system(f"open '{path}'")
+        else:
+            os.system(f"xdg-open '{path}'")
+    except Exception:
+        webbrowser.open_new_tab(f"file://{path}")
 
-    with open(report_json, "r") as f:
-        events = json.load(f)
 
-    # Prompt user for save location using CustomTkinter or fallback
-    pdf_path = None
-    if ctk:
+def generate_parent_report_pdf():
+    """Ask where to save the report, write it and open it (used by the settings window)."""
+    from tkinter import filedialog, messagebox
+    # Use CustomTkinter's root window if available, fallback to tkinter
+    try:
+        import customtkinter as ctk
         root = ctk.CTk()
-        root.withdraw()
-        pdf_path = filedialog.asksaveasfilename(
-            defaultextension=".pdf",
-            filetypes=[("PDF files", "*.pdf")],
-            initialdir=downloads_dir,
-            initialfile=default_pdf_name,
-            title="Save Parent Report PDF"
-        )
-        root.destroy()
-    else:
+    except ImportError:
+        import tkinter as tk
         root = tk.Tk()
-        root.withdraw()
-        pdf_path = filedialog.asksaveasfilename(
-            defaultextension=".pdf",
-            filetypes=[("PDF files", "*.pdf")],
-            initialdir=downloads_dir,
-            initialfile=default_pdf_name,
-            title="Save Parent Report PDF"
-        )
+    root.withdraw()
+
+    report_log = _open_events(None)
+    try:
+        has_events = bool(report_log.segments())
+    finally:
+        report_log.close()
+    if not has_events:
+        messagebox.showerror("Error", "No parent report log found.")
         root.destroy()
+        return
+
+    pdf_path = filedialog.asksaveasfilename(
+        defaultextension=".pdf",
+        filetypes=[("PDF files", "*.pdf")],
+        initialdir=Path.home() / "Downloads",
+        initialfile="Guard_Report.pdf",
+        title="Save Parent Report PDF"
+    )
     if not pdf_path:
+        root.destroy()
         return  # User cancelled
 
-    pdf = FPDF()
-    pdf.set_auto_page_break(auto=True, margin=15)
-    pdf.add_page()
-    pdf.set_font("Arial", "B", 16)
-    pdf.cell(0, 10, "Parent Mode Report", ln=True, align="C")
-    pdf.ln(5)
-    # Show threshold as percentage at the top
     try:
         from monitor.monitor import NSFW_THRESHOLD
-        threshold_percent = int(NSFW_THRESHOLD * 100)
+        threshold = NSFW_THRESHOLD
     except Exception:
-        threshold_percent = 0
-    pdf.set_font("Arial", size=12)
-    pdf.cell(0, 8, f"Sensitivity Threshold: {threshold_percent}%", ln=True)
-    pdf.ln(5)
-
-    pdf.set_font("Arial", size=12)
-    for event in events:
-        # Format time as HH:MM:SS for the event title
-        try:
-            dt = datetime.strptime(event['timestamp'], "%Y-%m-%d_%H-%M-%S")
-            date_time_str = dt.strftime("%Y-%m-%d %H:%M:%S")
-        except Exception:
-            date_time_str = event['timestamp']
-        pdf.set_font("Arial", "B", 12)
-        pdf.cell(0, 10, date_time_str, ln=True)
-        pdf.set_font("Arial", size=12)
-        pdf.cell(0, 8, f"Content Type: adult", ln=True)
-        # Format NSFW score to two decimal places and show as percent
-        try:
-            score_val = float(event['score'])
-            score_str = f"{int(score_val * 100)}%"
-        except Exception:
-            score_str = str(event['score'])
-        pdf.cell(0, 8, f"NSFW Score: {score_str}", ln=True)
-        screenshot_path = str(screenshot_dir / event['screenshot'])
-        file_url = f"file://{screenshot_path}"
-        # Add clickable link for screenshot
-        pdf.set_text_color(0, 0, 255)
-        pdf.cell(0, 8, "Open Screenshot in Browser", ln=True, link=file_url)
-        pdf.set_text_color(0, 0, 0)
-        pdf.ln(5)
-
-    pdf.output(str(pdf_path))
-
-    # Open the PDF in the default viewer
+        threshold = None
     try:
-        if platform.system() == "Windows":
-            os.startfile(pdf_path)
-        elif platform.system() == "Darwin":
-            os.system(f"open '{pdf_path}'")
-        else:
-            os.system(f"xdg-open '{pdf_path}'")
-    except Exception:
-        try:
-            webbrowser.open_new_tab(f"file://{pdf_path}")
-        except Exception:
-            if ctk:
-                ctk.CTkMessageBox(title="Report Saved", message=f"Report saved to {pdf_path}")
-            else:
-                messagebox.showinfo("Report Saved", f"Report saved to {pdf_path}") 
\ No newline at end of file
+        build_parent_report(pdf_path, threshold=threshold)
+    except Exception as e:
+        messagebox.showerror("Error", f"Could not create report: {e}")
+        root.destroy()
+        return
+    root.destroy()
+    _open_file(pdf_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write the parent-mode PDF report without the GUI.")
+    parser.add_argument("output", help="PDF file to write")
+    parser.add_argument("--log", help="Event log (.jsonl) or store (.db) (default: the one the monitor writes to, per its event_store setting)")
+    parser.add_argument("--screenshots", help="Screenshot store directory (default: ~/.Guard/screenshots)")
+    parser.add_argument("--since", help="Only events at or after this date (YYYY-MM-DD[ HH:MM])")
+    parser.add_argument("--until", help="Only events before this date (YYYY-MM-DD[ HH:MM])")
+    parser.add_argument("--min-score", type=float, help="Only events scoring at least this (0-1)")
+    parser.add_argument("--threshold", type=float, help="Sensitivity threshold to show in the header")
+    parser.add_argument("--no-thumbnails", action="store_true", help="Leave screenshots out of the report")
+    args = parser.parse_args(argv)
+    result = build_parent_report(args.output, log_path=args.log, screenshot_dir=args.screenshots,
+                                 since=args.since, until=args.until, min_score=args.min_score,
+                                 thumbnails=not args.no_thumbnails, threshold=args.threshold)
+    print(result)
+
+
+if __name__ == "__main__":
+    main()
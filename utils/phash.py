@@ -0,0 +1,20 @@
+import cv2
+import numpy as np
+from PIL import Image
+
+
+def dhash(image, hash_size=16):
+    """Difference hash of an image (NumPy array or PIL image) as an int of hash_size**2 bits."""
+    if isinstance(image, Image.Image):
+        image = np.asarray(image.convert("RGB"))
+    # Shrink the uint8 frame first; graying a full-resolution frame costs far more than the hash
+    small = cv2.resize(image, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    if small.ndim == 3:
+        # Plain channel mean so the hash does not depend on RGB/BGR(A) order
+        small = small[..., :3].mean(axis=2, dtype=np.float32)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count("1")
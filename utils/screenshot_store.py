@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from utils.phash import hamming_distance
+
+INDEX_NAME = "index.json"
+EVICTION_POLICIES = ("oldest", "least_referenced")
+
+
+class ScreenshotStore:
+    """Content-addressed, size-bounded store for parent-mode screenshots.
+
+    Entries are named by the sha256 of their encoded bytes, so identical
+    screenshots are stored once and two alerts in the same second can never
+    overwrite each other. An image whose perceptual hash is within
+    `dedup_distance` bits of an existing entry is treated as a near-duplicate: the
+    existing entry gains a reference instead of a new file being written. When the
+    store grows past `max_bytes`, entries are evicted oldest first, or by fewest
+    references (then oldest) with the "least_referenced" policy.
+
+    The index lives in `index.json` next to the images and is rewritten atomically
+    after every change.
+    """
+
+    def __init__(self, root, max_bytes=500 * 1024 * 1024, dedup_distance=10, eviction="oldest"):
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy '{eviction}', expected one of: {', '.join(EVICTION_POLICIES)}")
+        self.root = Path(root)
+        self.max_bytes = int(max_bytes)
+        self.dedup_distance = int(dedup_distance)
+        self.eviction = eviction
+        self._lock = threading.Lock()
+        self._entries = self._load_index()
+        self.deduplicated = 0
+        self.evicted = 0
+
+    def _load_index(self):
+        try:
+            with open(self.root / INDEX_NAME) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.root / (INDEX_NAME + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp_path, self.root / INDEX_NAME)
+
+    def put(self, data, extension, phash=None):
+        """Store encoded image bytes and return the id of the entry that now holds them."""
+        entry_id = hashlib.sha256(data).hexdigest()[:32]
+        now = time.time()
+        with self._lock:
+            existing = self._entries.get(entry_id) or self._find_near_duplicate(phash)
+            if existing is not None:
+                existing["refs"] += 1
+                existing["last_used"] = now
+                self.deduplicated += 1
+                self._save_index()
+                return existing["id"]
+            self.root.mkdir(parents=True, exist_ok=True)
+            filename = entry_id + extension
+            tmp_path = self.root / (filename + ".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self.root / filename)
+            self._entries[entry_id] = {
+                "id": entry_id,
+                "file": filename,
+                "size": len(data),
+                "phash": format(phash, "x") if phash is not None else None,
+                "created": now,
+                "last_used": now,
+                "refs": 1,
+            }
+            self._enforce_budget(keep=entry_id)
+            self._save_index()
+            return entry_id
+
+    def _find_near_duplicate(self, phash):
+        if phash is None or self.dedup_distance < 0:
+            return None
+        best, best_distance = None, self.dedup_distance + 1
+        for entry in self._entries.values():
+            if entry.get("phash") is None:
+                continue
+            distance = hamming_distance(phash, int(entry["phash"], 16))
+            if distance < best_distance:
+                best, best_distance = entry, distance
+        return best
+
+    def _enforce_budget(self, keep=None):
+        total = sum(entry["size"] for entry in self._entries.values())
+        if total <= self.max_bytes:
+            return
+        if self.eviction == "least_referenced":
+            order = sorted(self._entries.values(), key=lambda entry: (entry["refs"], entry["last_used"]))
+        else:
+            order = sorted(self._entries.values(), key=lambda entry: entry["created"])
+        for entry in order:
+            if total <= self.max_bytes:
+                break
+            if entry["id"] == keep:
+                continue
+            try:
+                (self.root / entry["file"]).unlink()
+            except FileNotFoundError:
+                pass
+            total -= entry["size"]
+            del self._entries[entry["id"]]
+            self.evicted += 1
+
+    def path_for(self, entry_id):
+        """Path of the stored image, or None if the entry was evicted."""
+        entry = self._entries.get(entry_id)
+        return self.root / entry["file"] if entry else None
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "bytes": sum(entry["size"] for entry in self._entries.values()),
+            "max_bytes": self.max_bytes,
+            "deduplicated": self.deduplicated,
+            "evicted": self.evicted,
+        }
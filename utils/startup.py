@@ -0,0 +1,81 @@
+import builtins
+import json
+import logging
+import sys
+import threading
+import time
+
+
+class StartupReport:
+    """Records import times per top-level module and the time to startup milestones.
+
+    `install_import_timer()` wraps `__import__` and charges each top-level module the
+    wall time of its first import (including whatever it pulls in), whichever thread
+    does it. Milestones are seconds since this module was imported, which main.py
+    does first. The report is written when the `final` milestone is marked, at which
+    point the import hook is removed again.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.imports = {}
+        self.milestones = {}
+        self.path = None
+        self._original_import = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def install_import_timer(self):
+        if self._original_import is not None:
+            return
+        original = self._original_import = builtins.__import__
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            top = name.partition(".")[0]
+            if level or getattr(self._local, "depth", 0) or top in sys.modules:
+                return original(name, globals, locals, fromlist, level)
+            self._local.depth = 1
+            began = time.perf_counter()
+            try:
+                return original(name, globals, locals, fromlist, level)
+            finally:
+                self._local.depth = 0
+                self.imports[top] = self.imports.get(top, 0.0) + time.perf_counter() - began
+
+        builtins.__import__ = timed_import
+
+    def uninstall_import_timer(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def mark(self, name, final=False):
+        """Record the first time `name` is reached; write the report if `final`."""
+        with self._lock:
+            if name in self.milestones:
+                return
+            self.milestones[name] = time.perf_counter() - self.start
+        logging.info(f"Startup: {name} after {self.milestones[name]:.2f}s")
+        if final:
+            self.uninstall_import_timer()
+            self.save()
+
+    def as_dict(self):
+        return {
+            "milestones": dict(self.milestones),
+            "imports": dict(sorted(self.imports.items(), key=lambda item: item[1], reverse=True)),
+        }
+
+    def save(self, path=None):
+        path = path or self.path
+        if not path:
+            return
+        try:
+            with open(path, "w") as f:
+                json.dump(self.as_dict(), f, indent=2)
+            logging.info(f"Startup report saved to {path}")
+        except OSError as e:
+            logging.error(f"Failed to save startup report: {e}")
+
+
+startup_report = StartupReport()
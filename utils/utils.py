@@ -1,4 +1,7 @@
-import winreg
+try:
+    import winreg
+except ImportError:  # Not on Windows; auto-start is Windows-only
+    winreg = None
 import os
 import logging
 from pathlib import Path
@@ -6,6 +9,9 @@ from pathlib import Path
 logging.basicConfig(level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s")
 
 def setup_auto_start(enable: bool, script_path: str) -> None:
+    if winreg is None:
+        logging.warning("Auto-start is only supported on Windows")
+        return
     try:
         key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Software\Microsoft\Windows\CurrentVersion\Run", 0, winreg.KEY_SET_VALUE)
         app_name = "Guard"